@@ -0,0 +1,94 @@
+"""
+Microbenchmark of the per-call cost of logger.info with synchronous and queued handlers.
+
+"sync" is the previous setup, a StreamHandler and a FileHandler called on the logging
+thread; "queued" is monitor.utils.logger, where the caller only enqueues the record.
+stdout is redirected to a file so the terminal does not dominate the numbers; with
+--sink-latency every stdout write additionally blocks, like a slow disk or a full pipe.
+
+Usage:
+    python -m benchmarks.bench_logging [--calls N] [--repeat N] [--sink-latency SECONDS]
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from logging import Logger
+from typing import TextIO
+
+from monitor.utils import logger as logger_module
+
+
+class SlowSink:
+    """File wrapper whose writes block for `latency` seconds."""
+
+    def __init__(self, stream: TextIO, latency: float) -> None:
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def sync_logger(directory: str, stdout: object) -> Logger:
+    log = Logger("bench-sync")
+    log.setLevel(logging.INFO)
+    for handler in (
+        logging.StreamHandler(stdout),
+        logging.FileHandler(os.path.join(directory, "sync.log"), mode="a", encoding="utf-8"),
+    ):
+        handler.setFormatter(logger_module.FORMATTER)
+        log.addHandler(handler)
+    return log
+
+
+def queued_logger(directory: str, stdout: object) -> Logger:
+    logger_module.get_logger.cache_clear()
+    with contextlib.redirect_stdout(stdout):
+        return logger_module.get_logger("bench-queued", file_path=os.path.join(directory, "queued.log"))
+
+
+def time_calls(log: Logger, calls: int) -> float:
+    """Return the seconds spent by the caller in `calls` logger.info calls."""
+    started = time.perf_counter()
+    for i in range(calls):
+        log.info("Fetched %s in %.3fs (%d bytes)", "https://example.com/program", 0.123, i)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sink-latency", type=float, default=0.0, help="seconds every stdout write blocks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, open(os.path.join(directory, "stdout.log"), "w") as out:
+        stdout = SlowSink(out, args.sink_latency)
+        sync = sync_logger(directory, stdout)
+        sync_best = min(time_calls(sync, args.calls) for _ in range(args.repeat))
+        for handler in sync.handlers:
+            handler.close()
+
+        queued = queued_logger(directory, stdout)
+        queued_best = min(time_calls(queued, args.calls) for _ in range(args.repeat))
+        drain_started = time.perf_counter()
+        logger_module.stop_logging("bench-queued")
+        drain = time.perf_counter() - drain_started
+
+    print(f"{'handler':<8} {'us/call':>9}")
+    print(f"{'sync':<8} {sync_best / args.calls * 1e6:>9.2f}")
+    print(f"{'queued':<8} {queued_best / args.calls * 1e6:>9.2f}")
+    print(f"queued records were written by the listener thread, draining the rest took {drain * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
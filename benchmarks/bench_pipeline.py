@@ -0,0 +1,160 @@
+"""
+Benchmark of the full parse_all -> format -> notify pipeline against local HTTP stand-ins.
+
+Every scenario runs in a fresh process, serving either the recorded pages of the configured
+theatres or a synthetic page with N performances from a local server (with optional latency
+and error injection) and delivering to a fake Telegram API.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 10 100 1000 10000] [--iterations 5]
+                                        [--latency 0.0] [--error-rate 0.0] [--parse-mode streaming]
+"""
+
+import argparse
+import logging
+import os
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.common import THEATRE_FIXTURES, configured_theatres, load_fixture
+from benchmarks.server import FixtureServer
+from benchmarks.synthetic import SYNTHETIC_SELECTORS, synthetic_page
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+def build_scenario(name: str, server_url: str | None = None) -> tuple[dict[str, str], list[dict], int]:
+    """
+    Return the served pages, theatre configs and results_per_theatre of a scenario.
+
+    Scenario names are "recorded" or "synthetic-<N>".
+    """
+    base = server_url or "http://127.0.0.1"
+    if name == "recorded":
+        pages, theatres = {}, []
+        for theatre in configured_theatres():
+            path = "/" + THEATRE_FIXTURES[theatre["name"]].name
+            pages[path] = load_fixture(theatre["name"])
+            theatres.append({**theatre, "base_url": base, "program_url": base + path, "parse_delay": 0})
+        return pages, theatres, 10
+
+    n = int(name.split("-", 1)[1])
+    theatre = {
+        "name": f"Synthetic {n}",
+        "base_url": base,
+        "program_url": f"{base}/synthetic.html",
+        "time_parseable": True,
+        "selectors": SYNTHETIC_SELECTORS,
+    }
+    return {"/synthetic.html": synthetic_page(n)}, [theatre], n
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def run_scenario(
+    name: str,
+    iterations: int,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    parse_mode: str = "streaming",
+) -> dict:
+    """
+    Run one scenario in the current process and return its measurements.
+
+    Returns
+    -------
+    dict
+        'scenario', 'performances', 'throughput' (performances/s), 'p50' and 'p99'
+        (seconds per pipeline run), 'peak_rss_mb' and 'messages'.
+    """
+    os.environ["MONITOR_DATA_DIR"] = tempfile.mkdtemp(prefix="monitor-bench-")
+
+    from monitor.notifier.queue import TelegramSendQueue
+    from monitor.parser import parse_all
+    from monitor.pipeline import notify
+    from monitor.utils.http import configure_http
+    from monitor.utils.logger import logger
+    from tests.fake_telegram import FakeTelegramServer
+
+    logger.setLevel(logging.WARNING)
+    configure_http()
+
+    pages, _, _ = build_scenario(name)
+    with FixtureServer(pages, latency=latency, error_rate=error_rate) as server, FakeTelegramServer() as telegram:
+        _, theatres, results_per_theatre = build_scenario(name, server.url)
+        cfg = {
+            "general": {
+                "results_per_theatre": results_per_theatre,
+                "parse_mode": parse_mode,
+                "cache": {"enabled": False},
+                "state": {"enabled": False},
+            },
+            "theatres": theatres,
+        }
+        queue_options = {"per_chat_interval": 0, "global_rate": 0, "backoff_time": 0, "api_url": telegram.url}
+
+        timings, performances = [], 0
+        for _ in range(iterations):
+            queue = TelegramSendQueue("bench", queue_options)
+            started = time.perf_counter()
+            parsed = parse_all(cfg)
+            notify(cfg, parsed, None, "bench", "bench-chat", queue=queue)
+            timings.append(time.perf_counter() - started)
+            performances = sum(len(shows) for shows in parsed.values())
+
+        messages = len(telegram.messages)
+
+    return {
+        "scenario": name,
+        "performances": performances,
+        "throughput": performances * len(timings) / sum(timings),
+        "p50": percentile(timings, 50),
+        "p99": percentile(timings, 99),
+        "mean": statistics.mean(timings),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "messages": messages // max(iterations, 1),
+    }
+
+
+def run_isolated(name: str, **kwargs: object) -> dict:
+    """Run a scenario in a fresh interpreter so its peak RSS is not shared with other scenarios."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_scenario, name, **kwargs).result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every page response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 page response")
+    parser.add_argument("--parse-mode", choices=["full", "streaming"], default="streaming")
+    args = parser.parse_args()
+
+    scenarios = ["recorded"] + [f"synthetic-{n}" for n in args.sizes]
+    print(
+        f"{'scenario':<18} {'records':>8} {'records/s':>11} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12} {'msgs':>5}"
+    )
+    for name in scenarios:
+        r = run_isolated(
+            name,
+            iterations=args.iterations,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            parse_mode=args.parse_mode,
+        )
+        print(
+            f"{r['scenario']:<18} {r['performances']:>8} {r['throughput']:>11.0f} {r['p50'] * 1000:>9.1f} "
+            f"{r['p99'] * 1000:>9.1f} {r['peak_rss_mb']:>12.1f} {r['messages']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
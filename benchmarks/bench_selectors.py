@@ -0,0 +1,59 @@
+"""
+Microbenchmark of the per-element cost of extracting a performance with each selector backend.
+
+Usage:
+    python -m benchmarks.bench_selectors [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from bs4 import BeautifulSoup
+
+from benchmarks.common import configured_theatres, load_fixture
+from monitor.parser.selectors import SELECTOR_BACKENDS, compile_selectors
+
+
+def bench_theatre(theatre: dict, repeat: int) -> dict[str, float]:
+    """Return the best per-element extraction time in microseconds for every backend."""
+    page = load_fixture(theatre["name"])
+    sel = theatre["selectors"]
+    timings = {}
+
+    soup = BeautifulSoup(page, "lxml")
+    elements = soup.select(sel["elements"])
+
+    def uncompiled() -> None:
+        for perf in elements:
+            perf.select_one(sel["time"])
+            perf.select_one(sel["title"])
+            perf.select_one(sel["link"])
+
+    timings["bs4 select_one(str)"] = min(timeit.repeat(uncompiled, number=1, repeat=repeat)) / len(elements)
+
+    for backend in SELECTOR_BACKENDS:
+        compiled = compile_selectors(sel["elements"], sel["time"], sel["title"], sel["link"], backend=backend)
+        backend_elements = compiled.select_elements(compiled.parse_document(page))
+
+        def run() -> None:
+            for perf in backend_elements:
+                compiled.extract(perf)
+
+        timings[backend] = min(timeit.repeat(run, number=1, repeat=repeat)) / len(backend_elements)
+
+    return {name: seconds * 1e6 for name, seconds in timings.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for theatre in configured_theatres():
+        print(theatre["name"])
+        for name, micros in bench_theatre(theatre, args.repeat).items():
+            print(f"  {name:<22} {micros:8.1f} us/element")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Startup benchmark: import time of the CLI measured with `python -X importtime`.
+
+Every scenario runs in a fresh interpreter, so nothing is cached in sys.modules; the
+reported time is the cumulative import time of the scenario's root module, and the
+slowest imports below it are listed with -v.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat N] [-v]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# name -> (code run in a fresh interpreter, module whose cumulative import time is reported)
+SCENARIOS = {
+    "cli": ("import monitor.__main__", "monitor.__main__"),
+    "pipeline": ("import monitor.pipeline", "monitor.pipeline"),
+    "parser": ("import monitor.parser.parsing", "monitor.parser.parsing"),
+}
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> dict[str, tuple[int, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Parameters
+    ----------
+    output: str
+        stderr of the interpreter.
+
+    Returns
+    -------
+    dict[str, tuple[int, int]]
+        Module name -> (self, cumulative) import time in microseconds.
+    """
+    times = {}
+    for line in output.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+
+def measure_imports(code: str, env: dict | None = None) -> dict[str, tuple[int, int]]:
+    """Run `code` in a fresh interpreter with -X importtime and return its import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-v", "--verbose", action="store_true", help="list the slowest imports")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<10} {'ms':>8}")
+    for name, (code, root) in SCENARIOS.items():
+        runs = [measure_imports(code) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[root][1])
+        print(f"{name:<10} {best[root][1] / 1000:>8.1f}")
+        if args.verbose:
+            slowest = sorted(best.items(), key=lambda item: item[1][1], reverse=True)[1:11]
+            for module, (_, cumulative) in slowest:
+                print(f"  {module:<40} {cumulative / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
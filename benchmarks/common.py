@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from monitor.utils.load_cfg import load_yaml_config
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# recorded program page of every configured theatre
+THEATRE_FIXTURES = {
+    "Divadlo X10": FIXTURES_DIR / "divadlo_x10.html",
+    "Venuševe Švehlovce": FIXTURES_DIR / "venuse_ve_svehlovce.html",
+}
+
+
+def load_fixture(theatre_name: str) -> str:
+    return THEATRE_FIXTURES[theatre_name].read_text(encoding="utf-8")
+
+
+def configured_theatres() -> list[dict]:
+    """Return the configured theatres that have a recorded fixture page."""
+    return [th for th in load_yaml_config()["theatres"] if th["name"] in THEATRE_FIXTURES]
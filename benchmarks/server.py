@@ -0,0 +1,63 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+class FixtureServer:
+    """
+    Local HTTP stand-in for theatre websites serving recorded or synthetic pages.
+
+    Every request is delayed by `latency` seconds and fails with a 503 with probability
+    `error_rate`, so retries and concurrency can be benchmarked without touching the network.
+    """
+
+    def __init__(self, pages: dict[str, str], latency: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> None:
+        self.pages = {path: html.encode("utf-8") for path, html in pages.items()}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # reply headers and body are written separately; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def do_GET(self: Any) -> None:
+                with server._lock:
+                    server.requests += 1
+                    fail = server._random.random() < server.error_rate
+                    server.errors += int(fail)
+                if server.latency:
+                    time.sleep(server.latency)
+
+                body = server.pages.get(self.path.split("?")[0])
+                status = 503 if fail else 200 if body is not None else 404
+                if status != 200:
+                    body = b""
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self: Any, *args: Any) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
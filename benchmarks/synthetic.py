@@ -0,0 +1,43 @@
+TITLES = ["Hamlet", "Racek", "Tři sestry", "Maryša", "Lucerna", "Revizor", "Višňový sad", "Naši furianti"]
+
+SYNTHETIC_SELECTORS = {
+    "elements": "div.performance-listed-main",
+    "time": "time",
+    "title": "h3.performance-listed-title a",
+    "link": "h3.performance-listed-title a",
+}
+
+
+def synthetic_page(n_performances: int) -> str:
+    """
+    Build a program page with `n_performances` entries in the Divadlo X10 layout.
+
+    Parameters
+    ----------
+    n_performances: int
+        Number of performances on the page.
+
+    Returns
+    -------
+    str
+        HTML document.
+    """
+    rows = []
+    for i in range(n_performances):
+        title = TITLES[i % len(TITLES)]
+        day, hour = i % 28 + 1, 17 + i % 4
+        rows.append(
+            '<div class="performance-listed-main">'
+            f'<div class="performance-listed-date"><time datetime="2030-02-{day:02d}T{hour}:00:00+01:00">'
+            f"{day}. 2. {hour}:00</time></div>"
+            '<div class="performance-listed-content">'
+            f'<h3 class="performance-listed-title"><a href="/cs/inscenace/{i}">{title} {i}</a></h3>'
+            '<p class="performance-listed-info">Hraje soubor · <span class="length">120 min</span></p>'
+            "</div></div>"
+        )
+    return (
+        '<!DOCTYPE html><html lang="cs"><head><meta charset="utf-8"><title>Program</title></head><body>'
+        '<nav class="main-nav"><ul><li><a href="/">Úvod</a></li><li><a href="/program">Program</a></li></ul></nav>'
+        f'<main><h1>Program</h1><div class="performance-listed">{"".join(rows)}</div></main>'
+        "<footer><p>Divadlo, Praha</p></footer></body></html>"
+    )
@@ -1,96 +1,151 @@
+import argparse
 import os
-from datetime import datetime
-from zoneinfo import ZoneInfo
-
-from dotenv import load_dotenv
-
-from monitor.notifier import send_telegram_message
-from monitor.parser import parse_all
-from monitor.utils.load_cfg import load_yaml_config
-from monitor.utils.logger import logger
-
-load_dotenv()
-
-
-def check_env_vars() -> None:
+import sys
+from pathlib import Path
+
+from monitor.notifier.formatting import (  # noqa: F401
+    format_changes_html,
+    format_theatre_schedule_html,
+)
+from monitor.parser.sharding import parse_shard_arg, select_shard
+from monitor.pipeline import run_once
+from monitor.storage.archive import Archive
+from monitor.storage.state import StateStore
+from monitor.utils.http import configure_http, connection_stats
+from monitor.utils.load_cfg import load_config
+from monitor.utils.logger import configure_logging, logger
+from monitor.utils.metrics import configure_metrics, write_prometheus_file
+
+
+def check_env_vars(require_chat_id: bool = True) -> None:
     """
     Ensure required environment variables are set.
 
+    Args:
+        require_chat_id (bool): Whether CHAT_ID is required, i.e. no subscriptions are configured.
+
     Raises:
         EnvironmentError: If any required environment variable is missing.
     """
-    required_vars = ["BOT_ID", "CHAT_ID"]
+    required_vars = ["BOT_ID", "CHAT_ID"] if require_chat_id else ["BOT_ID"]
     missing_vars = [var for var in required_vars if var not in os.environ]
     if missing_vars:
         raise EnvironmentError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
 
-def format_theatre_schedule_html(items: dict, tz: str = "Europe/Prague", dt_parsable: bool = False) -> str:
-    """
-    Format theatre schedule into a Telegram-ready HTML string.
-    Each play is bold, shows are sorted by date ascending,
-    and links are proper <a href="">.
-
-    Args:
-        items (dict): List of shows with 'title', 'datetime', and 'link'.
-        tz (str): Timezone for datetime conversion.
-        dt_parsable (bool): Whether the datetime strings are ISO 8601 parseable.
-
-    Returns:
-        str: Formatted HTML string.
-    """
-    parsed = []
-    for it in items:
-        title = " ".join(it["title"].split())
-        dt = it["datetime"]
-        if dt_parsable:
-            dt = datetime.fromisoformat(it["datetime"]).astimezone(ZoneInfo(tz))
-        parsed.append({"title": title, "dt": dt, "link": it["link"]})
-
-    parsed.sort(key=lambda x: x["dt"])
-
-    grouped: dict = {}
-    for row in parsed:
-        if row["title"] not in grouped:
-            grouped[row["title"]] = []
-        grouped[row["title"]].append(row)
+def main(config_path: Path | None = None, shard: tuple[int, int] | None = None) -> None:
+    cfg = load_config(config_path)
+    if shard is not None:
+        cfg = {**cfg, "theatres": select_shard(cfg.get("theatres", []), *shard)}
+        logger.info(f"Shard {shard[0] + 1}/{shard[1]}: {len(cfg['theatres'])} theatres")
+    check_env_vars(require_chat_id=not cfg.get("subscriptions"))
+
+    configure_logging(cfg.get("general", {}).get("logging"))
+    configure_http(cfg.get("general", {}).get("http"))
+    configure_metrics(cfg.get("general", {}).get("metrics"))
+
+    store = StateStore.from_config(cfg)
+    archive = Archive.from_config(cfg)
+    run_once(cfg, store, os.environ["BOT_ID"], os.environ.get("CHAT_ID"), archive=archive)
+
+    if store is not None:
+        removed = store.compact()
+        logger.info(f"State compaction removed {removed} past performances")
+        store.close()
+    if archive is not None:
+        pruned, compacted = archive.prune(), archive.compact()
+        logger.info(f"Archive retention removed {pruned} scrapes and shows, compaction {compacted} scrapes")
+        archive.close()
+
+    stats = connection_stats()
+    logger.info(f"HTTP connections opened: {stats['opened']}, reused: {stats['reused']}")
+    write_prometheus_file()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m monitor", description="Monitor theatre programs.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and check every theatre on its own interval instead of a single run",
+    )
+    parser.add_argument("--config", type=Path, default=None, help="path to the theatres configuration file")
+    parser.add_argument(
+        "--shard",
+        type=_shard,
+        default=None,
+        metavar="i/N",
+        help="only handle the i-th of N stable shards of the theatres, e.g. one of several containers",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="validate the configuration and profile every theatre's selectors on its program page, then exit",
+    )
+    parser.add_argument(
+        "--page",
+        type=_page,
+        action="append",
+        default=[],
+        metavar="THEATRE=PATH",
+        help="with --check, use a recorded program page instead of fetching it (repeatable)",
+    )
+    return parser.parse_args(argv)
+
+
+def _shard(value: str) -> tuple[int, int]:
+    try:
+        return parse_shard_arg(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
 
-    lines = []
-    for title, shows in grouped.items():
-        lines.append(f"<b>{title}</b>")
-        for s in shows:
-            date_str = s["dt"]
-            if dt_parsable:
-                date_str = date_str.strftime("%a, %d %b %H:%M")
 
-            lines.append(f"- {date_str} → <a href=\"{s['link']}\">Detail</a>")
-        lines.append("")
+def _page(value: str) -> tuple[str, Path]:
+    name, sep, path = value.rpartition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"Invalid page '{value}', expected THEATRE=PATH")
+    return name, Path(path)
 
-    return "\n".join(lines).strip()
 
+def check(config_path: Path | None = None, pages: list[tuple[str, Path]] | None = None) -> int:
+    """
+    Validate the configuration and dry-run its theatres without notifying anyone.
 
-def main() -> None:
-    check_env_vars()
+    Args:
+        config_path (Path | None): Path to the configuration file.
+        pages (list[tuple[str, Path]] | None): Recorded program pages by theatre name.
 
-    cfg = load_yaml_config()
+    Returns:
+        int: Exit status, 1 if the configuration has errors.
+    """
+    from monitor.check import run_check
 
-    logger.info("Start parsing theatres")
-    parsed_theatres_info = parse_all()
-    logger.info("Finished parsing theatres")
+    try:
+        cfg = load_config(config_path, snapshot=False)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}")
+        return 1
+    configure_http(cfg["general"].get("http"))
+    return run_check(cfg, dict(pages or []))
 
-    for theatre_name, shows in parsed_theatres_info.items():
-        theatre_config: dict = next((th for th in cfg["theatres"] if th["name"] == theatre_name), {})
 
-        logger.info(f"Processing theatre: {theatre_name}")
-        message = format_theatre_schedule_html(shows, dt_parsable=theatre_config.get("time_parseable", False))
-        message = f"<b>{theatre_name}</b>\n\n" + message
-        send_telegram_message(os.environ["BOT_ID"], os.environ["CHAT_ID"], message)
+if __name__ == "__main__":
+    args = parse_args()
+    if args.check:
+        sys.exit(check(args.config, args.page))
 
+    from dotenv import load_dotenv
 
-if __name__ == "__main__":
+    load_dotenv()
     logger.info("Starting the monitoring script...")
     try:
-        main()
+        if args.daemon:
+            from monitor.daemon import run_daemon
+
+            check_env_vars(require_chat_id=False)
+            run_daemon(args.config, shard=args.shard)
+        else:
+            main(args.config, shard=args.shard)
         logger.info("Monitoring script completed successfully.")
     except Exception as e:
         logger.error(f"An error occurred: {e}")
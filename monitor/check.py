@@ -0,0 +1,567 @@
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from monitor.parser.dates import compile_format, get_zone
+from monitor.parser.performance import DEFAULT_TIMEZONE, Performance
+from monitor.parser.selectors import (
+    compile_selector,
+    compile_selectors,
+    compile_theatre_selectors,
+)
+from monitor.parser.sources import HTML_SOURCE, create_adapter
+
+NUMBER = (int, float)
+
+GENERAL_SCHEMA: dict[str, tuple[type, ...]] = {
+    "results_per_theatre": (int,),
+    "max_workers": (int,),
+    "processes": (int,),
+    "interval": NUMBER,
+    "jitter": NUMBER,
+    "parse_mode": (str,),
+    "timezone": (str,),
+    "logging": (dict,),
+    "http": (dict,),
+    "retry": (dict,),
+    "circuit_breaker": (dict,),
+    "telegram": (dict,),
+    "render": (dict,),
+    "cache": (dict,),
+    "state": (dict,),
+    "archive": (dict,),
+    "digest": (dict,),
+    "metrics": (dict,),
+}
+
+THEATRE_SCHEMA: dict[str, tuple[type, ...]] = {
+    "name": (str,),
+    "base_url": (str,),
+    "program_url": (str,),
+    "time_parseable": (bool,),
+    "selector_backend": (str,),
+    "selectors": (dict,),
+    "parse_mode": (str,),
+    "parse_delay": NUMBER,
+    "interval": NUMBER,
+    "timezone": (str,),
+    "datetime_formats": (list,),
+    "pagination": (dict,),
+    "source": (dict,),
+    "shard_key": (str,),
+}
+
+# sections read by `from_config` / `from_options` without a dictionary of defaults
+SECTION_SCHEMAS: dict[str, dict[str, tuple[type, ...]]] = {
+    "retry": {
+        "max_attempts": (int,),
+        "base_delay": NUMBER,
+        "max_delay": NUMBER,
+        "max_retry_after": NUMBER,
+        "jitter": (bool,),
+        "retry_statuses": (list,),
+    },
+    "circuit_breaker": {
+        "enabled": (bool,),
+        "path": (str,),
+        "failure_threshold": (int,),
+        "cooldown": NUMBER,
+        "max_cooldown": NUMBER,
+    },
+    "cache": {"enabled": (bool,), "directory": (str,), "max_entries": (int,), "max_bytes": (int,)},
+    "state": {"enabled": (bool,), "path": (str,), "keep_days": NUMBER},
+}
+
+SELECTOR_NAMES = ("elements", "time", "title", "link")
+PARSE_MODES = ("full", "streaming")
+
+# a selector is reported as slow above this many milliseconds per page
+SLOW_SELECTOR_MS = 5.0
+# a rewrite is only suggested when it is at least this much faster
+MIN_SPEEDUP = 1.2
+
+_SLOW_PSEUDO_CLASSES = {
+    ":has(": ":has() runs another selector below every candidate",
+    ":contains(": "text matching reads the text of every candidate",
+    ":-soup-contains(": "text matching reads the text of every candidate",
+    ":nth-": ":nth-* counts the siblings of every candidate",
+}
+
+
+@dataclass
+class Finding:
+    """A problem or hint reported by the check; errors make it fail."""
+
+    level: str
+    subject: str
+    message: str
+
+
+@dataclass
+class SelectorProfile:
+    """Matches, empty results and time of one selector of a theatre on one page."""
+
+    name: str
+    css: str
+    matches: int
+    empty: int
+    ms: float
+    hints: list[str] = field(default_factory=list)
+
+
+def _check_types(
+    values: dict, schema: dict[str, tuple[type, ...]], subject: str, unknown: str = "warning"
+) -> list[Finding]:
+    findings = []
+    for key, value in values.items():
+        if key not in schema:
+            findings.append(Finding(unknown, subject, f"unknown option '{key}'"))
+        elif value is not None and (
+            not isinstance(value, schema[key]) or (isinstance(value, bool) and bool not in schema[key])
+        ):
+            expected = " or ".join(t.__name__ for t in schema[key])
+            findings.append(Finding("error", subject, f"'{key}' must be {expected}, got {type(value).__name__}"))
+    return findings
+
+
+def _section_defaults() -> dict[str, dict]:
+    from monitor.notifier.digest import DEFAULT_DIGEST_OPTIONS
+    from monitor.notifier.queue import DEFAULT_TELEGRAM_OPTIONS
+    from monitor.notifier.rendering import DEFAULT_RENDER_OPTIONS
+    from monitor.storage.archive import DEFAULT_ARCHIVE_OPTIONS
+    from monitor.utils.http import DEFAULT_HTTP_OPTIONS
+    from monitor.utils.logger import DEFAULT_LOGGING_OPTIONS
+    from monitor.utils.metrics import DEFAULT_METRICS_OPTIONS
+
+    return {
+        "archive": DEFAULT_ARCHIVE_OPTIONS,
+        "digest": DEFAULT_DIGEST_OPTIONS,
+        "http": DEFAULT_HTTP_OPTIONS,
+        "logging": DEFAULT_LOGGING_OPTIONS,
+        "metrics": DEFAULT_METRICS_OPTIONS,
+        "render": DEFAULT_RENDER_OPTIONS,
+        "telegram": DEFAULT_TELEGRAM_OPTIONS,
+    }
+
+
+def _check_source(theatre: dict, name: str) -> list[Finding]:
+    source = theatre.get("source") or {}
+    if isinstance(source, dict) and source.get("type", HTML_SOURCE) != HTML_SOURCE:
+        try:
+            create_adapter(source)
+        except ValueError as e:
+            return [Finding("error", name, f"invalid source: {e}")]
+        return []
+    if not isinstance(theatre.get("selectors"), dict):
+        return [Finding("error", name, "'selectors' are missing")]
+    missing = [key for key in SELECTOR_NAMES if not theatre["selectors"].get(key)]
+    if missing:
+        return [Finding("error", name, f"selectors {', '.join(missing)} are missing")]
+    try:
+        compile_theatre_selectors(theatre)
+    except ValueError as e:
+        return [Finding("error", name, str(e))]
+    return []
+
+
+def _check_theatre(theatre: dict) -> list[Finding]:
+    name = str(theatre.get("name"))
+    findings = _check_types(theatre, THEATRE_SCHEMA, name)
+    if not theatre.get("program_url"):
+        findings.append(Finding("error", name, "'program_url' is missing"))
+    findings.extend(_check_source(theatre, name))
+
+    if theatre.get("parse_mode") is not None and theatre["parse_mode"] not in PARSE_MODES:
+        findings.append(Finding("error", name, f"'parse_mode' must be one of {', '.join(PARSE_MODES)}"))
+    if isinstance(theatre.get("timezone"), str):
+        try:
+            get_zone(theatre["timezone"])
+        except (KeyError, ValueError):
+            findings.append(Finding("error", name, f"unknown timezone '{theatre['timezone']}'"))
+    formats = theatre.get("datetime_formats")
+    for pattern in formats if isinstance(formats, list) else ():
+        try:
+            compile_format(pattern)
+        except (TypeError, ValueError) as e:
+            findings.append(Finding("error", name, f"invalid datetime format: {e}"))
+    for key in ("parse_delay", "interval"):
+        if isinstance(theatre.get(key), NUMBER) and theatre[key] < 0:
+            findings.append(Finding("error", name, f"'{key}' must not be negative"))
+    return findings
+
+
+def _check_subscriptions(cfg: dict) -> list[Finding]:
+    """Compile the digest schedule and every subscription as `load_subscriptions` does."""
+    from monitor.notifier.digest import DigestSchedule
+    from monitor.notifier.subscriptions import compile_subscription
+
+    general = cfg.get("general") or {}
+    timezone = general.get("timezone", DEFAULT_TIMEZONE)
+    digest = general.get("digest") if isinstance(general.get("digest"), dict) else {}
+    findings = []
+    try:
+        DigestSchedule.from_options(digest, timezone)
+    except (KeyError, TypeError, ValueError) as e:
+        findings.append(Finding("error", "general.digest", f"invalid digest: {e}"))
+
+    subscriptions = cfg.get("subscriptions") or []
+    if not isinstance(subscriptions, list):
+        return [*findings, Finding("error", "subscriptions", "'subscriptions' must be a list")]
+    for i, entry in enumerate(subscriptions):
+        subject = f"subscription #{i + 1}"
+        if not isinstance(entry, dict):
+            findings.append(Finding("error", subject, "must be a mapping"))
+            continue
+        try:
+            compile_subscription({**entry, "digest": {**digest, **(entry.get("digest") or {})}}, timezone)
+        except (KeyError, TypeError, ValueError) as e:
+            findings.append(Finding("error", subject, str(e)))
+    return findings
+
+
+def check_schema(cfg: dict) -> list[Finding]:
+    """
+    Check the options of a configuration that `validate_config` already accepted.
+
+    Parameters
+    ----------
+    cfg: dict
+        Configuration dictionary.
+
+    Returns
+    -------
+    list[Finding]
+        Errors for invalid values (wrong types, missing or invalid selectors, unknown source
+        types, timezones or datetime formats, subscriptions that do not compile, unknown retry
+        options) and warnings for unknown, e.g. misspelled, options.
+    """
+    general = cfg.get("general", {})
+    findings = _check_types(general, GENERAL_SCHEMA, "general")
+    for section, defaults in _section_defaults().items():
+        for key in general.get(section) or {}:
+            if key not in defaults:
+                findings.append(Finding("warning", f"general.{section}", f"unknown option '{key}'"))
+    for section, schema in SECTION_SCHEMAS.items():
+        if isinstance(general.get(section), dict):
+            # RetryPolicy.from_options rejects unknown options, the other sections ignore them
+            unknown = "error" if section == "retry" else "warning"
+            findings.extend(_check_types(general[section], schema, f"general.{section}", unknown))
+    if isinstance(general.get("results_per_theatre"), int) and general["results_per_theatre"] < 1:
+        findings.append(Finding("error", "general", "'results_per_theatre' must be positive"))
+    if general.get("parse_mode") is not None and general["parse_mode"] not in PARSE_MODES:
+        findings.append(Finding("error", "general", f"'parse_mode' must be one of {', '.join(PARSE_MODES)}"))
+
+    findings.extend(_check_subscriptions(cfg))
+
+    for theatre in cfg.get("theatres") or []:
+        findings.extend(_check_theatre(theatre))
+    return findings
+
+
+def split_selector(css: str) -> list[tuple[str, str]]:
+    """
+    Split a single CSS selector into (combinator, compound) pairs.
+
+    The combinator of the first compound is "", descendant combinators are " ".
+    Brackets, parentheses and quotes are kept intact, e.g.
+    "div.a > p[title='x y'] span" -> [("", "div.a"), (">", "p[title='x y']"), (" ", "span")].
+    """
+    parts: list[tuple[str, str]] = []
+    combinator, compound, depth, quote = "", "", 0, ""
+    for char in css.strip():
+        if quote:
+            compound += char
+            quote = "" if char == quote else quote
+        elif char in "\"'":
+            compound += char
+            quote = char
+        elif char in "([":
+            compound += char
+            depth += 1
+        elif char in ")]":
+            compound += char
+            depth -= 1
+        elif depth == 0 and (char.isspace() or char in ">+~"):
+            if compound:
+                parts.append((combinator, compound))
+                combinator, compound = " ", ""
+            if char in ">+~":
+                combinator = char
+        else:
+            compound += char
+    if compound:
+        parts.append((combinator, compound))
+    return parts
+
+
+def join_selector(parts: list[tuple[str, str]]) -> str:
+    """Inverse of `split_selector`."""
+    css = ""
+    for combinator, compound in parts:
+        if not css:
+            css = compound
+        elif combinator == " ":
+            css += f" {compound}"
+        else:
+            css += f" {combinator} {compound}"
+    return css
+
+
+def _is_bare(compound: str) -> bool:
+    """A compound with nothing but a tag name or the universal selector."""
+    return compound == "*" or compound.replace("-", "").isalnum()
+
+
+def selector_hints(css: str, key: str = "elements") -> list[str]:
+    """
+    Static hints for selector patterns that are slow to match.
+
+    Parameters
+    ----------
+    css: str
+        CSS selector, possibly a selector list.
+    key: str
+        Which selector it is; the page-wide 'elements' selector gets stricter hints than the
+        'time', 'title' and 'link' selectors, which only search inside one performance element.
+
+    Returns
+    -------
+    list[str]
+        Human-readable hints, empty if nothing looks slow.
+    """
+    hints = []
+    for selector in (part.strip() for part in css.split(",")):
+        parts = split_selector(selector)
+        descendants = sum(1 for combinator, _ in parts[1:] if combinator == " ")
+        if descendants >= 2:
+            hints.append(
+                f"'{selector}' is a deep descendant chain ({descendants} levels): every candidate walks up "
+                "its ancestors once per level; keep the most specific compounds or use child combinators (>)"
+            )
+        if key == "elements" and parts and _is_bare(parts[-1][1]):
+            hints.append(
+                f"'{selector}' ends in '{parts[-1][1]}', which is tried against every such tag of the page; "
+                "add a class or an id to it"
+            )
+        for pseudo, reason in _SLOW_PSEUDO_CLASSES.items():
+            if pseudo in selector:
+                hints.append(f"'{selector}': {reason}")
+        if "[class*=" in selector or "[class~=" in selector:
+            hints.append(f"'{selector}': match classes with '.name' instead of [class...] attribute selectors")
+    return hints
+
+
+def rewrite_candidates(css: str) -> list[str]:
+    """
+    Simpler equivalents to try for a selector: leading compounds dropped one by one, and the
+    whole chain with child instead of descendant combinators.
+
+    A bare tag alone is not offered: it only selects the same on the sampled page by accident.
+    """
+    if "," in css:
+        return []
+    parts = split_selector(css)
+    candidates = [join_selector([("", parts[i][1]), *parts[i + 1 :]]) for i in range(1, len(parts))]
+    if any(combinator == " " for combinator, _ in parts[1:]):
+        candidates.append(join_selector([(">" if c == " " else c, compound) for c, compound in parts]))
+    return [
+        candidate
+        for candidate in candidates
+        if candidate != css and not (len(split_selector(candidate)) == 1 and _is_bare(candidate))
+    ]
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Run `function` `repeat` times, return the fastest wall time in milliseconds and the last result."""
+    fastest, result = float("inf"), None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = function()
+        fastest = min(fastest, (time.perf_counter() - started) * 1000)
+    return fastest, result
+
+
+def _same(left: list, right: list) -> bool:
+    # identity, bs4 tags compare equal by their markup
+    return len(left) == len(right) and all(a is b for a, b in zip(left, right))
+
+
+def profile_selectors(theatre: dict, text: str, repeat: int = 3) -> tuple[float, list[SelectorProfile]]:
+    """
+    Time every selector of an HTML theatre on a page.
+
+    Rewrites from `rewrite_candidates` that select the same elements on this page and are at
+    least MIN_SPEEDUP times faster are suggested as hints.
+
+    Parameters
+    ----------
+    theatre: dict
+        Theatre configuration entry with valid selectors.
+    text: str
+        The program page.
+    repeat: int
+        Timing runs per selector, the fastest counts.
+
+    Returns
+    -------
+    tuple[float, list[SelectorProfile]]
+        Milliseconds spent building the document tree and one profile per selector.
+    """
+    compiled = compile_theatre_selectors(theatre)
+    backend = compiled.backend
+    parse_ms, root = best_time(lambda: compiled.parse_document(text), repeat)
+
+    css = theatre["selectors"]
+
+    def run_elements(selector: str) -> list:
+        return compile_selectors(selector, css["time"], css["title"], css["link"], backend).select_elements(root)
+
+    def run_field(selector: str) -> list:
+        compiled_field = compile_selector(selector, backend)
+        return [compiled.select_one(compiled_field, el) for el in elements]
+
+    ms, elements = best_time(lambda: run_elements(css["elements"]), repeat)
+    profiles = [SelectorProfile("elements", css["elements"], len(elements), 0, ms, selector_hints(css["elements"]))]
+    for key in ("time", "title", "link"):
+        ms, found = best_time(lambda: run_field(css[key]), repeat)
+        if key == "link":
+            empty = sum(not compiled.attr(el, "href") for el in found)
+        else:
+            empty = sum(not (compiled.attr(el, "datetime") or compiled.text(el)) for el in found)
+        matches = sum(el is not None for el in found)
+        profiles.append(SelectorProfile(key, css[key], matches, empty, ms, selector_hints(css[key], key)))
+
+    for profile in profiles:
+        run = run_elements if profile.name == "elements" else run_field
+        expected = run(profile.css)
+        faster = []
+        for candidate in rewrite_candidates(profile.css):
+            try:
+                ms, found = best_time(lambda: run(candidate), repeat)
+            except ValueError:
+                continue
+            if _same(found, expected) and ms * MIN_SPEEDUP <= profile.ms:
+                faster.append((ms, candidate))
+        if faster:
+            ms, candidate = min(faster)
+            profile.hints.append(
+                f"'{candidate}' selects the same on this page in {ms:.2f} ms instead of {profile.ms:.2f} ms"
+            )
+    return parse_ms, profiles
+
+
+def _load_page(theatre: dict, cfg: dict, pages: dict[str, Path]) -> tuple[bytes, str | None]:
+    if theatre["name"] in pages:
+        return pages[theatre["name"]].read_bytes(), None
+
+    from monitor.parser.generic_parser import fetch_response
+    from monitor.parser.retry import RetryPolicy
+
+    try:
+        retry_policy = RetryPolicy.from_options(cfg["general"].get("retry"))
+    except (TypeError, ValueError):
+        # reported by check_schema, the runtime falls back to the defaults as well
+        retry_policy = RetryPolicy()
+    r = fetch_response(theatre["program_url"], retry_policy=retry_policy)
+    return r.content, r.encoding if "charset" in r.headers.get("Content-Type", "") else None
+
+
+def _check_records(theatre: dict, cfg: dict, records: list[dict]) -> list[Finding]:
+    name = theatre["name"]
+    findings = []
+    if not records:
+        return [Finding("error", name, "no performances found on the program page")]
+    for key in ("datetime", "title", "link"):
+        empty = sum(1 for record in records if not record.get(key))
+        if empty:
+            findings.append(Finding("warning", name, f"{empty} of {len(records)} performances have no {key}"))
+    formats = tuple(theatre.get("datetime_formats") or ())
+    if theatre.get("time_parseable") or formats:
+        tz = theatre.get("timezone", cfg["general"].get("timezone", DEFAULT_TIMEZONE))
+        starts = [Performance.from_raw(record, tz=tz, formats=formats).start for record in records]
+        unparsed = sum(1 for start, record in zip(starts, records) if start is None and record.get("datetime"))
+        if unparsed:
+            findings.append(Finding("warning", name, f"{unparsed} datetimes could not be parsed"))
+    return findings
+
+
+def check_theatre(
+    theatre: dict, cfg: dict, pages: dict[str, Path], repeat: int = 3
+) -> tuple[list[Finding], list[SelectorProfile], str]:
+    """
+    Dry-run one theatre against its live or recorded program page, without notifying.
+
+    Returns
+    -------
+    tuple[list[Finding], list[SelectorProfile], str]
+        Findings, selector profiles (HTML sources only) and a one-line summary of the page.
+    """
+    name = theatre["name"]
+    try:
+        content, encoding = _load_page(theatre, cfg, pages)
+    except Exception as e:
+        return [Finding("error", name, f"cannot load the program page: {e}")], [], "-"
+
+    source = theatre.get("source") or {}
+    if source.get("type", HTML_SOURCE) != HTML_SOURCE:
+        adapter = create_adapter(source)
+        try:
+            ms, records = best_time(lambda: adapter.parse(content, theatre["program_url"], encoding), repeat)
+        except Exception as e:
+            return [Finding("error", name, f"{adapter.name} source failed: {e}")], [], "-"
+        return _check_records(theatre, cfg, records), [], f"{len(content) / 1024:.0f} KB, {adapter.name} {ms:.2f} ms"
+
+    text = content.decode(encoding or "utf-8", errors="replace")
+    parse_ms, profiles = profile_selectors(theatre, text, repeat)
+    compiled = compile_theatre_selectors(theatre)
+    records = [compiled.extract(el) for el in compiled.select_elements(compiled.parse_document(text))]
+    findings = _check_records(theatre, cfg, records)
+    for profile in profiles:
+        if profile.name != "elements" and records and not profile.matches:
+            findings.append(Finding("error", name, f"'{profile.name}' selector '{profile.css}' matches nothing"))
+        if profile.ms > SLOW_SELECTOR_MS:
+            findings.append(Finding("warning", name, f"'{profile.name}' selector takes {profile.ms:.1f} ms"))
+    summary = f"{len(content) / 1024:.0f} KB, {compiled.backend} tree built in {parse_ms:.2f} ms"
+    return findings, profiles, summary
+
+
+def _print_profiles(profiles: list[SelectorProfile]) -> None:
+    rows = [["selector", "css", "matches", "empty", "ms"]]
+    rows += [[p.name, p.css, str(p.matches), str(p.empty), f"{p.ms:.2f}"] for p in profiles]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  " + "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+    for profile in profiles:
+        for hint in profile.hints:
+            print(f"  hint ({profile.name}): {hint}")
+
+
+def run_check(cfg: dict, pages: dict[str, Path] | None = None, repeat: int = 3) -> int:
+    """
+    Validate a configuration and dry-run every theatre, printing a report.
+
+    Args:
+        cfg (dict): Configuration that passed `validate_config`.
+        pages (dict[str, Path] | None): Recorded program pages by theatre name; other theatres are fetched live.
+        repeat (int): Timing runs per selector.
+
+    Returns:
+        int: Exit status, 1 if any error was found.
+    """
+    findings = check_schema(cfg)
+    invalid = {finding.subject for finding in findings if finding.level == "error"}
+    for theatre in cfg.get("theatres") or []:
+        if theatre["name"] in invalid:
+            continue
+        theatre_findings, profiles, summary = check_theatre(theatre, cfg, pages or {}, repeat)
+        print(f"{theatre['name']} ({summary})")
+        if profiles:
+            _print_profiles(profiles)
+        findings.extend(theatre_findings)
+
+    for finding in findings:
+        print(f"{finding.level}: {finding.subject}: {finding.message}")
+    errors = sum(finding.level == "error" for finding in findings)
+    print(f"{errors} errors, {len(findings) - errors} warnings")
+    return 1 if errors else 0
@@ -0,0 +1,280 @@
+import os
+import random
+import signal
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from types import FrameType
+
+from monitor.notifier.queue import TelegramSendQueue
+from monitor.notifier.rendering import RenderCache
+from monitor.notifier.subscriptions import SubscriptionIndex, load_subscriptions
+from monitor.parser.sharding import WorkerPool, select_shard
+from monitor.parser.throttle import HostThrottle
+from monitor.pipeline import run_once
+from monitor.storage.archive import Archive
+from monitor.storage.state import StateStore
+from monitor.utils.http import configure_http
+from monitor.utils.load_cfg import DEFAULT_CONFIG_PATH, index_theatres, load_config
+from monitor.utils.logger import configure_logging, logger
+from monitor.utils.metrics import (
+    configure_metrics,
+    start_metrics_server,
+    write_prometheus_file,
+)
+
+DEFAULT_INTERVAL = 60
+DEFAULT_JITTER = 5
+CONFIG_POLL_INTERVAL = 5
+COMPACT_INTERVAL = 3600
+
+
+class Daemon:
+    """
+    Long-running scheduler that checks every theatre on its own interval.
+
+    The HTTP session, compiled selectors, per-host throttle, state store and, with
+    `general.processes` > 1, the worker processes stay warm between runs. The configuration file is polled for changes and reloaded in place;
+    an invalid new configuration is logged and the previous one is kept.
+    """
+
+    def __init__(
+        self,
+        bot_token: str,
+        chat_id: str | None,
+        config_path: Path | None = None,
+        shard: tuple[int, int] | None = None,
+    ) -> None:
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.config_path = Path(config_path or DEFAULT_CONFIG_PATH)
+        self.shard = shard
+        self.stop_event = threading.Event()
+        self.throttle = HostThrottle()
+        self.cfg: dict = {}
+        self.store: StateStore | None = None
+        self.archive: Archive | None = None
+        self.metrics_server: ThreadingHTTPServer | None = None
+        self.queue: TelegramSendQueue | None = None
+        self.workers: WorkerPool | None = None
+        self.subscriptions = SubscriptionIndex([])
+        self.renders = RenderCache()
+        # latest performances of every theatre, so a due digest covers theatres parsed in earlier runs
+        self.latest: dict = {}
+        self.next_run: dict[str, float] = {}
+        self._config_mtime: int | None = None
+        self._last_compact = time.monotonic()
+
+    def _interval(self, theatre: dict, cfg: dict | None = None) -> float:
+        general = (cfg or self.cfg).get("general", {})
+        return theatre.get("interval", general.get("interval", DEFAULT_INTERVAL))
+
+    def _jitter(self) -> float:
+        return random.uniform(0, self.cfg.get("general", {}).get("jitter", DEFAULT_JITTER))
+
+    def reload_config(self, force: bool = False) -> bool:
+        """
+        Load the configuration file if it changed since the last load.
+
+        Parameters
+        ----------
+        force: bool
+            Reload even if the file modification time did not change.
+
+        Returns
+        -------
+        bool
+            True if a new configuration was applied.
+        """
+        try:
+            mtime = self.config_path.stat().st_mtime_ns
+        except OSError as e:
+            logger.error(f"Cannot stat config file {self.config_path}: {e}")
+            return False
+
+        if not force and mtime == self._config_mtime:
+            return False
+        self._config_mtime = mtime
+
+        try:
+            new_cfg = load_config(self.config_path)
+            if self.shard is not None:
+                new_cfg = {**new_cfg, "theatres": select_shard(new_cfg.get("theatres", []), *self.shard)}
+            subscriptions = SubscriptionIndex(load_subscriptions(new_cfg, self.chat_id))
+            if not len(subscriptions):
+                raise ValueError("no subscriptions configured and CHAT_ID is not set")
+        except Exception as e:
+            logger.error(f"Keeping previous configuration, failed to load {self.config_path}: {e}")
+            return False
+
+        old_cfg, self.cfg = self.cfg, new_cfg
+        self.subscriptions = subscriptions
+        self._apply_general(old_cfg, new_cfg)
+
+        now = time.monotonic()
+        old_theatres = index_theatres(old_cfg)
+        next_run = {}
+        for theatre in new_cfg.get("theatres", []):
+            name = theatre.get("name")
+            old = old_theatres.get(name)
+            if old is not None and name in self.next_run and self._interval(old, old_cfg) == self._interval(theatre):
+                next_run[name] = self.next_run[name]
+            else:
+                next_run[name] = now + self._jitter()
+        self.next_run = next_run
+        self.latest = {name: shows for name, shows in self.latest.items() if name in next_run}
+
+        logger.info(f"Loaded configuration with {len(next_run)} theatres from {self.config_path}")
+        return True
+
+    def _apply_general(self, old_cfg: dict, new_cfg: dict) -> None:
+        """Reconfigure the components whose section of `general` changed (all of them on the first load)."""
+        old_general, new_general = old_cfg.get("general", {}), new_cfg.get("general", {})
+
+        if not old_cfg or old_general.get("logging") != new_general.get("logging"):
+            configure_logging(new_general.get("logging"))
+
+        if not old_cfg or old_general.get("http") != new_general.get("http"):
+            configure_http(new_general.get("http"))
+
+        processes = new_general.get("processes", 1)
+        if (
+            not old_cfg
+            or old_general.get("processes", 1) != processes
+            or old_general.get("http") != new_general.get("http")
+        ):
+            # workers configure their session when they start
+            if self.workers is not None:
+                self.workers.close()
+            self.workers = WorkerPool(processes, new_general) if processes > 1 else None
+
+        if not old_cfg or old_general.get("metrics") != new_general.get("metrics"):
+            registry = configure_metrics(new_general.get("metrics"))
+            port = registry.options["prometheus_port"]
+            if registry.enabled and port is not None and self.metrics_server is None:
+                self.metrics_server = start_metrics_server(int(port))
+
+        if not old_cfg or old_general.get("telegram") != new_general.get("telegram"):
+            self.queue = TelegramSendQueue(self.bot_token, new_general.get("telegram"))
+
+        if not old_cfg or old_general.get("render") != new_general.get("render"):
+            self.renders = RenderCache(new_general.get("render"))
+
+        if not old_cfg or old_general.get("state") != new_general.get("state"):
+            if self.store is not None:
+                self.store.close()
+            self.store = StateStore.from_config(new_cfg)
+            # deliveries recorded against the previous store must be diffed again
+            self.renders.forget()
+
+        if not old_cfg or old_general.get("archive") != new_general.get("archive"):
+            if self.archive is not None:
+                self.archive.close()
+            self.archive = Archive.from_config(new_cfg)
+
+    def run_due(self, now: float | None = None) -> list[str]:
+        """
+        Run all theatres whose next run time has passed and schedule their next run.
+
+        Parameters
+        ----------
+        now: float | None
+            Current monotonic time, defaults to time.monotonic().
+
+        Returns
+        -------
+        list[str]
+            Names of the theatres that were run.
+        """
+        now = time.monotonic() if now is None else now
+        due = [th for th in self.cfg.get("theatres", []) if self.next_run.get(th.get("name"), now) <= now]
+        if not due:
+            return []
+
+        names = [th.get("name") for th in due]
+        logger.info(f"Running theatres: {', '.join(map(str, names))}")
+        try:
+            run_once(
+                self.cfg,
+                self.store,
+                self.bot_token,
+                self.chat_id,
+                throttle=self.throttle,
+                queue=self.queue,
+                subscriptions=self.subscriptions,
+                renders=self.renders,
+                archive=self.archive,
+                theatres=due,
+                latest=self.latest,
+                workers=self.workers,
+            )
+        except Exception as e:
+            logger.error(f"Error during scheduled run: {e}")
+        write_prometheus_file()
+
+        finished = time.monotonic()
+        for theatre in due:
+            self.next_run[theatre.get("name")] = finished + self._interval(theatre) + self._jitter()
+
+        return names
+
+    def _sleep_time(self) -> float:
+        if not self.next_run:
+            return CONFIG_POLL_INTERVAL
+        return max(0.0, min(min(self.next_run.values()) - time.monotonic(), CONFIG_POLL_INTERVAL))
+
+    def stop(self, signum: int | None = None, frame: FrameType | None = None) -> None:
+        """Request a graceful shutdown after the current run."""
+        if signum is not None:
+            logger.info(f"Received signal {signal.Signals(signum).name}, shutting down")
+        self.stop_event.set()
+
+    def run(self) -> None:
+        """Run the scheduler until `stop` is called."""
+        self.reload_config(force=True)
+        if not self.cfg:
+            raise RuntimeError(f"Cannot start daemon without a valid configuration in {self.config_path}")
+
+        logger.info("Daemon started")
+        try:
+            while not self.stop_event.is_set():
+                self.reload_config()
+                self.run_due()
+
+                if time.monotonic() - self._last_compact >= COMPACT_INTERVAL:
+                    if self.store is not None:
+                        logger.info(f"State compaction removed {self.store.compact()} past performances")
+                    if self.archive is not None:
+                        pruned, compacted = self.archive.prune(), self.archive.compact()
+                        logger.info(f"Archive retention removed {pruned} scrapes and shows, compaction {compacted}")
+                    self._last_compact = time.monotonic()
+
+                self.stop_event.wait(self._sleep_time())
+        finally:
+            if self.workers is not None:
+                self.workers.close()
+            if self.store is not None:
+                self.store.close()
+            if self.archive is not None:
+                self.archive.close()
+            if self.metrics_server is not None:
+                self.metrics_server.shutdown()
+            logger.info("Daemon stopped")
+
+
+def run_daemon(config_path: Path | None = None, shard: tuple[int, int] | None = None) -> None:
+    """
+    Run the daemon with SIGTERM/SIGINT handlers for graceful shutdown.
+
+    Parameters
+    ----------
+    config_path: Path | None
+        Configuration file to watch, defaults to the packaged theatres_cfg.yaml.
+    shard: tuple[int, int] | None
+        0-based (index, count) of the theatre shard this daemon handles; all theatres if None.
+    """
+    daemon = Daemon(os.environ["BOT_ID"], os.environ.get("CHAT_ID"), config_path=config_path, shard=shard)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.run()
@@ -1 +1,10 @@
-from monitor.notifier.tg_send_message import send_telegram_message  # noqa: F401
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # imported on first use, so formatting and subscriptions do not import requests
+    if name == "send_telegram_message":
+        from monitor.notifier.tg_send_message import send_telegram_message
+
+        return send_telegram_message
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,126 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from monitor.parser.performance import DEFAULT_TIMEZONE, get_zone
+
+DAY = 86400
+
+DEFAULT_DIGEST_OPTIONS: dict = {
+    "enabled": False,
+    # seconds, or "hourly" / "daily"; must divide a day
+    "window": "hourly",
+    # local time the windows are aligned to, e.g. "09:00" for a daily digest at nine
+    "at": "00:00",
+    # ["22:00", "08:00"]: no digests in between, changes wait for the end of the quiet hours
+    "quiet_hours": None,
+    # defaults to general.timezone
+    "timezone": None,
+}
+
+WINDOW_ALIASES = {"hourly": 3600, "daily": DAY}
+
+
+def _parse_clock(value: str) -> int:
+    """Seconds after midnight of an "HH:MM" local time."""
+    try:
+        hours, minutes = (int(part) for part in str(value).split(":"))
+    except ValueError:
+        hours = minutes = -1
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time of day '{value}', expected HH:MM")
+    return hours * 3600 + minutes * 60
+
+
+@dataclass(frozen=True)
+class DigestSchedule:
+    """
+    When a chat in digest mode receives its changes.
+
+    Changes are delivered once per window: windows start every `window` seconds from
+    the local time `offset` (seconds after midnight) in `timezone`, and a chat is due
+    on the first run after a window start it has not been checked in yet. During the
+    quiet hours (`quiet_from` to `quiet_to`, may wrap midnight) no chat is due, so the
+    changes of windows starting then go out when the quiet hours end.
+    """
+
+    window: int = 3600
+    offset: int = 0
+    quiet_from: int | None = None
+    quiet_to: int | None = None
+    timezone: str = DEFAULT_TIMEZONE
+
+    @classmethod
+    def from_options(cls, options: dict | None, timezone: str = DEFAULT_TIMEZONE) -> "DigestSchedule | None":
+        """
+        Build a schedule from a `digest` configuration section.
+
+        Parameters
+        ----------
+        options: dict | None
+            The `digest` section of `general` or of a subscription.
+        timezone: str
+            Timezone used when the section has none, i.e. `general.timezone`.
+
+        Returns
+        -------
+        DigestSchedule | None
+            The schedule, or None if digests are disabled and changes are sent right away.
+
+        Raises
+        ------
+        ValueError
+            If the window is not a whole number of seconds dividing a day or a time of day is invalid.
+        """
+        options = {**DEFAULT_DIGEST_OPTIONS, **(options or {})}
+        if not options["enabled"]:
+            return None
+
+        window = WINDOW_ALIASES.get(options["window"], options["window"])
+        if not isinstance(window, int) or isinstance(window, bool) or window < 1 or DAY % window:
+            raise ValueError(
+                f"Invalid digest window '{options['window']}', expected hourly, daily or whole seconds dividing a day"
+            )
+
+        quiet = options["quiet_hours"] or (None, None)
+        if len(quiet) != 2:
+            raise ValueError(f"Invalid quiet hours {quiet}, expected [from, to]")
+        tz = options["timezone"] or timezone
+        get_zone(tz)
+        return cls(
+            window=window,
+            offset=_parse_clock(options["at"]) % window,
+            quiet_from=_parse_clock(quiet[0]) if quiet[0] is not None else None,
+            quiet_to=_parse_clock(quiet[1]) if quiet[1] is not None else None,
+            timezone=tz,
+        )
+
+    def _local(self, now: float) -> tuple[datetime, float]:
+        local = datetime.fromtimestamp(now, get_zone(self.timezone))
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight, (local - midnight).total_seconds()
+
+    def window_start(self, now: float) -> float:
+        """UNIX timestamp of the start of the window `now` falls in."""
+        midnight, seconds = self._local(now)
+        periods = math.floor((seconds - self.offset) / self.window)
+        return (midnight + timedelta(seconds=self.offset + periods * self.window)).timestamp()
+
+    def is_quiet(self, now: float) -> bool:
+        """Whether `now` is within the quiet hours."""
+        if self.quiet_from is None or self.quiet_to is None or self.quiet_from == self.quiet_to:
+            return False
+        _, seconds = self._local(now)
+        if self.quiet_from < self.quiet_to:
+            return self.quiet_from <= seconds < self.quiet_to
+        return seconds >= self.quiet_from or seconds < self.quiet_to
+
+    def is_due(self, last_check: float | None, now: float) -> bool:
+        """
+        Whether the changes of a chat last checked at `last_check` are delivered now.
+
+        A chat that was never checked is due right away, outside the quiet hours.
+        """
+        if self.is_quiet(now):
+            return False
+        return last_check is None or last_check < self.window_start(now)
@@ -0,0 +1,83 @@
+from html import escape
+
+from monitor.parser.performance import (
+    DEFAULT_TIMEZONE,
+    Performance,
+    as_performance,
+    get_zone,
+)
+from monitor.storage.state import Diff
+
+
+def format_theatre_schedule_html(
+    items: list[Performance | dict], tz: str = DEFAULT_TIMEZONE, dt_parsable: bool = False
+) -> str:
+    """
+    Format theatre schedule into a Telegram-ready HTML string.
+    Each play is bold, shows are sorted by date ascending,
+    and links are proper <a href="">. Titles, raw datetimes and links are HTML-escaped.
+
+    Args:
+        items (list[Performance | dict]): Shows; raw records with 'title', 'datetime' and 'link' are converted.
+            Shows with a parsed start are sorted chronologically, the others by their raw datetime text.
+        tz (str): Timezone for datetime conversion.
+        dt_parsable (bool): Whether the datetime strings of raw records are ISO 8601 parseable.
+
+    Returns:
+        str: Formatted HTML string.
+    """
+    zone = get_zone(tz)
+    performances = [as_performance(it, tz=tz, parse_datetime=dt_parsable) for it in items]
+    keys = [(0, p.start.timestamp(), "") if p.start is not None else (1, 0.0, p.datetime or "") for p in performances]
+
+    # programs are usually listed chronologically already: group in the same pass and
+    # only sort when a show is out of order
+    grouped: dict[str, list[Performance]] = {}
+    in_order = True
+    for i, p in enumerate(performances):
+        if i and keys[i] < keys[i - 1]:
+            in_order = False
+            break
+        grouped.setdefault(p.title, []).append(p)
+    if not in_order:
+        grouped = {}
+        for _, p in sorted(zip(keys, performances), key=lambda pair: pair[0]):
+            grouped.setdefault(p.title, []).append(p)
+
+    lines = []
+    for title, shows in grouped.items():
+        lines.append(f"<b>{escape(title, quote=False)}</b>")
+        for s in shows:
+            if s.start is not None:
+                date_str = s.start.astimezone(zone).strftime("%a, %d %b %H:%M")
+            else:
+                date_str = escape(s.datetime or "", quote=False)
+
+            if s.link:
+                lines.append(f'- {date_str} → <a href="{escape(s.link)}">Detail</a>')
+            else:
+                lines.append(f"- {date_str}")
+        lines.append("")
+
+    return "\n".join(lines).strip()
+
+
+def format_changes_html(diff: Diff, tz: str = DEFAULT_TIMEZONE, dt_parsable: bool = False) -> str:
+    """
+    Format schedule changes into a Telegram-ready HTML string.
+    Each non-empty section (new, changed, removed) is rendered with format_theatre_schedule_html.
+
+    Args:
+        diff (Diff): Changes detected by the state store.
+        tz (str): Timezone for datetime conversion.
+        dt_parsable (bool): Whether the datetime strings are ISO 8601 parseable.
+
+    Returns:
+        str: Formatted HTML string.
+    """
+    sections = []
+    for header, items in (("New", diff.added), ("Changed", diff.changed), ("Removed", diff.removed)):
+        if items:
+            sections.append(f"<i>{header}</i>\n" + format_theatre_schedule_html(items, tz=tz, dt_parsable=dt_parsable))
+
+    return "\n\n".join(sections)
@@ -0,0 +1,296 @@
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Hashable
+
+import requests
+
+from monitor.notifier.tg_send_message import post_telegram_message
+from monitor.utils.logger import logger
+from monitor.utils.metrics import metrics
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# delivery latencies kept in `stats` for the recent flushes; the full distribution is a metrics histogram
+LATENCY_SAMPLE_SIZE = 1000
+
+DEFAULT_TELEGRAM_OPTIONS: dict = {
+    # Telegram allows about 20 messages per minute into one group and 30 per second overall
+    "per_chat_interval": 3.0,
+    "global_rate": 30,
+    "max_retries": 5,
+    "backoff_time": 1.0,
+    "coalesce": True,
+    "api_url": None,
+}
+
+_TAG_RE = re.compile(r"(<[^>]+>)")
+_TAG_NAME_RE = re.compile(r"</?\s*([a-zA-Z0-9-]+)")
+
+
+def _split_long_line(line: str, limit: int) -> list[str]:
+    """Split one line at spaces outside tags, closing and reopening tags that span the split."""
+    chunks: list[str] = []
+    open_tags: list[tuple[str, str]] = []
+    current = ""
+    has_text = False
+
+    def closing() -> str:
+        return "".join(f"</{name}>" for name, _ in reversed(open_tags))
+
+    def emit() -> None:
+        nonlocal current, has_text
+        if has_text:
+            chunks.append(current.rstrip() + closing())
+        current = "".join(tag for _, tag in open_tags)
+        has_text = False
+
+    for token in _TAG_RE.split(line):
+        if not token:
+            continue
+        if token.startswith("<"):
+            if has_text and len(current) + len(token) + len(closing()) > limit:
+                emit()
+            current += token
+            name_match = _TAG_NAME_RE.match(token)
+            if name_match:
+                name = name_match.group(1).lower()
+                if token.startswith("</"):
+                    if open_tags and open_tags[-1][0] == name:
+                        open_tags.pop()
+                elif not token.endswith("/>"):
+                    open_tags.append((name, token))
+            continue
+
+        for word in re.split(r"(\s+)", token):
+            while word:
+                room = limit - len(current) - len(closing())
+                if len(word) <= room:
+                    current += word
+                    has_text = has_text or not word.isspace()
+                    break
+                if word.isspace():
+                    break
+                if has_text and len(word) <= limit // 2:
+                    emit()
+                    continue
+                cut = max(room, 1)
+                current += word[:cut]
+                has_text = True
+                word = word[cut:]
+                emit()
+
+    if has_text:
+        chunks.append(current.rstrip() + closing())
+    return chunks
+
+
+def split_html_message(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """
+    Split an HTML message into parts that fit Telegram's message length limit.
+
+    Parts are cut at line breaks, so the per-line markup produced by
+    format_theatre_schedule_html always stays balanced; a single line that is
+    longer than the limit is cut at a space and its open tags are closed and reopened.
+
+    Parameters
+    ----------
+    text: str
+        HTML message.
+    limit: int
+        Maximum length of a part.
+
+    Returns
+    -------
+    list[str]
+        Message parts in order.
+    """
+    if len(text) <= limit:
+        return [text]
+
+    parts: list[str] = []
+    current: list[str] = []
+    current_len = 0
+    for line in text.split("\n"):
+        pieces = [line] if len(line) <= limit else _split_long_line(line, limit)
+        for piece in pieces:
+            added = len(piece) + (1 if current else 0)
+            if current and current_len + added > limit:
+                parts.append("\n".join(current).strip("\n"))
+                current, current_len = [], 0
+                added = len(piece)
+            current.append(piece)
+            current_len += added
+
+    if current:
+        parts.append("\n".join(current).strip("\n"))
+    return [part for part in parts if part]
+
+
+@dataclass
+class _Pending:
+    key: Hashable
+    chat_id: str
+    text: str
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TelegramSendQueue:
+    """
+    Outbound queue of Telegram messages.
+
+    Messages are coalesced per chat into as few API calls as the 4096-character limit
+    allows, long messages are split at safe boundaries, and sends are paced per chat and
+    globally. 429 responses are retried after `retry_after`, 5xx responses and network
+    errors with exponential backoff; failures are logged and reported by `flush`.
+    """
+
+    def __init__(self, bot_token: str, options: dict | None = None) -> None:
+        self.bot_token = bot_token
+        self.options = {**DEFAULT_TELEGRAM_OPTIONS, **(options or {})}
+        self._pending: deque[_Pending] = deque()
+        self._lock = threading.Lock()
+        self._last_chat_send: dict[str, float] = {}
+        self._last_send = 0.0
+        self.stats: dict = {"sent": 0, "failed": 0, "retries": 0, "latencies": deque(maxlen=LATENCY_SAMPLE_SIZE)}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, chat_id: str, text: str, key: Hashable = None) -> None:
+        """
+        Add a message to the queue.
+
+        Parameters
+        ----------
+        chat_id: str
+            Target chat.
+        text: str
+            HTML message.
+        key: Hashable
+            Identifier reported back by `flush` once the whole message was delivered.
+        """
+        with self._lock:
+            self._pending.append(_Pending(key=key, chat_id=chat_id, text=text))
+
+    def _batches(self, items: list[_Pending]) -> list[tuple[str, str, list[_Pending]]]:
+        """Group pending items into (chat_id, text, items) API calls."""
+        limit = TELEGRAM_MESSAGE_LIMIT
+        batches: list[tuple[str, str, list[_Pending]]] = []
+        open_batch: dict[str, tuple[list[str], list[_Pending]]] = {}
+
+        def close(chat_id: str) -> None:
+            texts, members = open_batch.pop(chat_id)
+            batches.append((chat_id, "\n\n".join(texts), members))
+
+        for item in items:
+            for part in split_html_message(item.text, limit):
+                if item.chat_id in open_batch:
+                    texts, members = open_batch[item.chat_id]
+                    fits = sum(len(t) + 2 for t in texts) + len(part) <= limit
+                    if self.options["coalesce"] and fits:
+                        texts.append(part)
+                        if members[-1] is not item:
+                            members.append(item)
+                        continue
+                    close(item.chat_id)
+                open_batch[item.chat_id] = ([part], [item])
+                if not self.options["coalesce"]:
+                    close(item.chat_id)
+
+        for chat_id in list(open_batch):
+            close(chat_id)
+        return batches
+
+    def _pace(self, chat_id: str) -> None:
+        now = time.monotonic()
+        wait = 0.0
+        if chat_id in self._last_chat_send:
+            wait = self._last_chat_send[chat_id] + self.options["per_chat_interval"] - now
+        if self.options["global_rate"]:
+            wait = max(wait, self._last_send + 1.0 / self.options["global_rate"] - now)
+        if wait > 0:
+            time.sleep(wait)
+
+    def _send(self, chat_id: str, text: str) -> bool:
+        """Send one API call with retries; return True on success."""
+        for attempt in range(self.options["max_retries"] + 1):
+            self._pace(chat_id)
+            try:
+                with metrics.span("send"):
+                    response = post_telegram_message(self.bot_token, chat_id, text, api_url=self.options["api_url"])
+                payload = response.json() if response.content else {}
+                status = response.status_code
+            except (requests.RequestException, ValueError) as e:
+                payload, status = {"description": str(e)}, None
+            finally:
+                self._last_send = self._last_chat_send[chat_id] = time.monotonic()
+
+            if status == 200 and payload.get("ok", False):
+                metrics.inc("monitor_telegram_messages_total", outcome="sent")
+                return True
+
+            if status == 429:
+                retry_after = payload.get("parameters", {}).get("retry_after")
+                delay = float(retry_after if retry_after is not None else self.options["backoff_time"])
+            elif status is None or status >= 500:
+                delay = self.options["backoff_time"] * 2**attempt
+            else:
+                logger.error(f"Telegram rejected message to chat {chat_id} ({status}): {payload.get('description')}")
+                metrics.inc("monitor_telegram_messages_total", outcome="rejected")
+                return False
+
+            if attempt < self.options["max_retries"]:
+                self.stats["retries"] += 1
+                metrics.inc("monitor_telegram_retries_total", status=status or "error")
+                logger.warning(
+                    f"Telegram send to chat {chat_id} failed ({status or payload.get('description')}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+        logger.error(f"Giving up sending message to chat {chat_id} after {self.options['max_retries']} retries")
+        metrics.inc("monitor_telegram_messages_total", outcome="failed")
+        return False
+
+    def flush(self) -> dict:
+        """
+        Send everything that is queued.
+
+        Returns
+        -------
+        dict
+            Message key -> True if all of its parts were delivered, False otherwise.
+        """
+        with self._lock:
+            items = list(self._pending)
+            self._pending.clear()
+
+        retries_before = self.stats["retries"]
+        counts = {"sent": 0, "failed": 0}
+        latencies: list[float] = []
+        delivered: dict = {}
+        for chat_id, text, members in self._batches(items):
+            ok = self._send(chat_id, text)
+            sent_at = time.monotonic()
+            counts["sent" if ok else "failed"] += 1
+            for item in members:
+                delivered[item.key] = delivered.get(item.key, True) and ok
+                if ok:
+                    latencies.append(sent_at - item.enqueued_at)
+                    metrics.observe("monitor_telegram_delivery_seconds", sent_at - item.enqueued_at)
+
+        for key, value in counts.items():
+            self.stats[key] += value
+        self.stats["latencies"].extend(latencies)
+        if items:
+            latencies = sorted(latencies) or [0.0]
+            logger.info(
+                f"Telegram queue flushed {len(items)} messages in {counts['sent']} calls "
+                f"(failed: {counts['failed']}, retries: {self.stats['retries'] - retries_before}, "
+                f"queue depth: {len(items)}, "
+                f"p50 latency: {latencies[len(latencies) // 2]:.2f}s, max latency: {latencies[-1]:.2f}s)"
+            )
+        return delivered
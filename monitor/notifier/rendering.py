@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable
+
+from monitor.parser.performance import DEFAULT_TIMEZONE, Performance, as_performance
+
+DEFAULT_RENDER_OPTIONS: dict = {
+    # rendered messages kept in memory, keyed by the content hash of their shows
+    "cache_size": 256,
+}
+
+
+def content_hash(
+    *sections: Iterable[Performance | dict], tz: str = DEFAULT_TIMEZONE, dt_parsable: bool = False
+) -> str:
+    """
+    Return a digest of everything a rendered message depends on.
+
+    Parameters
+    ----------
+    sections: Iterable[Performance | dict]
+        Show lists in message order (a schedule, or the added, changed and removed shows).
+    tz: str
+        Timezone the message is rendered in.
+    dt_parsable: bool
+        Whether raw datetimes are ISO 8601 parseable.
+
+    Returns
+    -------
+    str
+        Hex digest, equal for messages that would render identically.
+    """
+    h = hashlib.blake2b(f"{tz}\x1f{dt_parsable}".encode("utf-8"), digest_size=16)
+    for shows in sections:
+        h.update(b"\x1d")
+        for item in shows:
+            p = as_performance(item, tz=tz, parse_datetime=dt_parsable)
+            h.update(f"\x1e{p.title}\x1f{p.datetime}\x1f{p.link}\x1f{p.timestamp}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    Memoizes rendered messages and remembers what each recipient already received.
+
+    Messages are cached by content hash (LRU, `cache_size` entries), so identical show lists,
+    e.g. the same theatre for subscribers with the same filters, are formatted once. The
+    digest of the last delivered message per state key lets the pipeline skip theatres whose
+    shows did not change since, without formatting, diffing or sending anything.
+    """
+
+    def __init__(self, options: dict | None = None) -> None:
+        self.options = {**DEFAULT_RENDER_OPTIONS, **(options or {})}
+        self._messages: OrderedDict[str, str] = OrderedDict()
+        self._delivered: dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    def render(self, digest: str, build: Callable[[], str]) -> str:
+        """Return the cached message of a digest, building and caching it if needed."""
+        with self._lock:
+            if digest in self._messages:
+                self._messages.move_to_end(digest)
+                return self._messages[digest]
+
+        message = build()
+        with self._lock:
+            self._messages[digest] = message
+            while len(self._messages) > max(0, self.options["cache_size"]):
+                self._messages.popitem(last=False)
+        return message
+
+    def is_delivered(self, key: Hashable, digest: str) -> bool:
+        """Check whether `key` was last delivered the content with this digest."""
+        return self._delivered.get(key) == digest
+
+    def mark_delivered(self, key: Hashable, digest: str) -> None:
+        self._delivered[key] = digest
+
+    def forget(self, key: Hashable | None = None) -> None:
+        """Forget deliveries of one key, or of all keys, so they are sent again."""
+        if key is None:
+            self._delivered.clear()
+        else:
+            self._delivered.pop(key, None)
@@ -0,0 +1,179 @@
+import re
+import time
+from dataclasses import dataclass
+
+from monitor.notifier.digest import DigestSchedule
+from monitor.parser.performance import DEFAULT_TIMEZONE, as_performance
+
+DAY = 86400
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """
+    A chat subscribed to a set of theatres, optionally filtered by title and date window.
+
+    `title_re` is the subscriber's title patterns compiled once into a single alternation.
+    The date window is given in days relative to now; performances whose datetime cannot
+    be parsed always pass it. With a `digest` schedule the chat's changes are collected and
+    delivered once per digest window instead of on every run.
+    """
+
+    chat_id: str
+    theatres: frozenset[str] | None = None
+    title_re: re.Pattern | None = None
+    days_from: float | None = None
+    days_to: float | None = None
+    default: bool = False
+    digest: DigestSchedule | None = None
+
+    def state_key(self, theatre: str) -> str:
+        """Return the state store key of a theatre as seen by this subscriber."""
+        if self.default:
+            return theatre
+        return f"{self.chat_id}:{theatre}"
+
+    def covers_from(self, now: float) -> float:
+        """Return the earliest start the subscriber's schedule covers: now, or the start of its date window."""
+        if self.days_from is None:
+            return now
+        return max(now, now + self.days_from * DAY)
+
+    def matches(self, title: str, start: float | None, now: float) -> bool:
+        """Check a performance against the title and date filters."""
+        if self.title_re is not None and not self.title_re.search(title or ""):
+            return False
+        if start is not None:
+            if self.days_from is not None and start < now + self.days_from * DAY:
+                return False
+            if self.days_to is not None and start > now + self.days_to * DAY:
+                return False
+        return True
+
+
+def compile_subscription(entry: dict, timezone: str = DEFAULT_TIMEZONE) -> Subscription:
+    """
+    Compile a `subscriptions` configuration entry.
+
+    Parameters
+    ----------
+    entry: dict
+        Entry with 'chat_id' and optional 'theatres', 'title_patterns', 'date_window'
+        ('from_days', 'to_days') and 'digest' (see DigestSchedule.from_options).
+    timezone: str
+        Timezone of the digest schedule when it has none.
+
+    Returns
+    -------
+    Subscription
+        Compiled subscription.
+
+    Raises
+    ------
+    ValueError
+        If 'chat_id' is missing, a title pattern is not a valid regular expression or the
+        digest options are invalid.
+    """
+    if not entry.get("chat_id"):
+        raise ValueError(f"Subscription without chat_id: {entry}")
+
+    patterns = entry.get("title_patterns") or []
+    try:
+        title_re = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+    except re.error as e:
+        raise ValueError(f"Invalid title pattern for chat {entry['chat_id']}: {e}") from e
+
+    window = entry.get("date_window") or {}
+    theatres = entry.get("theatres")
+    return Subscription(
+        chat_id=str(entry["chat_id"]),
+        theatres=frozenset(theatres) if theatres else None,
+        title_re=title_re,
+        days_from=window.get("from_days"),
+        days_to=window.get("to_days"),
+        digest=DigestSchedule.from_options(entry.get("digest"), timezone),
+    )
+
+
+def load_subscriptions(cfg: dict, default_chat_id: str | None = None) -> list[Subscription]:
+    """
+    Build the subscriptions of a configuration.
+
+    Without a `subscriptions` section the default chat (CHAT_ID) receives every theatre
+    unfiltered, and its change-detection state is keyed by theatre name only. A subscription's
+    `digest` section overrides options of `general.digest`.
+
+    Parameters
+    ----------
+    cfg: dict
+        Configuration dictionary.
+    default_chat_id: str | None
+        Chat ID used when no subscriptions are configured.
+
+    Returns
+    -------
+    list[Subscription]
+        Compiled subscriptions.
+    """
+    general = cfg.get("general") or {}
+    timezone = general.get("timezone", DEFAULT_TIMEZONE)
+    entries = cfg.get("subscriptions") or []
+    if not entries:
+        if not default_chat_id:
+            return []
+        digest = DigestSchedule.from_options(general.get("digest"), timezone)
+        return [Subscription(chat_id=str(default_chat_id), default=True, digest=digest)]
+    return [
+        compile_subscription(
+            {**entry, "digest": {**(general.get("digest") or {}), **(entry.get("digest") or {})}}, timezone
+        )
+        for entry in entries
+    ]
+
+
+class SubscriptionIndex:
+    """Subscriptions indexed by theatre, so each theatre only evaluates its own subscribers."""
+
+    def __init__(self, subscriptions: list[Subscription]) -> None:
+        self.subscriptions = subscriptions
+        self._all_theatres = [s for s in subscriptions if s.theatres is None]
+        self._by_theatre: dict[str, list[Subscription]] = {}
+        for sub in subscriptions:
+            for theatre in sub.theatres or ():
+                self._by_theatre.setdefault(theatre, []).append(sub)
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def for_theatre(self, theatre: str) -> list[Subscription]:
+        return self._by_theatre.get(theatre, []) + self._all_theatres
+
+    def fan_out(self, parsed_theatres_info: dict, now: float | None = None) -> dict:
+        """
+        Distribute parsed performances to every matching subscriber.
+
+        Performances carry their parsed start, so filtering does not parse datetimes,
+        and the Performance objects are shared between subscribers, not copied.
+
+        Parameters
+        ----------
+        parsed_theatres_info: dict
+            Theatre name -> parsed performances (raw records are converted to Performance).
+        now: float | None
+            Current UNIX timestamp, defaults to time.time().
+
+        Returns
+        -------
+        dict
+            (Subscription, theatre name) -> performances the subscriber is interested in.
+        """
+        now = time.time() if now is None else now
+        result: dict = {}
+        for theatre, shows in parsed_theatres_info.items():
+            subscribers = self.for_theatre(theatre)
+            if not subscribers:
+                continue
+            prepared = [(show, show.title, show.timestamp) for show in map(as_performance, shows)]
+            for sub in subscribers:
+                result[(sub, theatre)] = [show for show, title, start in prepared if sub.matches(title, start, now)]
+        return result
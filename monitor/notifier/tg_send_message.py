@@ -1,9 +1,16 @@
+import os
+
 import requests
 
+from monitor.utils.http import get_session
+
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
 
 def send_telegram_message(bot_token: str, chat_id: str, message: str) -> bool:
     """
     Send a message to a Telegram group using a bot.
+    The request goes through the shared pooled session, so consecutive messages reuse the connection.
     Args:
         bot_token (str): The token of the Telegram bot.
         chat_id (str): The ID of the Telegram group.
@@ -11,8 +18,33 @@ def send_telegram_message(bot_token: str, chat_id: str, message: str) -> bool:
     Returns:
         bool: True if the message was sent successfully, False otherwise.
     """
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
     params = {"chat_id": chat_id, "text": message, "parse_mode": "HTML"}
 
-    response = requests.get(url, params=params)
+    response = get_session().get(url, params=params)
     return response.json().get("ok", False)
+
+
+def post_telegram_message(
+    bot_token: str,
+    chat_id: str,
+    message: str,
+    api_url: str | None = None,
+    timeout: float = 10,
+) -> requests.Response:
+    """
+    POST a message to the Telegram Bot API and return the raw response.
+    Unlike send_telegram_message the body is form-encoded, so long messages do not hit URL length limits,
+    and the caller can inspect the status code and `retry_after`.
+    Args:
+        bot_token (str): The token of the Telegram bot.
+        chat_id (str): The ID of the Telegram group.
+        message (str): The HTML message to send.
+        api_url (str | None): Bot API base URL, defaults to TELEGRAM_API_URL.
+        timeout (float): Request timeout in seconds.
+    Returns:
+        requests.Response: The API response.
+    """
+    url = f"{api_url or TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
+    data = {"chat_id": chat_id, "text": message, "parse_mode": "HTML", "disable_web_page_preview": "true"}
+    return get_session().post(url, data=data, timeout=timeout)
@@ -1 +1,11 @@
-from monitor.parser.parsing import parse_all  # noqa: F401
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # parse_all pulls in the HTTP and HTML stack; resolve it on first use, so light modules
+    # such as monitor.parser.performance do not import it
+    if name == "parse_all":
+        from monitor.parser.parsing import parse_all
+
+        return parse_all
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,237 @@
+import re
+import unicodedata
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+from zoneinfo import ZoneInfo
+
+DEFAULT_TIMEZONE = "Europe/Prague"
+# memoized strings per parser; programs repeat the same few dozen datetimes on every run
+MAX_CACHED_VALUES = 4096
+# a year-less date this many days in the past is taken to be next year's ("5. 1." parsed in December)
+PAST_TOLERANCE_DAYS = 60
+
+
+def _fold(word: str) -> str:
+    """Case-fold and strip diacritics, so "Října", "října" and "rijna" are the same word."""
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).rstrip(".")
+
+
+_MONTH_NAMES = [
+    ("leden", "ledna", "january", "jan", "led"),
+    ("unor", "unora", "february", "feb", "uno"),
+    ("brezen", "brezna", "march", "mar", "bre"),
+    ("duben", "dubna", "april", "apr", "dub"),
+    ("kveten", "kvetna", "may", "kve"),
+    ("cerven", "cervna", "june", "jun", "cvn"),
+    ("cervenec", "cervence", "july", "jul", "cvc"),
+    ("srpen", "srpna", "august", "aug", "srp"),
+    ("zari", "september", "sep", "sept", "zar"),
+    ("rijen", "rijna", "october", "oct", "rij"),
+    ("listopad", "listopadu", "november", "nov", "lis"),
+    ("prosinec", "prosince", "december", "dec", "pro"),
+]
+# folded month name (Czech nominative and genitive, English, abbreviations) -> month number
+MONTHS = {name: number for number, names in enumerate(_MONTH_NAMES, start=1) for name in names}
+# folded relative day -> offset from today
+RELATIVE_DAYS = {"dnes": 0, "dneska": 0, "today": 0, "zitra": 1, "tomorrow": 1, "pozitri": 2}
+
+_WORD = r"[^\W\d_]+\.?"
+_DIRECTIVES = {
+    "d": r"(?P<day>\d{1,2})",
+    "m": r"(?P<month>\d{1,2})",
+    "Y": r"(?P<year>\d{4})",
+    "y": r"(?P<year2>\d{2})",
+    "H": r"(?P<hour>\d{1,2})",
+    "M": r"(?P<minute>\d{2})",
+    "B": rf"(?P<month_name>{_WORD})",
+    "b": rf"(?P<month_name>{_WORD})",
+    "a": _WORD,  # weekday names are matched and ignored, the date defines the day
+    "A": _WORD,
+    "R": rf"(?P<relative>{_WORD})",
+    "%": "%",
+}
+
+
+@lru_cache(maxsize=None)
+def get_zone(tz: str) -> ZoneInfo:
+    """Return a cached ZoneInfo, so the tz database is not consulted for every record."""
+    return ZoneInfo(tz)
+
+
+def parse_start(value: Any, zone: ZoneInfo) -> datetime | None:
+    """
+    Parse an ISO 8601 datetime into an aware datetime in `zone`.
+
+    Naive values are taken as local time of the theatre (`zone`), not of the host.
+
+    Returns
+    -------
+    datetime | None
+        The start, or None if the value is not ISO 8601.
+    """
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=zone)
+    return dt.astimezone(zone)
+
+
+@lru_cache(maxsize=256)
+def compile_format(pattern: str) -> re.Pattern:
+    """
+    Compile a datetime format into a regular expression.
+
+    Formats use strftime-like directives: %d day, %m month number, %B / %b month name
+    (Czech or English, with or without diacritics), %a / %A weekday name (ignored), %Y / %y
+    year, %H hour, %M minute and %R a relative day ("dnes", "zítra", "pozítří", "today",
+    "tomorrow"). Whitespace matches any (or no) whitespace and matching is case-insensitive
+    and unanchored, so "%d. %m. %H:%M" finds "2. 10. 20:00" in "Út 2.10. 20:00 | 250 Kč".
+
+    Raises
+    ------
+    ValueError
+        If the format has an unknown or duplicate directive or no date part.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "%":
+            directive = pattern[i + 1 : i + 2]
+            if directive not in _DIRECTIVES:
+                raise ValueError(f"Unknown directive '%{directive}' in datetime format '{pattern}'")
+            parts.append(_DIRECTIVES[directive])
+            i += 2
+            continue
+        parts.append(r"\s*" if char.isspace() else re.escape(char))
+        i += 1
+
+    try:
+        regex = re.compile("".join(parts), re.IGNORECASE)
+    except re.error as e:
+        # e.g. "%d.%m %d" or "%B" together with "%b" define the same named group twice
+        raise ValueError(f"duplicate directive in datetime format '{pattern}': {e}") from e
+    if "relative" not in regex.groupindex and "day" not in regex.groupindex:
+        raise ValueError(f"Datetime format '{pattern}' needs a day (%d) or a relative day (%R)")
+    if "relative" not in regex.groupindex and not {"month", "month_name"} & set(regex.groupindex):
+        raise ValueError(f"Datetime format '{pattern}' needs a month (%m or %B)")
+    return regex
+
+
+def _infer_year(month: int, day: int, today: date) -> int:
+    """Pick the year of a year-less date: this year, unless that is long past."""
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:  # 29. 2. outside a leap year
+            continue
+        if candidate >= today - timedelta(days=PAST_TOLERANCE_DAYS):
+            return year
+    return today.year + 1
+
+
+class DateParser:
+    """
+    Normalizes a theatre's datetime strings into aware datetimes.
+
+    ISO 8601 values are parsed directly, anything else is matched against the theatre's
+    formats in order (see `compile_format`). Formats are compiled once and results are
+    memoized per string, as a program lists the same few datetimes over and over. Use
+    `get_date_parser` to share parsers between runs.
+    """
+
+    def __init__(self, formats: tuple[str, ...] = (), tz: str = DEFAULT_TIMEZONE) -> None:
+        self.formats = formats
+        self.tz = tz
+        self.zone = get_zone(tz)
+        self.patterns = [compile_format(f) for f in formats]
+        self._cache: dict[tuple[str, date], datetime | None] = {}
+
+    def parse(self, value: Any, today: date | None = None) -> datetime | None:
+        """
+        Parse a datetime string.
+
+        Parameters
+        ----------
+        value: Any
+            Scraped datetime text.
+        today: date | None
+            Reference day for relative and year-less dates, defaults to today in the
+            theatre's timezone.
+
+        Returns
+        -------
+        datetime | None
+            Aware datetime in the theatre's timezone, or None if nothing matched.
+        """
+        if not value:
+            return None
+        text = str(value)
+        if today is None:
+            today = datetime.now(self.zone).date()
+        key = (text, today)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        result = parse_start(text, self.zone)
+        if result is None:
+            for pattern in self.patterns:
+                match = pattern.search(text)
+                if match is not None:
+                    result = self._from_match(match, today)
+                    if result is not None:
+                        break
+
+        if len(self._cache) >= MAX_CACHED_VALUES:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def _from_match(self, match: re.Match, today: date) -> datetime | None:
+        groups = match.groupdict()
+        if groups.get("relative") is not None:
+            offset = RELATIVE_DAYS.get(_fold(groups["relative"]))
+            if offset is None:
+                return None
+            day = today + timedelta(days=offset)
+            year, month, day_of_month = day.year, day.month, day.day
+        else:
+            day_of_month = int(groups["day"])
+            if groups.get("month_name") is not None:
+                month = MONTHS.get(_fold(groups["month_name"]), 0)
+            else:
+                month = int(groups["month"])
+            if not 1 <= month <= 12:
+                return None
+            if groups.get("year") is not None:
+                year = int(groups["year"])
+            elif groups.get("year2") is not None:
+                year = 2000 + int(groups["year2"])
+            else:
+                year = _infer_year(month, day_of_month, today)
+
+        try:
+            return datetime(
+                year,
+                month,
+                day_of_month,
+                int(groups.get("hour") or 0),
+                int(groups.get("minute") or 0),
+                tzinfo=self.zone,
+            )
+        except ValueError:
+            return None
+
+
+@lru_cache(maxsize=128)
+def get_date_parser(formats: tuple[str, ...] = (), tz: str = DEFAULT_TIMEZONE) -> DateParser:
+    """Return the shared DateParser of a format list and timezone, keeping its memo across runs."""
+    return DateParser(formats, tz)
@@ -1,12 +1,36 @@
 import time
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin, urlsplit
 
 import requests
-from bs4 import BeautifulSoup, ResultSet, Tag
 
+from monitor.parser.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    FetchError,
+    RetryPolicy,
+    parse_retry_after,
+)
+from monitor.parser.selectors import (
+    SOUPSIEVE_BACKEND,
+    CompiledSelectors,
+    compile_selector,
+    compile_selectors,
+)
+from monitor.parser.streaming import iter_matching_html, parse_compound
+from monitor.parser.throttle import HostThrottle
+from monitor.utils.http import get_session
+from monitor.utils.http_cache import HTTPCache, conditional_headers, variant_key
 from monitor.utils.logger import logger
+from monitor.utils.metrics import metrics
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, ResultSet, Tag
 
-def first_text(el: Tag | None) -> str:
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def first_text(el: "Tag | None") -> str:
     """
     Extract and return the stripped text from a BeautifulSoup element.
 
@@ -25,12 +49,116 @@ def first_text(el: Tag | None) -> str:
     return el.get_text(strip=True)
 
 
+def fetch_response(
+    url: str,
+    requests_timeout: int = 10,
+    backoff_time: int = 1,
+    n_retries: int = 3,
+    throttle: HostThrottle | None = None,
+    parse_delay: float = 0,
+    headers: dict | None = None,
+    stream: bool = False,
+    retry_policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> requests.Response:
+    """
+    Fetch a URL with retries and exponential backoff.
+
+    Parameters
+    ----------
+    url: str
+        The URL to fetch.
+    requests_timeout: int
+        Timeout for the requests in seconds.
+    backoff_time: int
+        Initial backoff time in seconds, used when no `retry_policy` is given.
+    n_retries: int
+        Number of attempts, used when no `retry_policy` is given.
+    throttle: HostThrottle | None
+        Shared per-host throttle; every attempt waits for its slot when given.
+    parse_delay: float
+        Minimum delay in seconds between two requests to the same host.
+    headers: dict | None
+        Extra request headers, e.g. conditional GET validators.
+    stream: bool
+        Whether to defer downloading the body until it is iterated.
+    retry_policy: RetryPolicy | None
+        Which failures are retried and how long to wait; only network errors and
+        retryable statuses (e.g. 429, 503) are retried, honoring Retry-After.
+    breaker: CircuitBreaker | None
+        Per-host circuit breaker; an open circuit fails fast without a request.
+
+    Returns
+    -------
+    requests.Response
+        Successful (2xx or 304) response.
+
+    Raises
+    ------
+    CircuitOpenError
+        If the circuit breaker of the host is open.
+    FetchError
+        If the request failed permanently or all retries failed.
+    """
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_attempts=n_retries, base_delay=backoff_time)
+
+    host = urlsplit(url).netloc
+    if breaker is not None and not breaker.allow(host):
+        raise CircuitOpenError(f"Circuit breaker open for {host}, not fetching {url}")
+
+    status = None
+    answered = False
+    try:
+        for attempt in range(retry_policy.max_attempts):
+            retry_after = None
+            try:
+                if throttle is not None:
+                    throttle.wait(url, parse_delay)
+                with metrics.span("fetch", host=host):
+                    r = get_session().get(url, timeout=requests_timeout, headers=headers, stream=stream)
+                    r.raise_for_status()
+                answered = True
+                return r
+
+            except requests.HTTPError as e:
+                status = e.response.status_code
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                # release the connection of a streamed error response to the pool
+                e.response.close()
+                logger.info("Error fetching %s: %s", url, e)
+            except requests.RequestException as e:
+                status = None
+                logger.info("Error fetching %s: %s", url, e)
+
+            if not retry_policy.is_retryable(status):
+                # the site answered, it is the request (e.g. a moved program page) that is wrong
+                answered = True
+                raise FetchError(f"Failed to fetch {url}: HTTP {status} is not retryable")
+            if attempt + 1 < retry_policy.max_attempts:
+                delay = retry_policy.delay(attempt, retry_after)
+                metrics.inc("monitor_fetch_retries_total", host=host)
+                logger.info("Retrying %s in %.1fs", url, delay)
+                time.sleep(delay)
+
+        raise FetchError(f"Failed to fetch {url} after {retry_policy.max_attempts} attempts (last status: {status})")
+    finally:
+        # every exit reports to the breaker, so a half-open trial always resolves
+        if breaker is not None:
+            if answered:
+                breaker.record_success(host)
+            else:
+                breaker.record_failure(host)
+
+
 def fetch(
     url: str,
     requests_timeout: int = 10,
     backoff_time: int = 1,
     n_retries: int = 3,
-) -> BeautifulSoup:
+    throttle: HostThrottle | None = None,
+    parse_delay: float = 0,
+) -> "BeautifulSoup":
     """
     Fetch and parse HTML content from a URL with retries and exponential backoff.
 
@@ -44,6 +172,10 @@ def fetch(
         Initial backoff time in seconds.
     n_retries: int
         Number of retries on failure.
+    throttle: HostThrottle | None
+        Shared per-host throttle; every attempt waits for its slot when given.
+    parse_delay: float
+        Minimum delay in seconds between two requests to the same host.
 
     Returns
     -------
@@ -55,22 +187,21 @@ def fetch(
     Exception
         If all retries fail.
     """
+    r = fetch_response(
+        url,
+        requests_timeout=requests_timeout,
+        backoff_time=backoff_time,
+        n_retries=n_retries,
+        throttle=throttle,
+        parse_delay=parse_delay,
+    )
+    from bs4 import BeautifulSoup
 
-    for attempt in range(n_retries):
-        try:
-            r = requests.get(url, timeout=requests_timeout)
-            r.raise_for_status()
-            return BeautifulSoup(r.text, "lxml")
-
-        except Exception as e:
-            logger.info("Error fetching %s: %s", url, e)
-            time.sleep(backoff_time * (attempt + 1))
-
-    raise Exception(f"Failed to fetch {url} after {n_retries} attempts")
+    return BeautifulSoup(r.text, "lxml")
 
 
 def parse_performances(
-    elements: ResultSet[Tag],
+    elements: "ResultSet[Tag]",
     time_tag_name: str,
     performance_title_name: str,
     performance_link_name: str,
@@ -94,20 +225,27 @@ def parse_performances(
     list[dict]
         List of dictionaries with keys 'datetime', 'title', and 'link'.
     """
-    performances = []
-    for perf in elements:
-        time_tag = perf.select_one(time_tag_name)
-        datetime = time_tag["datetime"] if time_tag and time_tag.has_attr("datetime") else first_text(time_tag)
+    compiled = compile_selectors("*", time_tag_name, performance_title_name, performance_link_name)
+    return extract_performances(elements, compiled)
 
-        title_tag = perf.select_one(performance_title_name)
-        title = first_text(title_tag)
 
-        link_tag = perf.select_one(performance_link_name)
-        link = link_tag["href"] if link_tag and link_tag.has_attr("href") else None
+def extract_performances(elements: list, compiled: CompiledSelectors) -> list[dict]:
+    """
+    Extract datetime, title, and link from performance elements with precompiled selectors.
 
-        performances.append({"datetime": datetime, "title": title, "link": link})
+    Parameters
+    ----------
+    elements: list
+        Performance elements of the compiled selectors' backend (bs4 Tags or lxml elements).
+    compiled: CompiledSelectors
+        Compiled selector set of the theatre.
 
-    return performances
+    Returns
+    -------
+    list[dict]
+        List of dictionaries with keys 'datetime', 'title', and 'link'.
+    """
+    return [compiled.extract(perf) for perf in elements]
 
 
 def fetch_and_parse(
@@ -116,9 +254,62 @@ def fetch_and_parse(
     time_tag_name: str,
     performance_title_name: str,
     performance_link_name: str,
+    throttle: HostThrottle | None = None,
+    parse_delay: float = 0,
+    cache: HTTPCache | None = None,
+    parse_mode: str = "full",
+    max_results: int | None = None,
+    selector_backend: str = SOUPSIEVE_BACKEND,
+    retry_policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
 ) -> list[dict]:
     """
     Fetch a URL and parse performance data.
+
+    See `fetch_page` for the parameters.
+
+    Returns
+    -------
+    list[dict]
+        List of dictionaries with parsed performance data.
+    """
+    performances, _ = fetch_page(
+        url,
+        elements_name,
+        time_tag_name,
+        performance_title_name,
+        performance_link_name,
+        throttle=throttle,
+        parse_delay=parse_delay,
+        cache=cache,
+        parse_mode=parse_mode,
+        max_results=max_results,
+        selector_backend=selector_backend,
+        retry_policy=retry_policy,
+        breaker=breaker,
+    )
+    return performances
+
+
+def fetch_page(
+    url: str,
+    elements_name: str,
+    time_tag_name: str,
+    performance_title_name: str,
+    performance_link_name: str,
+    throttle: HostThrottle | None = None,
+    parse_delay: float = 0,
+    cache: HTTPCache | None = None,
+    parse_mode: str = "full",
+    max_results: int | None = None,
+    selector_backend: str = SOUPSIEVE_BACKEND,
+    retry_policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+    next_link_name: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    Fetch one program page and parse its performances and the link to the next page.
+
     Parameters
     ----------
 
@@ -132,20 +323,94 @@ def fetch_and_parse(
         CSS selector for the performance title tag.
     performance_link_name: str
         CSS selector for the performance link tag.
+    throttle: HostThrottle | None
+        Shared per-host throttle passed down to `fetch`.
+    parse_delay: float
+        Minimum delay in seconds between two requests to the same host.
+    cache: HTTPCache | None
+        HTTP cache; when given, the request is conditional and a 304 response reuses
+        the previously parsed performances without parsing the page.
+    parse_mode: str
+        "full" builds a tree of the whole page; "streaming" parses the response incrementally,
+        keeps only the subtrees matching `elements_name` and stops after `max_results` of them.
+        Streaming requires `elements_name` to be a single compound selector (e.g. "div.show")
+        and falls back to full parsing otherwise.
+    max_results: int | None
+        Maximum number of performances to return.
+    selector_backend: str
+        Selector engine, "soupsieve" or "lxml" (cssselect-compiled XPath).
+    retry_policy: RetryPolicy | None
+        Retry policy passed down to `fetch_response`.
+    breaker: CircuitBreaker | None
+        Per-host circuit breaker passed down to `fetch_response`.
+    next_link_name: str | None
+        CSS selector of the link to the next page ("next", "load more"). The link has to be
+        found outside the performance elements, so such pages are always parsed in full.
 
     Returns
     -------
-    list[dict]
-        List of dictionaries with parsed performance data.
+    tuple[list[dict], str | None]
+        Parsed performances and the absolute URL of the next page, if any.
     """
 
-    soup = fetch(url)
-    elements = soup.select(elements_name)
-    parsed_performances = parse_performances(
-        elements,
-        time_tag_name=time_tag_name,
-        performance_title_name=performance_title_name,
-        performance_link_name=performance_link_name,
+    compiled = compile_selectors(
+        elements_name, time_tag_name, performance_title_name, performance_link_name, backend=selector_backend
     )
+    next_link = compile_selector(next_link_name, selector_backend) if next_link_name else None
+    streaming = parse_mode == "streaming" and next_link is None
+    compound = parse_compound(elements_name) if streaming else None
+    if streaming and compound is None:
+        logger.info("Selector %r cannot be streamed, parsing the full page of %s", elements_name, url)
+
+    variant = variant_key(
+        elements_name, time_tag_name, performance_title_name, performance_link_name, max_results, next_link_name
+    )
+    entry = cache.get(url, variant) if cache is not None else None
+
+    r = fetch_response(
+        url,
+        throttle=throttle,
+        parse_delay=parse_delay,
+        headers=conditional_headers(entry),
+        stream=compound is not None,
+        retry_policy=retry_policy,
+        breaker=breaker,
+    )
+    if r.status_code == 304 and entry is not None:
+        logger.info("Not modified, reusing cached performances for %s", url)
+        r.close()
+        cache.touch(url)  # type: ignore[union-attr]
+        return entry["performances"], entry.get("next_url")
+
+    with metrics.span("parse", mode="streaming" if compound is not None else "full"):
+        if compound is not None:
+            with r:
+                fragments = iter_matching_html(
+                    r.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True), compound, limit=max_results
+                )
+            document = compiled.parse_document("".join(fragments))
+        else:
+            document = compiled.parse_document(r.text)
+
+        elements = compiled.select_elements(document, limit=max_results)
+        parsed_performances = extract_performances(elements, compiled)
+
+        next_url = None
+        if next_link is not None:
+            href = compiled.attr(compiled.select_one(next_link, document), "href")
+            next_url = urljoin(url, href) if href else None
+
+    if metrics.enabled:
+        metrics.inc("monitor_bytes_downloaded_total", r.raw.tell(), host=urlsplit(url).netloc)
+
+    if cache is not None:
+        cache.put(
+            url,
+            parsed_performances,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+            variant=variant,
+            next_url=next_url,
+        )
 
-    return parsed_performances
+    return parsed_performances, next_url
@@ -0,0 +1,160 @@
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable
+
+from monitor.parser.performance import normalize
+from monitor.utils.logger import logger
+
+DEFAULT_MAX_PAGES = 3
+DEFAULT_MAX_PARALLEL = 2
+
+# (url, next link selector) -> (performances, next page URL)
+PageFetcher = Callable[[str, str | None], tuple[list[dict], str | None]]
+
+
+def template_urls(template: str, max_pages: int, today: date | None = None) -> list[str]:
+    """
+    Expand a page URL template.
+
+    Parameters
+    ----------
+    template: str
+        URL with `str.format` placeholders: `{year}` and `{month}` of the current month and the
+        following ones, and `{page}` (1, 2, ...), e.g. "https://x.cz/program/{year}-{month:02d}".
+    max_pages: int
+        Number of pages.
+    today: date | None
+        Start month, defaults to today.
+
+    Returns
+    -------
+    list[str]
+        Page URLs in order.
+    """
+    today = today or date.today()
+    urls = []
+    for i in range(max_pages):
+        year, month = divmod(today.month - 1 + i, 12)
+        urls.append(template.format(year=today.year + year, month=month + 1, page=i + 1))
+    return urls
+
+
+def merge_pages(pages: list[list[dict]], max_results: int | None = None) -> list[dict]:
+    """Concatenate pages in order, dropping performances already seen on an earlier page."""
+    seen = set()
+    merged = []
+    for performances in pages:
+        for item in performances:
+            key = normalize(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+    return merged[:max_results] if max_results else merged
+
+
+def _fetch_in_parallel(
+    urls: list[str], fetch: PageFetcher, max_results: int | None, max_parallel: int
+) -> list[list[dict]]:
+    pages: list[list[dict]] = []
+    found = 0
+    remaining = iter(urls)
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="page") as pool:
+
+        def submit(url: str) -> tuple:
+            # every page runs in a copy of the theatre's context, so metrics keep the theatre label
+            return url, pool.submit(contextvars.copy_context().run, fetch, url, None)
+
+        pending = deque(submit(url) for _, url in zip(range(max_parallel), remaining))
+        while pending:
+            url, future = pending.popleft()
+            try:
+                performances, _ = future.result()
+            except Exception as e:
+                if not pages:
+                    raise
+                logger.warning(f"Stopping pagination at {url}: {e}")
+                performances = []
+
+            pages.append(performances)
+            found += len(performances)
+            if not performances or (max_results and found >= max_results):
+                for _, rest in pending:
+                    rest.cancel()
+                break
+
+            next_url = next(remaining, None)
+            if next_url is not None:
+                pending.append(submit(next_url))
+
+    return pages
+
+
+def _follow_next_links(
+    program_url: str, next_link: str, fetch: PageFetcher, max_results: int | None, max_pages: int
+) -> list[list[dict]]:
+    pages: list[list[dict]] = []
+    found = 0
+    url: str | None = program_url
+    visited = set()
+    while url is not None and url not in visited and len(pages) < max_pages:
+        visited.add(url)
+        try:
+            performances, url = fetch(url, next_link)
+        except Exception as e:
+            if not pages:
+                raise
+            logger.warning(f"Stopping pagination at {url}: {e}")
+            break
+
+        pages.append(performances)
+        found += len(performances)
+        if not performances or (max_results and found >= max_results):
+            break
+
+    return pages
+
+
+def crawl_program(
+    program_url: str, pagination: dict, fetch: PageFetcher, max_results: int | None = None
+) -> list[dict]:
+    """
+    Fetch all pages of a paginated program.
+
+    Pages either come from a URL template (e.g. one page per month), which are fetched
+    up to `max_parallel` at a time, or by following the next-link selector from
+    `program_url` page by page. Crawling stops after `max_pages`, at an empty page or once
+    `max_results` performances were found; a failure on any page but the first keeps the
+    pages fetched so far. Performances listed on several pages are returned once.
+
+    Parameters
+    ----------
+    program_url: str
+        First page of the program.
+    pagination: dict
+        Theatre's `pagination` settings: 'url_template' or 'next_link', 'max_pages'
+        and 'max_parallel'.
+    fetch: PageFetcher
+        Fetches and parses one page.
+    max_results: int | None
+        Number of performances after which no more pages are fetched.
+
+    Returns
+    -------
+    list[dict]
+        Deduplicated performances in page order.
+    """
+    max_pages = max(1, pagination.get("max_pages", DEFAULT_MAX_PAGES))
+    if pagination.get("url_template"):
+        urls = template_urls(pagination["url_template"], max_pages)
+        max_parallel = max(1, pagination.get("max_parallel", DEFAULT_MAX_PARALLEL))
+        pages = _fetch_in_parallel(urls, fetch, max_results, max_parallel)
+    elif pagination.get("next_link"):
+        pages = _follow_next_links(program_url, pagination["next_link"], fetch, max_results, max_pages)
+    else:
+        pages = [fetch(program_url, None)[0]]
+
+    logger.info(f"Fetched {len(pages)} program pages starting at {program_url}")
+    return merge_pages(pages, max_results)
@@ -1,54 +1,191 @@
-from monitor.parser.generic_parser import fetch_and_parse
+from concurrent.futures import ThreadPoolExecutor
+
+from monitor.parser.dates import compile_format
+from monitor.parser.generic_parser import fetch_and_parse, fetch_page
+from monitor.parser.pagination import crawl_program
+from monitor.parser.performance import DEFAULT_TIMEZONE, Performance
+from monitor.parser.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from monitor.parser.selectors import SOUPSIEVE_BACKEND, compile_theatre_selectors
+from monitor.parser.sources import HTML_SOURCE, create_adapter, fetch_source
+from monitor.parser.throttle import HostThrottle
+from monitor.utils.http_cache import HTTPCache
 from monitor.utils.load_cfg import load_yaml_config
 from monitor.utils.logger import logger
+from monitor.utils.metrics import current_theatre
+
+DEFAULT_MAX_WORKERS = 8
 
 
-def parse_all(cfg: dict | None = None) -> dict:
+def parse_theatre(
+    theatre: dict,
+    cfg: dict,
+    throttle: HostThrottle | None = None,
+    cache: HTTPCache | None = None,
+    retry_policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> list[Performance] | None:
+    """
+    Fetch and parse a single theatre.
+
+    Parameters
+    ----------
+    theatre: dict
+        Theatre configuration entry.
+    cfg: dict
+        Full configuration dictionary.
+    throttle: HostThrottle | None
+        Shared per-host throttle honoring the theatre's `parse_delay`.
+    cache: HTTPCache | None
+        HTTP cache used for conditional requests.
+    retry_policy: RetryPolicy | None
+        Retry policy of `general.retry`.
+    breaker: CircuitBreaker | None
+        Per-host circuit breaker shared by all theatres.
+
+    Returns
+    -------
+    list[Performance] | None
+        Parsed performances with absolute links and, for `time_parseable` theatres or
+        theatres with `datetime_formats`, aware start datetimes in the theatre's `timezone`; None if the theatre was skipped or failed.
+    """
+    theatre_name = theatre.get("name", "unknown_theatre")
+    current_theatre.set(theatre_name)
+    try:
+        base_url = theatre.get("base_url")
+        program_url = theatre.get("program_url")
+        selectors = theatre.get("selectors", {})
+        source = theatre.get("source") or {}
+        source_type = source.get("type", HTML_SOURCE)
+        if not program_url or (source_type == HTML_SOURCE and not selectors):
+            logger.warning(f"Skipping theatre '{theatre_name}' due to missing URL or selectors.")
+            return None
+
+        logger.info(f"Parsing theatre: {theatre_name} from URL: {program_url}")
+        max_results = cfg["general"]["results_per_theatre"]
+        common_kwargs = dict(
+            throttle=throttle,
+            parse_delay=theatre.get("parse_delay", 0),
+            cache=cache,
+            max_results=max_results,
+            retry_policy=retry_policy,
+            breaker=breaker,
+        )
+        if source_type == HTML_SOURCE:
+            fetch_kwargs = dict(
+                elements_name=selectors["elements"],
+                time_tag_name=selectors["time"],
+                performance_title_name=selectors["title"],
+                performance_link_name=selectors["link"],
+                parse_mode=theatre.get("parse_mode", cfg["general"].get("parse_mode", "full")),
+                selector_backend=theatre.get("selector_backend", SOUPSIEVE_BACKEND),
+                **common_kwargs,
+            )
+            if theatre.get("pagination"):
+                parsed_data = crawl_program(
+                    program_url,
+                    theatre["pagination"],
+                    lambda url, next_link: fetch_page(url, next_link_name=next_link, **fetch_kwargs),
+                    max_results=max_results,
+                )
+            else:
+                parsed_data = fetch_and_parse(url=program_url, **fetch_kwargs)
+        else:
+            adapter = create_adapter(source)
+            if theatre.get("pagination"):
+                parsed_data = crawl_program(
+                    program_url,
+                    theatre["pagination"],
+                    lambda url, _: (fetch_source(url, adapter, **common_kwargs), None),
+                    max_results=max_results,
+                )
+            else:
+                parsed_data = fetch_source(program_url, adapter, **common_kwargs)
+
+        tz = theatre.get("timezone", cfg["general"].get("timezone", DEFAULT_TIMEZONE))
+        parse_datetime = theatre.get("time_parseable", False)
+        formats = tuple(theatre.get("datetime_formats") or ())
+        parsed_data = [
+            Performance.from_raw(item, base_url or program_url, tz=tz, parse_datetime=parse_datetime, formats=formats)
+            for item in parsed_data[:max_results]
+        ]
+
+        logger.info(f"Successfully parsed data for theatre: {theatre_name}")
+        return parsed_data
+    except CircuitOpenError as e:
+        logger.warning(f"Skipping theatre '{theatre_name}': {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Error parsing theatre '{theatre_name}': {e}")
+        return None
+
+
+def parse_all(
+    cfg: dict | None = None, throttle: HostThrottle | None = None, breaker: CircuitBreaker | None = None
+) -> dict:
     """
     Parse all theatres as per configuration file.
 
+    Theatres are fetched concurrently on a bounded thread pool (`general.max_workers`),
+    requests to the same host are spaced by the theatre's `parse_delay`, and a failure
+    in one theatre never affects the others. Hosts that keep failing are skipped until
+    the cooldown of their circuit breaker (`general.circuit_breaker`) ends.
+
     Parameters
     ----------
     cfg: dict | None
         Configuration dictionary. If None, loads from default config file.
+    throttle: HostThrottle | None
+        Per-host throttle to share with previous runs. If None, a new one is created.
+    breaker: CircuitBreaker | None
+        Circuit breaker to use. If None, one is loaded as configured in `general.circuit_breaker`.
 
     Returns
     -------
     dict
-        A dictionary with theatre names as keys and lists of parsed performance data as values.
+        A dictionary with theatre names as keys and lists of Performance records as values.
     """
     if cfg is None:
         cfg = load_yaml_config()
 
-    results = {}
-    for theatre in cfg.get("theatres", []):
-        try:
-            theatre_name = theatre.get("name", "unknown_theatre")
-            base_url = theatre.get("base_url")
-            program_url = theatre.get("program_url")
-            selectors = theatre.get("selectors", {})
-            if not program_url or not selectors:
-                logger.warning(f"Skipping theatre '{theatre_name}' due to missing URL or selectors.")
-                continue
-
-            logger.info(f"Parsing theatre: {theatre_name} from URL: {program_url}")
-            parsed_data = fetch_and_parse(
-                url=program_url,
-                elements_name=selectors["elements"],
-                time_tag_name=selectors["time"],
-                performance_title_name=selectors["title"],
-                performance_link_name=selectors["link"],
-            )
+    theatres = cfg.get("theatres", [])
+    if not theatres:
+        return {}
 
-            parsed_data = parsed_data[: cfg["general"]["results_per_theatre"]]
-            for item in parsed_data:
-                if item["link"] and not item["link"].startswith("http"):
-                    item["link"] = base_url.rstrip("/") + "/" + item["link"].lstrip("/")
+    max_workers = max(1, min(cfg.get("general", {}).get("max_workers", DEFAULT_MAX_WORKERS), len(theatres)))
+    for theatre in theatres:
+        if theatre.get("selectors"):
+            try:
+                compile_theatre_selectors(theatre)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Invalid selectors for theatre '{theatre.get('name', 'unknown_theatre')}': {e}")
+        for pattern in theatre.get("datetime_formats") or ():
+            try:
+                compile_format(pattern)
+            except ValueError as e:
+                logger.error(f"Invalid datetime format for theatre '{theatre.get('name', 'unknown_theatre')}': {e}")
 
-            results[theatre_name] = parsed_data
-            logger.info(f"Successfully parsed data for theatre: {theatre_name}")
-        except Exception as e:
-            logger.error(f"Error parsing theatre '{theatre_name}': {e}")
+    if throttle is None:
+        throttle = HostThrottle()
+    cache = HTTPCache.from_config(cfg)
+    try:
+        retry_policy = RetryPolicy.from_options(cfg.get("general", {}).get("retry"))
+    except ValueError as e:
+        logger.error(f"Invalid retry options, using the defaults: {e}")
+        retry_policy = RetryPolicy()
+    if breaker is None:
+        breaker = CircuitBreaker.from_config(cfg)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="theatre") as pool:
+        futures = [
+            (theatre, pool.submit(parse_theatre, theatre, cfg, throttle, cache, retry_policy, breaker))
+            for theatre in theatres
+        ]
+
+    results = {}
+    for theatre, future in futures:
+        parsed_data = future.result()
+        if parsed_data is not None:
+            results[theatre.get("name", "unknown_theatre")] = parsed_data
 
     return results
 
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, ClassVar
+from urllib.parse import urljoin
+
+from monitor.parser.dates import (  # noqa: F401
+    DEFAULT_TIMEZONE,
+    get_date_parser,
+    get_zone,
+    parse_start,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Performance:
+    """
+    One scheduled performance.
+
+    Created once per parsed record: the title is whitespace-normalized, the link is
+    absolute and `start` is the timezone-aware datetime (None when the theatre's datetimes
+    are not parseable, see `monitor.parser.dates`). The raw `datetime` string is kept for display and change detection.
+    Read-only mapping access (`perf["title"]`, `perf.get("link")`) is supported for code
+    that handles raw records and performances alike.
+    """
+
+    title: str
+    datetime: str | None
+    link: str | None
+    start: datetime | None = None
+
+    KEYS: ClassVar[tuple[str, ...]] = ("datetime", "title", "link")
+
+    @classmethod
+    def from_raw(
+        cls,
+        raw: dict,
+        base_url: str | None = None,
+        tz: str = DEFAULT_TIMEZONE,
+        parse_datetime: bool = True,
+        formats: tuple[str, ...] = (),
+    ) -> "Performance":
+        """
+        Build a performance from a parser record.
+
+        Parameters
+        ----------
+        raw: dict
+            Record with 'datetime', 'title' and 'link'.
+        base_url: str | None
+            URL relative links are resolved against.
+        tz: str
+            Timezone of the theatre.
+        parse_datetime: bool
+            Whether the datetime is ISO 8601 (the theatre's `time_parseable`).
+        formats: tuple[str, ...]
+            The theatre's `datetime_formats` for non-ISO datetimes; given formats enable parsing.
+
+        Returns
+        -------
+        Performance
+            The performance.
+        """
+        link = raw.get("link")
+        if link and base_url:
+            link = urljoin(base_url, link)
+        dt = raw.get("datetime")
+        return cls(
+            title=" ".join((raw.get("title") or "").split()),
+            datetime=dt,
+            link=link,
+            start=get_date_parser(formats, tz).parse(dt) if parse_datetime or formats else None,
+        )
+
+    @property
+    def timestamp(self) -> float | None:
+        return self.start.timestamp() if self.start is not None else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.KEYS:
+            return default
+        return getattr(self, key)
+
+    def to_dict(self) -> dict:
+        return {"datetime": self.datetime, "title": self.title, "link": self.link}
+
+    def to_tuple(self) -> tuple:
+        """Return the compact (title, datetime, link, timestamp) form sent between processes."""
+        return self.title, self.datetime, self.link, self.timestamp
+
+    @classmethod
+    def from_tuple(cls, values: tuple, tz: str = DEFAULT_TIMEZONE) -> "Performance":
+        """Rebuild a performance from `to_tuple`, with its start in the theatre's timezone."""
+        title, dt, link, timestamp = values
+        start = datetime.fromtimestamp(timestamp, get_zone(tz)) if timestamp is not None else None
+        return cls(title=title, datetime=dt, link=link, start=start)
+
+
+def normalize(item: "Performance | dict") -> tuple[str, str, str]:
+    """
+    Normalize a performance into its (title, datetime, link) identity.
+
+    Parameters
+    ----------
+    item: Performance | dict
+        Performance or raw record with 'title', 'datetime' and 'link'.
+
+    Returns
+    -------
+    tuple[str, str, str]
+        Whitespace-collapsed, case-folded title, stripped datetime and link.
+    """
+    title = " ".join((item.get("title") or "").split()).casefold()
+    dt = " ".join(str(item.get("datetime") or "").split())
+    link = (item.get("link") or "").strip()
+    return title, dt, link
+
+
+def as_performance(
+    item: "Performance | dict", tz: str = DEFAULT_TIMEZONE, parse_datetime: bool = True, formats: tuple[str, ...] = ()
+) -> Performance:
+    """Return `item` itself if it is a Performance, otherwise build one from the raw record."""
+    if isinstance(item, Performance):
+        return item
+    return Performance.from_raw(item, tz=tz, parse_datetime=parse_datetime, formats=formats)
@@ -0,0 +1,318 @@
+import email.utils
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+from monitor.utils.logger import logger
+from monitor.utils.metrics import metrics
+from monitor.utils.paths import data_dir
+
+# request timeout, too early, rate limited and transient server/gateway errors
+DEFAULT_RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class FetchError(Exception):
+    """A page could not be fetched."""
+
+
+class CircuitOpenError(FetchError):
+    """The circuit breaker of a host is open, so the host was not contacted."""
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """
+    Parse a Retry-After header value.
+
+    Parameters
+    ----------
+    value: str | None
+        Header value, either delay seconds or an HTTP date.
+    now: float | None
+        Current UNIX timestamp, defaults to time.time().
+
+    Returns
+    -------
+    float | None
+        Seconds to wait (never negative), or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+
+    Only network errors and retryable statuses are retried. Delays grow exponentially
+    from `base_delay` up to `max_delay` with "full jitter" (a uniformly random delay up
+    to the exponential bound), so that many theatres on one host do not retry in lockstep;
+    a Retry-After header overrides the delay, capped at `max_retry_after`.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_retry_after: float = 120.0
+    jitter: bool = True
+    retry_statuses: frozenset[int] = DEFAULT_RETRY_STATUSES
+
+    @classmethod
+    def from_options(cls, options: dict | None) -> "RetryPolicy":
+        """
+        Build a policy from `cfg["general"]["retry"]`.
+
+        Raises
+        ------
+        ValueError
+            If an option is unknown.
+        """
+        options = dict(options or {})
+        known = {f.name for f in fields(cls)}
+        for key in options:
+            if key not in known:
+                raise ValueError(f"Unknown retry option '{key}', expected one of {', '.join(sorted(known))}")
+        if "retry_statuses" in options:
+            options["retry_statuses"] = frozenset(options["retry_statuses"])
+        return cls(**options)
+
+    def is_retryable(self, status: int | None) -> bool:
+        """Return True for network errors (status None) and retryable statuses."""
+        return status is None or status in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Return the seconds to wait after the failed attempt number `attempt` (0-based).
+
+        Parameters
+        ----------
+        attempt: int
+            Index of the attempt that failed.
+        retry_after: float | None
+            Delay requested by the server.
+
+        Returns
+        -------
+        float
+            Delay in seconds.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        bound = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(0, bound) if self.jitter else bound
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker persisted as a JSON file, so it also works across cron runs.
+
+    After `failure_threshold` consecutive failed fetches the circuit of a host opens and
+    fetches are refused without a request until `cooldown` seconds have passed. Then one
+    trial fetch is let through (half open) and other fetches are refused while it is in
+    flight: success closes the circuit, failure opens it again with the cooldown doubled,
+    up to `max_cooldown`. A trial that never reported back (e.g. its process died) is
+    given up after a cooldown and the next fetch becomes the new trial.
+
+    With `persist` False the state is read from `path` but never written; worker processes
+    use that to hand their `changes` to the coordinating process, which `merge`s and saves
+    them once instead of every worker overwriting the file with its own view.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        failure_threshold: int = 3,
+        cooldown: float = 300.0,
+        max_cooldown: float = 6 * 3600.0,
+        persist: bool = True,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict] = self._load()
+        self._changed: set[str] = set()
+
+    @classmethod
+    def from_config(cls, cfg: dict, persist: bool = True) -> "CircuitBreaker | None":
+        """
+        Build a circuit breaker from `cfg["general"]["circuit_breaker"]`.
+
+        Parameters
+        ----------
+        cfg: dict
+            Full configuration dictionary.
+        persist: bool
+            Whether state changes are written back to the state file.
+
+        Returns
+        -------
+        CircuitBreaker | None
+            The circuit breaker, or None if it is disabled.
+        """
+        breaker_cfg = cfg.get("general", {}).get("circuit_breaker", {})
+        if not breaker_cfg.get("enabled", True):
+            return None
+        return cls(
+            Path(breaker_cfg.get("path") or data_dir() / "circuit_breaker.json"),
+            failure_threshold=breaker_cfg.get("failure_threshold", 3),
+            cooldown=breaker_cfg.get("cooldown", 300.0),
+            max_cooldown=breaker_cfg.get("max_cooldown", 6 * 3600.0),
+            persist=persist,
+        )
+
+    def _load(self) -> dict[str, dict]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                hosts = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable circuit breaker state {self.path}: {e}")
+            return {}
+        for host, state in hosts.items():
+            metrics.set("monitor_circuit_open", int(state.get("state") == OPEN), host=host)
+        return hosts
+
+    def _save(self, host: str) -> None:
+        self._changed.add(host)
+        if self.persist:
+            self._write()
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._hosts, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Cannot save circuit breaker state to {self.path}: {e}")
+
+    def _transition(self, host: str, state: dict, new_state: str) -> None:
+        state["state"] = new_state
+        metrics.inc("monitor_circuit_transitions_total", host=host, state=new_state)
+        metrics.set("monitor_circuit_open", int(new_state == OPEN), host=host)
+
+    def state(self, host: str) -> str:
+        return self._hosts.get(host, {}).get("state", CLOSED)
+
+    def changes(self) -> dict[str, dict | None]:
+        """Return the state of every host changed since loading, None for hosts whose circuit closed."""
+        with self._lock:
+            return {host: dict(self._hosts[host]) if host in self._hosts else None for host in self._changed}
+
+    def merge(self, changes: dict[str, dict | None]) -> None:
+        """
+        Apply host states changed in other processes and save them in one write.
+
+        Parameters
+        ----------
+        changes: dict[str, dict | None]
+            Host -> state as returned by `changes`, None to close the circuit of the host.
+        """
+        if not changes:
+            return
+        with self._lock:
+            for host, state in changes.items():
+                if state is None:
+                    self._hosts.pop(host, None)
+                else:
+                    self._hosts[host] = state
+                metrics.set("monitor_circuit_open", int(state is not None and state["state"] == OPEN), host=host)
+            self._changed.update(changes)
+            if self.persist:
+                self._write()
+
+    def allow(self, host: str, now: float | None = None) -> bool:
+        """
+        Check whether a host may be contacted.
+
+        Parameters
+        ----------
+        host: str
+            Host (netloc) of the request.
+        now: float | None
+            Current UNIX timestamp, defaults to time.time().
+
+        Returns
+        -------
+        bool
+            False while the circuit of the host is open, or half open with a trial in flight.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state["state"] == CLOSED:
+                return True
+            if state["state"] == HALF_OPEN:
+                if now < state.get("trial_at", 0.0) + state["cooldown"]:
+                    metrics.inc("monitor_circuit_rejected_total", host=host)
+                    logger.info(f"Circuit half open for {host}, waiting for the trial request")
+                    return False
+            else:
+                retry_at = state["opened_at"] + state["cooldown"]
+                if now < retry_at:
+                    metrics.inc("monitor_circuit_rejected_total", host=host)
+                    logger.info(f"Circuit open for {host}, skipping it for another {retry_at - now:.0f}s")
+                    return False
+                self._transition(host, state, HALF_OPEN)
+            state["trial_at"] = now
+            logger.info(f"Circuit half open for {host}, sending a trial request")
+            self._save(host)
+            return True
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            state = self._hosts.pop(host, None)
+            if state is None:
+                return
+            if state["state"] != CLOSED:
+                self._transition(host, state, CLOSED)
+                logger.info(f"Circuit closed for {host} after a successful request")
+            self._save(host)
+
+    def record_failure(self, host: str, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._hosts.setdefault(host, {"state": CLOSED, "failures": 0, "cooldown": self.cooldown})
+            state["failures"] += 1
+            if state["state"] == OPEN:
+                self._save(host)
+                return
+            if state["state"] == HALF_OPEN:
+                state["cooldown"] = min(state["cooldown"] * 2, self.max_cooldown)
+            elif state["failures"] < self.failure_threshold:
+                self._save(host)
+                return
+            state["opened_at"] = now
+            self._transition(host, state, OPEN)
+            logger.warning(
+                f"Circuit open for {host} after {state['failures']} consecutive failures, "
+                f"retrying in {state['cooldown']:.0f}s"
+            )
+            self._save(host)
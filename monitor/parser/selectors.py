@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from lxml import etree, html
+
+SOUPSIEVE_BACKEND = "soupsieve"
+LXML_BACKEND = "lxml"
+SELECTOR_BACKENDS = (SOUPSIEVE_BACKEND, LXML_BACKEND)
+
+
+@dataclass(frozen=True)
+class CompiledSelectors:
+    """
+    A theatre's selector set compiled once for one backend.
+
+    The soupsieve backend works on BeautifulSoup trees with `soupsieve.SoupSieve` objects,
+    the lxml backend translates the CSS to XPath with cssselect and evaluates it on lxml trees.
+    """
+
+    backend: str
+    elements: Any
+    time: Any
+    title: Any
+    link: Any
+
+    def parse_document(self, text: str) -> Any:
+        """Build a document tree for this backend."""
+        if self.backend == LXML_BACKEND:
+            return html.document_fromstring(text or "<html></html>")
+        from bs4 import (
+            BeautifulSoup,  # only theatres on the soupsieve backend pay for importing bs4
+        )
+
+        return BeautifulSoup(text, "lxml")
+
+    def select_elements(self, root: Any, limit: int | None = None) -> list:
+        """Return the performance elements of a document."""
+        if self.backend == LXML_BACKEND:
+            elements = self.elements(root)
+            return elements[:limit] if limit else elements
+        return self.elements.select(root, limit=limit or 0)
+
+    def select_one(self, compiled: Any, el: Any) -> Any:
+        if self.backend == LXML_BACKEND:
+            found = compiled(el)
+            return found[0] if found else None
+        return compiled.select_one(el)
+
+    def text(self, el: Any) -> str:
+        if el is None:
+            return ""
+        if self.backend == LXML_BACKEND:
+            return "".join(s.strip() for s in el.itertext())
+        return el.get_text(strip=True)
+
+    def attr(self, el: Any, name: str) -> str | None:
+        if el is None:
+            return None
+        return el.get(name)
+
+    def extract(self, el: Any) -> dict:
+        """
+        Extract datetime, title and link from a single performance element.
+
+        Parameters
+        ----------
+        el: Any
+            Performance element of this backend's tree.
+
+        Returns
+        -------
+        dict
+            Dictionary with keys 'datetime', 'title', and 'link'.
+        """
+        time_tag = self.select_one(self.time, el)
+        datetime = self.attr(time_tag, "datetime")
+        if datetime is None:
+            datetime = self.text(time_tag)
+
+        title = self.text(self.select_one(self.title, el))
+        link = self.attr(self.select_one(self.link, el), "href")
+
+        return {"datetime": datetime, "title": title, "link": link}
+
+
+def _compile_xpath(css: str, prefix: str) -> etree.XPath:
+    from cssselect import HTMLTranslator
+
+    expression = HTMLTranslator().css_to_xpath(css, prefix=prefix)
+    if prefix == "descendant::":
+        expression = f"({expression})[1]"
+    return etree.XPath(expression)
+
+
+@lru_cache(maxsize=None)
+def compile_selectors(
+    elements: str,
+    time: str,
+    title: str,
+    link: str,
+    backend: str = SOUPSIEVE_BACKEND,
+) -> CompiledSelectors:
+    """
+    Compile a selector set once per process.
+
+    Parameters
+    ----------
+    elements: str
+        CSS selector for the performance elements.
+    time: str
+        CSS selector for the time tag.
+    title: str
+        CSS selector for the performance title tag.
+    link: str
+        CSS selector for the performance link tag.
+    backend: str
+        "soupsieve" (default) or "lxml".
+
+    Returns
+    -------
+    CompiledSelectors
+        Compiled selectors.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown or a selector is invalid.
+    """
+    if backend == SOUPSIEVE_BACKEND:
+        import soupsieve
+
+        try:
+            return CompiledSelectors(
+                backend,
+                soupsieve.compile(elements),
+                soupsieve.compile(time),
+                soupsieve.compile(title),
+                soupsieve.compile(link),
+            )
+        except soupsieve.SelectorSyntaxError as e:
+            raise ValueError(f"Invalid selector: {e}") from e
+
+    if backend == LXML_BACKEND:
+        from cssselect import SelectorError
+
+        try:
+            return CompiledSelectors(
+                backend,
+                _compile_xpath(elements, "descendant-or-self::"),
+                _compile_xpath(time, "descendant::"),
+                _compile_xpath(title, "descendant::"),
+                _compile_xpath(link, "descendant::"),
+            )
+        except SelectorError as e:
+            raise ValueError(f"Invalid selector: {e}") from e
+
+    raise ValueError(f"Unknown selector backend '{backend}', expected one of {SELECTOR_BACKENDS}")
+
+
+@lru_cache(maxsize=None)
+def compile_selector(css: str, backend: str = SOUPSIEVE_BACKEND) -> Any:
+    """
+    Compile a single selector whose first match is looked up with `CompiledSelectors.select_one`.
+
+    Parameters
+    ----------
+    css: str
+        CSS selector, e.g. of a pagination link.
+    backend: str
+        "soupsieve" (default) or "lxml".
+
+    Returns
+    -------
+    Any
+        `soupsieve.SoupSieve` or `etree.XPath`, depending on the backend.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown or the selector is invalid.
+    """
+    if backend == SOUPSIEVE_BACKEND:
+        import soupsieve
+
+        try:
+            return soupsieve.compile(css)
+        except soupsieve.SelectorSyntaxError as e:
+            raise ValueError(f"Invalid selector: {e}") from e
+
+    if backend == LXML_BACKEND:
+        from cssselect import SelectorError
+
+        try:
+            return _compile_xpath(css, "descendant::")
+        except SelectorError as e:
+            raise ValueError(f"Invalid selector: {e}") from e
+
+    raise ValueError(f"Unknown selector backend '{backend}', expected one of {SELECTOR_BACKENDS}")
+
+
+def compile_theatre_selectors(theatre: dict) -> CompiledSelectors:
+    """
+    Compile the selectors of a theatre configuration entry with its `selector_backend`.
+
+    Parameters
+    ----------
+    theatre: dict
+        Theatre configuration entry.
+
+    Returns
+    -------
+    CompiledSelectors
+        Compiled selectors.
+    """
+    selectors = theatre["selectors"]
+    return compile_selectors(
+        selectors["elements"],
+        selectors["time"],
+        selectors["title"],
+        selectors["link"],
+        backend=theatre.get("selector_backend", SOUPSIEVE_BACKEND),
+    )
@@ -0,0 +1,217 @@
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from monitor.parser.performance import DEFAULT_TIMEZONE, Performance
+from monitor.utils.logger import forward_logging, logger, receive_logging
+
+
+def shard_of(key: str, count: int) -> int:
+    """
+    Return the shard (0 <= shard < count) of a theatre.
+
+    The shard is derived from a blake2b digest of the key, so it is the same in every process
+    and on every node, unlike the salted built-in `hash`.
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def shard_key(theatre: dict) -> str:
+    """Theatres are sharded by name, or by their `shard_key` to keep e.g. theatres of one host together."""
+    return str(theatre.get("shard_key") or theatre.get("name", ""))
+
+
+def select_shard(theatres: list[dict], index: int, count: int) -> list[dict]:
+    """
+    Return the theatres of one shard, in configuration order.
+
+    Parameters
+    ----------
+    theatres: list[dict]
+        Theatre configuration entries.
+    index: int
+        Shard index, 0 <= index < count.
+    count: int
+        Number of shards.
+
+    Returns
+    -------
+    list[dict]
+        Theatres whose `shard_key` hashes to `index`.
+    """
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index {index} out of range for {count} shards")
+    return [theatre for theatre in theatres if shard_of(shard_key(theatre), count) == index]
+
+
+def parse_shard_arg(value: str) -> tuple[int, int]:
+    """
+    Parse a `--shard i/N` value (1 <= i <= N) into a 0-based (index, count) pair.
+
+    Raises
+    ------
+    ValueError
+        If the value is not of the form "i/N" with 1 <= i <= N.
+    """
+    try:
+        number, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N, e.g. 1/3") from None
+    if not 1 <= number <= count:
+        raise ValueError(f"Invalid shard '{value}', expected 1 <= i <= N")
+    return number - 1, count
+
+
+def _theatre_timezone(theatre: dict, cfg: dict) -> str:
+    return theatre.get("timezone", cfg["general"].get("timezone", DEFAULT_TIMEZONE))
+
+
+def _init_worker(log_queue: multiprocessing.Queue, general: dict) -> None:
+    from monitor.utils.http import configure_http
+
+    forward_logging(log_queue)
+    configure_http(general.get("http"))
+
+
+def _parse_in_worker(cfg: dict) -> tuple[dict[str, list[tuple]], dict[str, dict | None]]:
+    """
+    Parse one shard in a worker process.
+
+    Returns compact tuples instead of Performance objects, and the circuit breaker states the
+    shard changed, which the coordinating process merges and saves once.
+    """
+    from monitor.parser.parsing import parse_all
+    from monitor.parser.retry import CircuitBreaker
+
+    breaker = CircuitBreaker.from_config(cfg, persist=False)
+    parsed = parse_all(cfg, breaker=breaker)
+    changes = breaker.changes() if breaker is not None else {}
+    return {name: [p.to_tuple() for p in shows] for name, shows in parsed.items()}, changes
+
+
+class WorkerPool:
+    """
+    Spawned worker processes for `parse_sharded`, kept alive between runs.
+
+    Workers are started on first use and keep their interpreter, imported modules, HTTP
+    session and compiled selectors, so a daemon pays the process start-up only once.
+    A pool broken by a dead worker is replaced on the next run.
+    """
+
+    def __init__(self, processes: int, general: dict | None = None) -> None:
+        self.processes = processes
+        self.general = general or {}
+        # spawned workers start without the parent's threads (log listener, throttle locks)
+        self._context = multiprocessing.get_context("spawn")
+        self._executor: ProcessPoolExecutor | None = None
+        self._listener: Any = None
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, starting it if needed."""
+        if self._executor is None:
+            log_queue = self._context.Queue()
+            self._listener = receive_logging(log_queue)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(log_queue, self.general),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut the workers down; the pool starts new ones if it is used again."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _merge_breaker_changes(cfg: dict, changes: list[dict[str, dict | None]]) -> None:
+    """Save the circuit breaker states changed by the workers, a failing host winning over a closed one."""
+    merged: dict[str, dict | None] = {}
+    for worker_changes in changes:
+        for host, state in worker_changes.items():
+            if state is not None or merged.get(host) is None:
+                merged[host] = state
+    if merged:
+        from monitor.parser.retry import CircuitBreaker
+
+        breaker = CircuitBreaker.from_config(cfg)
+        if breaker is not None:
+            breaker.merge(merged)
+
+
+def parse_sharded(cfg: dict, processes: int, pool: WorkerPool | None = None) -> dict:
+    """
+    Parse the theatres in `processes` worker processes and merge the results.
+
+    Theatres are split into shards with `shard_of`; each worker parses its shard with
+    `parse_all` (its own thread pool, session and throttle), ships the performances back as
+    (title, datetime, link, timestamp) tuples and forwards its log records to this process.
+    Circuit breaker changes of all workers are saved once by this process.
+    A failed worker only loses the theatres of its shard.
+
+    Parameters
+    ----------
+    cfg: dict
+        Configuration dictionary.
+    processes: int
+        Number of worker processes.
+    pool: WorkerPool | None
+        Worker pool to reuse, with at least `processes` workers; a temporary one is started
+        and shut down if None.
+
+    Returns
+    -------
+    dict
+        Theatre name -> list of Performance records, in configuration order, like `parse_all`.
+    """
+    theatres = cfg.get("theatres", [])
+    shards = [select_shard(theatres, i, processes) for i in range(processes)]
+    shards = [shard for shard in shards if shard]
+    if not shards:
+        return {}
+
+    owned = pool is None
+    if pool is None:
+        pool = WorkerPool(len(shards), cfg.get("general", {}))
+    parsed: dict[str, list[tuple]] = {}
+    breaker_changes = []
+    broken = False
+    try:
+        executor = pool.executor()
+        futures = [(shard, executor.submit(_parse_in_worker, {**cfg, "theatres": shard})) for shard in shards]
+        for shard, future in futures:
+            try:
+                shard_parsed, changes = future.result()
+            except Exception as e:
+                names = ", ".join(str(th.get("name")) for th in shard)
+                logger.error(f"Worker parsing theatres {names} failed: {e}")
+                broken = broken or isinstance(e, BrokenProcessPool)
+                continue
+            parsed.update(shard_parsed)
+            breaker_changes.append(changes)
+    finally:
+        if owned or broken:
+            pool.close()
+    _merge_breaker_changes(cfg, breaker_changes)
+
+    results = {}
+    for theatre in theatres:
+        name = theatre.get("name")
+        if name in parsed:
+            tz = _theatre_timezone(theatre, cfg)
+            results[name] = [Performance.from_tuple(values, tz) for values in parsed[name]]
+    return results
@@ -0,0 +1,492 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urljoin, urlsplit
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from monitor.parser.generic_parser import fetch_response
+from monitor.parser.retry import CircuitBreaker, RetryPolicy
+from monitor.parser.throttle import HostThrottle
+from monitor.utils.http_cache import HTTPCache, conditional_headers, variant_key
+from monitor.utils.logger import logger
+from monitor.utils.metrics import metrics
+from monitor.utils.paths import data_dir
+
+HTML_SOURCE = "html"
+
+
+class SourceAdapter(ABC):
+    """
+    Turns a response body into performance records.
+
+    An adapter is created once per theatre from its `source` configuration and must emit
+    the same {"datetime", "title", "link"} records as the CSS scraper. Register new
+    adapters with `register_adapter`.
+    """
+
+    name = ""
+
+    def __init__(self, options: dict) -> None:
+        self.options = options
+
+    @abstractmethod
+    def parse(self, content: bytes, url: str, encoding: str | None = None) -> list[dict]:
+        """
+        Parse a response body.
+
+        Parameters
+        ----------
+        content: bytes
+            Raw response body.
+        url: str
+            URL the body was fetched from; relative links are resolved against it.
+        encoding: str | None
+            Charset announced by the server, if any.
+
+        Returns
+        -------
+        list[dict]
+            Performances with 'datetime', 'title' and 'link'.
+        """
+
+
+SOURCE_ADAPTERS: dict[str, type[SourceAdapter]] = {}
+
+
+def register_adapter(cls: type[SourceAdapter]) -> type[SourceAdapter]:
+    """Class decorator adding an adapter to SOURCE_ADAPTERS under its `name`."""
+    SOURCE_ADAPTERS[cls.name] = cls
+    return cls
+
+
+def create_adapter(source: dict) -> SourceAdapter:
+    """
+    Create the adapter of a theatre's `source` configuration.
+
+    Raises
+    ------
+    ValueError
+        If the source type is unknown or its options are invalid.
+    """
+    source_type = source.get("type", HTML_SOURCE)
+    if source_type not in SOURCE_ADAPTERS:
+        raise ValueError(f"Unknown source type '{source_type}', expected one of {sorted(SOURCE_ADAPTERS)}")
+    return SOURCE_ADAPTERS[source_type]({k: v for k, v in source.items() if k != "type"})
+
+
+def compile_path(path: str | None) -> tuple[str | int, ...]:
+    """Split a dotted field path ("data.events", "dates.0.start") into keys and list indexes."""
+    if not path:
+        return ()
+    return tuple(int(part) if part.lstrip("-").isdigit() else part for part in path.split("."))
+
+
+def resolve_path(value: Any, path: tuple[str | int, ...]) -> Any:
+    """Follow a compiled path through nested dicts and lists, returning None when it does not exist."""
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key) if not isinstance(key, int) else value.get(str(key))
+        elif isinstance(value, list) and isinstance(key, int) and -len(value) <= key < len(value):
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def _text(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return None
+    return str(value).strip()
+
+
+def _link(value: Any, url: str) -> str | None:
+    link = _text(value)
+    return urljoin(url, link) if link else None
+
+
+@register_adapter
+class JSONAdapter(SourceAdapter):
+    """
+    Program served by a JSON API.
+
+    Options: 'items' is the dotted path to the list of events (empty for a top-level list),
+    'fields' maps 'datetime', 'title' and 'link' to dotted paths inside an event.
+    """
+
+    name = "json"
+
+    def __init__(self, options: dict) -> None:
+        super().__init__(options)
+        fields = options.get("fields") or {}
+        missing = {"datetime", "title"} - set(fields)
+        if missing:
+            raise ValueError(f"JSON source needs field paths for {', '.join(sorted(missing))}")
+        self.items_path = compile_path(options.get("items"))
+        self.field_paths = {name: compile_path(fields.get(name)) for name in ("datetime", "title", "link")}
+
+    def parse(self, content: bytes, url: str, encoding: str | None = None) -> list[dict]:
+        return self.records(json.loads(content), url)
+
+    def records(self, data: Any, url: str) -> list[dict]:
+        """Map the events under the 'items' path of decoded JSON to performance records."""
+        items = resolve_path(data, self.items_path)
+        if not isinstance(items, list):
+            raise ValueError(f"JSON path '{self.options.get('items')}' of {url} is not a list")
+
+        dt_path, title_path, link_path = (self.field_paths[n] for n in ("datetime", "title", "link"))
+        return [
+            {
+                "datetime": _text(resolve_path(item, dt_path)),
+                "title": _text(resolve_path(item, title_path)) or "",
+                "link": _link(resolve_path(item, link_path), url) if link_path else None,
+            }
+            for item in items
+        ]
+
+
+_JSON_LD_RE = re.compile(
+    rb"<script[^>]+type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _iter_json_ld_nodes(node: Any) -> Iterator[dict]:
+    if isinstance(node, list):
+        for child in node:
+            yield from _iter_json_ld_nodes(child)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "itemListElement", "item", "subEvent"):
+            if key in node:
+                yield from _iter_json_ld_nodes(node[key])
+
+
+@register_adapter
+class JSONLDAdapter(SourceAdapter):
+    """
+    Schema.org events embedded as JSON-LD in an HTML page.
+
+    Only the <script type="application/ld+json"> blocks are located (with a byte regex)
+    and decoded, the page itself is never parsed into a DOM. Nodes whose @type ends with
+    "Event" (Event, TheaterEvent, ...) or is listed in the 'types' option are emitted.
+    """
+
+    name = "jsonld"
+
+    def __init__(self, options: dict) -> None:
+        super().__init__(options)
+        self.types = frozenset(options.get("types") or ())
+
+    def _is_event(self, node: dict) -> bool:
+        types = node.get("@type")
+        for t in types if isinstance(types, list) else [types]:
+            if isinstance(t, str) and (t in self.types or (not self.types and t.endswith("Event"))):
+                return True
+        return False
+
+    def parse(self, content: bytes, url: str, encoding: str | None = None) -> list[dict]:
+        performances = []
+        for match in _JSON_LD_RE.finditer(content):
+            block = match.group(1).strip()
+            try:
+                data = json.loads(block.decode(encoding or "utf-8", errors="replace"))
+            except ValueError as e:
+                logger.info("Skipping invalid JSON-LD block on %s: %s", url, e)
+                continue
+            for node in _iter_json_ld_nodes(data):
+                if self._is_event(node):
+                    performances.append(
+                        {
+                            "datetime": _text(node.get("startDate")),
+                            "title": _text(node.get("name")) or "",
+                            "link": _link(node.get("url") or node.get("@id"), url),
+                        }
+                    )
+        return performances
+
+
+DEFAULT_EMBEDDED_VARIABLE = "__NEXT_DATA__"
+
+_JSON_PARSE_RE = re.compile(r"JSON\.parse\(\s*")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def payload_patterns(variable: str) -> tuple[re.Pattern[bytes], ...]:
+    """
+    Byte patterns ending right before an embedded payload, tried in order.
+
+    The first matches a JSON script element with the variable as id (Next.js'
+    `<script id="__NEXT_DATA__" type="application/json">`), the second an assignment such
+    as `window.__INITIAL_STATE__ = {...}` or `window["__INITIAL_STATE__"] = JSON.parse("...")`.
+    """
+    name = re.escape(variable.encode("utf-8"))
+    return (
+        re.compile(rb"<script\b[^>]*\bid\s*=\s*[\"']?" + name + rb"[\"']?[^>]*>\s*", re.IGNORECASE),
+        re.compile(rb"\b" + name + rb"[\"']?\]?\s*=(?!=)\s*"),
+    )
+
+
+def decode_payload(text: str) -> Any:
+    """Decode the JSON value or `JSON.parse("...")` call at the start of `text`, ignoring the code after it."""
+    text = text.lstrip()
+    call = _JSON_PARSE_RE.match(text)
+    if call is None:
+        return _JSON_DECODER.raw_decode(text)[0]
+    literal, _ = _JSON_DECODER.raw_decode(text, call.end())
+    if not isinstance(literal, str):
+        raise ValueError("JSON.parse argument is not a string literal")
+    return json.loads(literal)
+
+
+class PayloadLocations:
+    """
+    Where the embedded payload of each site was last found, as (pattern index, byte offset).
+
+    The locations are kept in a small JSON file (by default `payload_locations.json` in the
+    data directory) so cron runs reuse them too; the file is only rewritten when a location
+    changes. With `path` None they are only kept in memory.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._locations: dict[str, list[int]] | None = None
+
+    def _load(self) -> dict[str, list[int]]:
+        if self._locations is None:
+            try:
+                self._locations = json.loads(self.path.read_text(encoding="utf-8")) if self.path else {}
+            except (OSError, ValueError):
+                self._locations = {}
+        return self._locations
+
+    def get(self, key: str) -> tuple[int, int] | None:
+        with self._lock:
+            location = self._load().get(key)
+        return (location[0], location[1]) if location else None
+
+    def set(self, key: str, index: int, offset: int) -> None:
+        with self._lock:
+            locations = self._load()
+            if locations.get(key) == [index, offset]:
+                return
+            locations[key] = [index, offset]
+            if self.path is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(locations, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Cannot save payload locations to {self.path}: {e}")
+
+
+_payload_locations: PayloadLocations | None = None
+
+
+def get_payload_locations() -> PayloadLocations:
+    """Return the process-wide payload locations stored in the data directory."""
+    global _payload_locations
+    if _payload_locations is None:
+        _payload_locations = PayloadLocations(data_dir() / "payload_locations.json")
+    return _payload_locations
+
+
+@register_adapter
+class EmbeddedDataAdapter(JSONAdapter):
+    """
+    Program embedded as JavaScript state in an HTML page, read without a browser.
+
+    Options: 'variable' names the payload ("__NEXT_DATA__" by default, a "window." prefix is
+    ignored), 'items' and 'fields' map it to performances as for the json source. The payload
+    is sliced out of the raw bytes: the offset where it was found is remembered per host, so
+    later pages of the site are decoded from that offset directly and searched for again
+    only when the page layout moved.
+    """
+
+    name = "embedded"
+
+    def __init__(self, options: dict) -> None:
+        super().__init__(options)
+        self.variable = str(options.get("variable") or DEFAULT_EMBEDDED_VARIABLE).removeprefix("window.")
+        self.patterns = payload_patterns(self.variable)
+        self.locations: PayloadLocations | None = None
+
+    def locate(self, content: bytes, url: str) -> int:
+        """
+        Return the byte offset of the payload in `content`.
+
+        Raises
+        ------
+        ValueError
+            If the page does not embed the payload.
+        """
+        locations = self.locations or get_payload_locations()
+        key = f"{urlsplit(url).netloc}|{self.variable}"
+        order = list(range(len(self.patterns)))
+        cached = locations.get(key)
+        if cached is not None:
+            index, start = cached
+            match = self.patterns[index].match(content, start) if index < len(self.patterns) else None
+            if match:
+                return match.end()
+            order.sort(key=lambda i: i != index)
+
+        for index in order:
+            match = self.patterns[index].search(content)
+            if match:
+                locations.set(key, index, match.start())
+                return match.end()
+        raise ValueError(f"No embedded '{self.variable}' payload on {url}")
+
+    def parse(self, content: bytes, url: str, encoding: str | None = None) -> list[dict]:
+        offset = self.locate(content, url)
+        # an inline script cannot contain "</script", so the payload ends before it
+        end = content.find(b"</script", offset)
+        payload = content[offset : end if end != -1 else len(content)]
+        return self.records(decode_payload(payload.decode(encoding or "utf-8", errors="replace")), url)
+
+
+_ICAL_ESCAPES = re.compile(r"\\([\\;,nN])")
+
+
+def _ical_unescape(value: str) -> str:
+    return _ICAL_ESCAPES.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _ical_datetime(value: str, params: dict[str, str]) -> str | None:
+    """Convert an iCal DATE / DATE-TIME value to ISO 8601."""
+    value = value.strip()
+    try:
+        if params.get("VALUE") == "DATE" or len(value) == 8:
+            return date(int(value[:4]), int(value[4:6]), int(value[6:8])).isoformat()
+        dt = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+    if value.endswith("Z"):
+        dt = dt.replace(tzinfo=timezone.utc)
+    elif "TZID" in params:
+        try:
+            dt = dt.replace(tzinfo=ZoneInfo(params["TZID"].strip('"')))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return dt.isoformat()
+
+
+@register_adapter
+class ICalAdapter(SourceAdapter):
+    """
+    iCalendar (.ics) feed: every VEVENT's DTSTART, SUMMARY and URL.
+
+    The feed is read line by line (with RFC 5545 line unfolding), no calendar object model is built.
+    """
+
+    name = "ical"
+
+    def parse(self, content: bytes, url: str, encoding: str | None = None) -> list[dict]:
+        text = content.decode(encoding or "utf-8", errors="replace")
+        # unfold continuation lines, which start with a space or a tab
+        text = re.sub(r"\r?\n[ \t]", "", text)
+
+        performances = []
+        event: dict | None = None
+        for line in text.splitlines():
+            name, _, value = line.partition(":")
+            name, *raw_params = name.split(";")
+            name = name.upper()
+            if name == "BEGIN" and value.strip().upper() == "VEVENT":
+                event = {"datetime": None, "title": "", "link": None}
+            elif name == "END" and value.strip().upper() == "VEVENT" and event is not None:
+                performances.append(event)
+                event = None
+            elif event is not None:
+                if name == "DTSTART":
+                    params = dict(p.split("=", 1) for p in raw_params if "=" in p)
+                    event["datetime"] = _ical_datetime(value, {k.upper(): v for k, v in params.items()})
+                elif name == "SUMMARY":
+                    event["title"] = _ical_unescape(value).strip()
+                elif name == "URL":
+                    event["link"] = _link(value, url)
+        return performances
+
+
+def fetch_source(
+    url: str,
+    adapter: SourceAdapter,
+    throttle: HostThrottle | None = None,
+    parse_delay: float = 0,
+    cache: HTTPCache | None = None,
+    max_results: int | None = None,
+    retry_policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> list[dict]:
+    """
+    Fetch a URL and parse it with a source adapter.
+
+    Parameters
+    ----------
+    url: str
+        The URL to fetch data from.
+    adapter: SourceAdapter
+        Adapter of the theatre's source.
+    throttle: HostThrottle | None
+        Shared per-host throttle passed down to `fetch_response`.
+    parse_delay: float
+        Minimum delay in seconds between two requests to the same host.
+    cache: HTTPCache | None
+        HTTP cache; a 304 response reuses the previously parsed performances.
+    max_results: int | None
+        Maximum number of performances to return.
+    retry_policy: RetryPolicy | None
+        Retry policy passed down to `fetch_response`.
+    breaker: CircuitBreaker | None
+        Per-host circuit breaker passed down to `fetch_response`.
+
+    Returns
+    -------
+    list[dict]
+        List of dictionaries with parsed performance data.
+    """
+    variant = variant_key(adapter.name, adapter.options, max_results)
+    entry = cache.get(url, variant) if cache is not None else None
+
+    r = fetch_response(
+        url,
+        throttle=throttle,
+        parse_delay=parse_delay,
+        headers=conditional_headers(entry),
+        retry_policy=retry_policy,
+        breaker=breaker,
+    )
+    if r.status_code == 304 and entry is not None:
+        logger.info("Not modified, reusing cached performances for %s", url)
+        cache.touch(url)  # type: ignore[union-attr]
+        return entry["performances"]
+
+    # requests guesses a missing charset from the whole body, which is slow for large feeds
+    encoding = r.encoding if "charset" in r.headers.get("Content-Type", "") else None
+    with metrics.span("parse", source=adapter.name):
+        performances = adapter.parse(r.content, url, encoding=encoding)
+        performances = performances[:max_results] if max_results else performances
+
+    metrics.inc("monitor_bytes_downloaded_total", len(r.content), host=urlsplit(url).netloc)
+
+    if cache is not None:
+        cache.put(
+            url,
+            performances,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+            variant=variant,
+        )
+    return performances
@@ -0,0 +1,121 @@
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from lxml import etree
+
+_COMPOUND_RE = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:[.#][\w-]+)*)$")
+
+
+@dataclass(frozen=True)
+class CompoundSelector:
+    """A single compound CSS selector (`tag`, `tag.class`, `#id`, ...) matched directly on lxml elements."""
+
+    tag: str | None
+    id: str | None
+    classes: frozenset[str]
+
+    def matches(self, el: etree._Element) -> bool:
+        if not isinstance(el.tag, str):
+            return False
+        if self.tag and el.tag.lower() != self.tag:
+            return False
+        if self.id and el.get("id") != self.id:
+            return False
+        if self.classes and not self.classes.issubset((el.get("class") or "").split()):
+            return False
+        return True
+
+
+def parse_compound(selector: str) -> CompoundSelector | None:
+    """
+    Parse a CSS selector that consists of a single compound selector.
+
+    Parameters
+    ----------
+    selector: str
+        CSS selector, e.g. "div.program-single".
+
+    Returns
+    -------
+    CompoundSelector | None
+        The parsed selector, or None if it uses combinators, attributes or pseudo-classes
+        and therefore cannot be matched while streaming.
+    """
+    match = _COMPOUND_RE.match(selector.strip())
+    if not match or not (match.group("tag") or match.group("rest")):
+        return None
+
+    tag = match.group("tag")
+    ids = re.findall(r"#([\w-]+)", match.group("rest"))
+    if len(ids) > 1:
+        return None
+
+    return CompoundSelector(
+        tag=None if tag in (None, "*") else tag.lower(),
+        id=ids[0] if ids else None,
+        classes=frozenset(re.findall(r"\.([\w-]+)", match.group("rest"))),
+    )
+
+
+def iter_matching_html(
+    chunks: Iterable[str | bytes],
+    selector: CompoundSelector,
+    limit: int | None = None,
+) -> list[str]:
+    """
+    Incrementally parse an HTML document and keep only the subtrees matching a selector.
+
+    Non-matching elements are discarded as soon as they are closed, so the full document
+    tree is never held in memory, and parsing stops once `limit` matches were collected.
+
+    Parameters
+    ----------
+    chunks: Iterable[str | bytes]
+        Document chunks, e.g. `response.iter_content(...)`.
+    selector: CompoundSelector
+        Selector of the elements to keep.
+    limit: int | None
+        Maximum number of top-level matches to collect.
+
+    Returns
+    -------
+    list[str]
+        Serialized HTML of the matching subtrees, in document order.
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    fragments: list[str] = []
+    open_matches = 0
+
+    def consume() -> bool:
+        nonlocal open_matches
+        for event, el in parser.read_events():
+            is_match = selector.matches(el)
+            if event == "start":
+                if is_match:
+                    open_matches += 1
+                continue
+
+            if is_match:
+                open_matches -= 1
+                if open_matches == 0:
+                    fragments.append(etree.tostring(el, encoding="unicode", method="html", with_tail=False))
+                    if limit is not None and len(fragments) >= limit:
+                        return True
+            if open_matches == 0:
+                el.clear(keep_tail=False)
+                parent = el.getparent()
+                while parent is not None and el.getprevious() is not None:
+                    del parent[0]
+        return False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        parser.feed(chunk)
+        if consume():
+            return fragments
+
+    parser.close()
+    consume()
+    return fragments
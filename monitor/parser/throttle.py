@@ -0,0 +1,47 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class HostThrottle:
+    """
+    Per-host politeness gate shared by concurrent fetches.
+
+    Every call to `wait` reserves the next free slot for the URL's host, so requests
+    to the same host are spaced at least `delay` seconds apart while requests to
+    different hosts proceed in parallel.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_slot: dict[str, float] = {}
+
+    def wait(self, url: str, delay: float) -> float:
+        """
+        Block until a request to the URL's host is allowed.
+
+        Parameters
+        ----------
+        url: str
+            URL about to be requested.
+        delay: float
+            Minimum number of seconds between two requests to the same host.
+
+        Returns
+        -------
+        float
+            Number of seconds spent waiting.
+        """
+        if not delay or delay <= 0:
+            return 0.0
+
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + delay
+
+        sleep_for = slot - now
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        return max(sleep_for, 0.0)
@@ -0,0 +1,294 @@
+import sqlite3
+import time
+from html import escape
+from typing import TYPE_CHECKING, Callable
+
+from monitor.notifier.formatting import (
+    format_changes_html,
+    format_theatre_schedule_html,
+)
+from monitor.notifier.queue import TelegramSendQueue
+from monitor.notifier.rendering import RenderCache, content_hash
+from monitor.notifier.subscriptions import SubscriptionIndex, load_subscriptions
+from monitor.parser.performance import DEFAULT_TIMEZONE, as_performance
+from monitor.parser.throttle import HostThrottle
+from monitor.storage.archive import Archive
+from monitor.storage.state import StateStore
+from monitor.utils.load_cfg import index_theatres
+from monitor.utils.logger import logger
+from monitor.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from monitor.parser.sharding import WorkerPool
+
+
+def _render(renders: RenderCache | None, digest: str | None, build: Callable[[], str]) -> str:
+    return renders.render(digest, build) if renders is not None and digest is not None else build()
+
+
+def _covered_until(shows: list, limit: int | None) -> float | None:
+    """
+    Return the last start a schedule cut at `limit` results still covers.
+
+    None if the schedule was not truncated, so every later performance is covered too.
+    """
+    if limit is None or len(shows) < limit:
+        return None
+    starts = [show.timestamp for show in map(as_performance, shows) if show.timestamp is not None]
+    return max(starts, default=float("-inf"))
+
+
+def _apply_digests(
+    pending: dict,
+    subscriptions: SubscriptionIndex,
+    store: StateStore | None,
+    digest_theatres_info: dict | None,
+    now: float,
+) -> tuple[dict, list[tuple[tuple[str, str], str]]]:
+    """
+    Keep only the subscribers whose digest window is due (and all without a digest).
+
+    Returns
+    -------
+    tuple[dict, list[tuple[tuple[str, str], str]]]
+        The pending (Subscription, theatre name) -> performances to notify, and the send queue
+        key and state key of every due digest, to be marked as checked after the flush.
+    """
+    if not any(sub.digest is not None for sub in subscriptions.subscriptions):
+        return pending, []
+    if store is None:
+        logger.warning("Digests need the state store, sending changes right away")
+        return pending, []
+
+    if digest_theatres_info is not None:
+        latest = subscriptions.fan_out(digest_theatres_info, now)
+        pending = {key: shows for key, shows in pending.items() if key[0].digest is None}
+        pending.update((key, shows) for key, shows in latest.items() if key[0].digest is not None)
+
+    due = []
+    for sub, theatre_name in list(pending):
+        if sub.digest is None:
+            continue
+        state_key = sub.state_key(theatre_name)
+        if sub.digest.is_due(store.last_digest(state_key), now):
+            due.append(((sub.chat_id, theatre_name), state_key))
+        else:
+            del pending[(sub, theatre_name)]
+    return pending, due
+
+
+def notify(
+    cfg: dict,
+    parsed_theatres_info: dict,
+    store: StateStore | None,
+    bot_token: str,
+    chat_id: str | None,
+    queue: TelegramSendQueue | None = None,
+    subscriptions: SubscriptionIndex | None = None,
+    renders: RenderCache | None = None,
+    digest_theatres_info: dict | None = None,
+) -> int:
+    """
+    Send the parsed schedules (or only their changes, when a state store is given) to Telegram.
+
+    Every theatre is scraped once and its performances are fanned out in memory to each
+    subscriber's filters. Messages go through a TelegramSendQueue, which coalesces, splits
+    and paces them; a subscriber's new state is committed only once its message was delivered.
+
+    Subscribers with a digest schedule are only diffed when their digest window is due, so the
+    stored state stays at the last delivered digest and the next one reports every change since.
+
+    Parameters
+    ----------
+    cfg: dict
+        Configuration dictionary.
+    parsed_theatres_info: dict
+        Theatre name -> parsed performances, as returned by parse_all.
+    store: StateStore | None
+        State store for change detection; None sends full schedules.
+    bot_token: str
+        Telegram bot token.
+    chat_id: str | None
+        Default Telegram chat ID, used when the config has no `subscriptions`.
+    queue: TelegramSendQueue | None
+        Send queue to reuse; a new one configured from `general.telegram` is created if None.
+    subscriptions: SubscriptionIndex | None
+        Precompiled subscriptions; built from the config if None.
+    renders: RenderCache | None
+        Rendered messages and delivered content to reuse between runs; recipients whose shows
+        did not change since their last delivery are skipped. None formats every message.
+    digest_theatres_info: dict | None
+        Latest performances of all theatres, including ones not parsed in this run, for the
+        subscribers whose digest is due; defaults to `parsed_theatres_info`.
+
+    Returns
+    -------
+    int
+        Number of theatre messages delivered.
+    """
+    if queue is None:
+        queue = TelegramSendQueue(bot_token, cfg.get("general", {}).get("telegram"))
+    if subscriptions is None:
+        subscriptions = SubscriptionIndex(load_subscriptions(cfg, chat_id))
+
+    now = time.time()
+    pending, digest_checks = _apply_digests(
+        subscriptions.fan_out(parsed_theatres_info, now), subscriptions, store, digest_theatres_info, now
+    )
+    theatre_configs = index_theatres(cfg)
+    limit = cfg.get("general", {}).get("results_per_theatre")
+    schedules = {**(digest_theatres_info or {}), **parsed_theatres_info}
+    covered_until = {name: _covered_until(shows, limit) for name, shows in schedules.items()}
+    diffs = {}
+    rendered: dict = {}
+    for (sub, theatre_name), shows in pending.items():
+        theatre_cfg = theatre_configs.get(theatre_name, {})
+        dt_parsable = theatre_cfg.get("time_parseable", False)
+        tz = theatre_cfg.get("timezone", cfg.get("general", {}).get("timezone", DEFAULT_TIMEZONE))
+        state_key = sub.state_key(theatre_name)
+        digest = content_hash(shows, tz=tz, dt_parsable=dt_parsable) if renders is not None else None
+        if renders is not None and renders.is_delivered(state_key, digest):
+            logger.info(f"Unchanged since last delivery: {theatre_name} (chat {sub.chat_id})")
+            continue
+
+        if store is None:
+            if not shows:
+                continue
+            with metrics.span("format", theatre=theatre_name):
+                message = _render(
+                    renders, digest, lambda: format_theatre_schedule_html(shows, tz=tz, dt_parsable=dt_parsable)
+                )
+        else:
+            diff = store.diff(
+                state_key, shows, now=now, since=sub.covers_from(now), until=covered_until.get(theatre_name)
+            )
+            if not diff:
+                logger.info(f"No changes for theatre: {theatre_name} (chat {sub.chat_id})")
+                if renders is not None:
+                    renders.mark_delivered(state_key, digest)
+                continue
+            with metrics.span("format", theatre=theatre_name):
+                message = _render(
+                    renders,
+                    content_hash(diff.added, diff.changed, diff.removed, tz=tz, dt_parsable=dt_parsable),
+                    lambda: format_changes_html(diff, tz=tz, dt_parsable=dt_parsable),
+                )
+            diffs.setdefault((sub.chat_id, theatre_name), []).append((state_key, diff))
+
+        logger.info(f"Queueing update of theatre: {theatre_name} for chat {sub.chat_id}")
+        message = f"<b>{escape(theatre_name, quote=False)}</b>\n\n" + message
+        queue.enqueue(sub.chat_id, message, key=(sub.chat_id, theatre_name))
+        rendered.setdefault((sub.chat_id, theatre_name), []).append((state_key, digest))
+
+    delivered = queue.flush()
+    for key, sent in delivered.items():
+        if not sent:
+            continue
+        if store is not None:
+            for state_key, diff in diffs.get(key, ()):
+                store.commit(state_key, diff)
+        if renders is not None:
+            for state_key, digest in rendered.get(key, ()):
+                renders.mark_delivered(state_key, digest)
+    for key, state_key in digest_checks:
+        # checked without changes, or delivered; failed digests are retried on the next run
+        if delivered.get(key, True):
+            store.mark_digest(state_key, now)  # type: ignore[union-attr]
+
+    return sum(delivered.values())
+
+
+def run_once(
+    cfg: dict,
+    store: StateStore | None,
+    bot_token: str,
+    chat_id: str | None,
+    throttle: HostThrottle | None = None,
+    queue: TelegramSendQueue | None = None,
+    subscriptions: SubscriptionIndex | None = None,
+    renders: RenderCache | None = None,
+    archive: Archive | None = None,
+    theatres: list[dict] | None = None,
+    latest: dict | None = None,
+    workers: "WorkerPool | None" = None,
+) -> dict:
+    """
+    Parse the configured theatres and notify about them.
+
+    With `general.processes` > 1 the theatres are parsed in that many worker processes
+    (see `monitor.parser.sharding`) and the merged results are notified from this process.
+
+    Parameters
+    ----------
+    cfg: dict
+        Configuration dictionary.
+    store: StateStore | None
+        State store for change detection.
+    bot_token: str
+        Telegram bot token.
+    chat_id: str | None
+        Default Telegram chat ID, used when the config has no `subscriptions`.
+    throttle: HostThrottle | None
+        Per-host throttle to reuse between runs.
+    queue: TelegramSendQueue | None
+        Send queue to reuse between runs.
+    subscriptions: SubscriptionIndex | None
+        Precompiled subscriptions to reuse between runs.
+    renders: RenderCache | None
+        Render cache to reuse between runs.
+    archive: Archive | None
+        Scrape archive every parsed schedule is appended to.
+    theatres: list[dict] | None
+        Theatres to parse in this run, defaults to all configured theatres.
+    latest: dict | None
+        Latest performances of every theatre, updated in place with this run's results and
+        used for due digests, so they also cover theatres parsed in earlier runs.
+    workers: WorkerPool | None
+        Worker processes to reuse between runs when `general.processes` > 1.
+
+    Returns
+    -------
+    dict
+        Parsed performances per theatre.
+    """
+    if subscriptions is None:
+        subscriptions = SubscriptionIndex(load_subscriptions(cfg, chat_id))
+
+    theatres = cfg.get("theatres", []) if theatres is None else theatres
+    subscribed = [th for th in theatres if subscriptions.for_theatre(th.get("name"))]
+    if len(subscribed) < len(theatres):
+        logger.info(f"Skipping {len(theatres) - len(subscribed)} theatres without subscribers")
+    parse_cfg = {**cfg, "theatres": subscribed}
+
+    logger.info("Start parsing theatres")
+    processes = min(cfg.get("general", {}).get("processes", 1), len(subscribed))
+    if processes > 1:
+        from monitor.parser.sharding import parse_sharded
+
+        parsed_theatres_info = parse_sharded(parse_cfg, processes, pool=workers)
+    else:
+        from monitor.parser import parse_all
+
+        parsed_theatres_info = parse_all(parse_cfg, throttle=throttle)
+    logger.info("Finished parsing theatres")
+
+    if archive is not None:
+        try:
+            archive.record_all(parsed_theatres_info)
+        except sqlite3.Error as e:
+            logger.error(f"Cannot archive the scrape: {e}")
+
+    if latest is not None:
+        latest.update(parsed_theatres_info)
+    notify(
+        cfg,
+        parsed_theatres_info,
+        store,
+        bot_token,
+        chat_id,
+        queue=queue,
+        subscriptions=subscriptions,
+        renders=renders,
+        digest_theatres_info=latest,
+    )
+    return parsed_theatres_info
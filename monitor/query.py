@@ -0,0 +1,150 @@
+import argparse
+import sys
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from monitor.parser.performance import DEFAULT_TIMEZONE, get_zone
+from monitor.storage.archive import Archive
+from monitor.utils.load_cfg import load_config
+
+TITLE_HELP = "case-insensitive part of the title; shorter than 3 characters matches the beginning of the title"
+
+
+def next_weekend(today: date) -> tuple[date, date]:
+    """Return the Saturday and the Monday after the next weekend (today, if it is Saturday or Sunday)."""
+    saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+    if today.weekday() == 6:
+        saturday = today - timedelta(days=1)
+    return saturday, saturday + timedelta(days=2)
+
+
+def _format_time(timestamp: float | None, tz: str) -> str:
+    if timestamp is None:
+        return "-"
+    return datetime.fromtimestamp(timestamp, get_zone(tz)).strftime("%Y-%m-%d %H:%M")
+
+
+def _format_days(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds / 86400:.1f}d"
+
+
+def _print_table(header: list[str], rows: list[list[str]]) -> None:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m monitor.query", description="Query the scrape archive.")
+    parser.add_argument("--config", type=Path, default=None, help="path to the theatres configuration file")
+    parser.add_argument("--db", type=Path, default=None, help="archive database, defaults to general.archive.path")
+    parser.add_argument("--theatre", default=None, help="only this theatre")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    first_seen = commands.add_parser("first-seen", help="when a title first appeared in a program")
+    first_seen.add_argument("title", help=TITLE_HELP)
+
+    availability = commands.add_parser("availability", help="how long each date of a title stayed on sale")
+    availability.add_argument("title", help=TITLE_HELP)
+
+    upcoming = commands.add_parser("upcoming", help="listed shows in a date range, by default the next weekend")
+    upcoming.add_argument("--from", dest="start", type=date.fromisoformat, default=None, help="first day, YYYY-MM-DD")
+    upcoming.add_argument("--to", dest="end", type=date.fromisoformat, default=None, help="last day, YYYY-MM-DD")
+
+    commands.add_parser("stats", help="size of the archive")
+
+    prune = commands.add_parser("prune", help="delete history older than the retention")
+    prune.add_argument("--keep-days", type=float, default=None, help="defaults to general.archive.keep_days")
+
+    compact = commands.add_parser("compact", help="keep one scrape per theatre and day of old history")
+    compact.add_argument("--older-than-days", type=float, default=None, help="defaults to compact_after_days")
+    compact.add_argument("--vacuum", action="store_true", help="also shrink the database file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run the archive query CLI.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to sys.argv.
+
+    Returns:
+        int: Exit status.
+    """
+    args = parse_args(argv)
+    cfg = load_config(args.config) if args.db is None or args.config is not None else {"general": {}}
+    tz = cfg["general"].get("timezone", DEFAULT_TIMEZONE)
+    archive = Archive(args.db, cfg["general"].get("archive")) if args.db else Archive.from_config(cfg, force=True)
+    if archive is None:
+        print("Cannot open the archive", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == "first-seen":
+            rows = archive.first_seen(args.title, args.theatre)
+            _print_table(
+                ["theatre", "title", "first seen", "last seen", "dates", "first start", "last start"],
+                [
+                    [
+                        r["theatre"],
+                        r["title"],
+                        _format_time(r["first_seen"], tz),
+                        _format_time(r["last_seen"], tz),
+                        str(r["dates"]),
+                        _format_time(r["first_start"], tz),
+                        _format_time(r["last_start"], tz),
+                    ]
+                    for r in rows
+                ],
+            )
+        elif args.command == "availability":
+            rows = archive.availability(args.title, args.theatre)
+            _print_table(
+                ["theatre", "title", "start", "first seen", "last seen", "on sale", "gone before start"],
+                [
+                    [
+                        r["theatre"],
+                        r["title"],
+                        _format_time(r["starts_at"], tz) if r["starts_at"] is not None else r["datetime"],
+                        _format_time(r["first_seen"], tz),
+                        "listed" if r["listed"] else _format_time(r["last_seen"], tz),
+                        _format_days(r["listed_seconds"]),
+                        "-" if r["listed"] or (r["lead_seconds"] or 0) <= 0 else _format_days(r["lead_seconds"]),
+                    ]
+                    for r in rows
+                ],
+            )
+        elif args.command == "upcoming":
+            zone = get_zone(tz)
+            today = datetime.now(zone).date()
+            if args.start or args.end:
+                start = args.start or today
+                end = args.end + timedelta(days=1) if args.end else start + timedelta(days=7)
+            else:
+                start, end = next_weekend(today)
+            rows = archive.upcoming(
+                datetime.combine(start, time(), zone).timestamp(),
+                datetime.combine(end, time(), zone).timestamp(),
+                args.theatre,
+            )
+            _print_table(
+                ["start", "theatre", "title", "link"],
+                [[_format_time(r["starts_at"], tz), r["theatre"], r["title"], r["link"] or ""] for r in rows],
+            )
+        elif args.command == "stats":
+            stats = archive.stats()
+            for key in ("scrapes", "shows", "observations"):
+                print(f"{key}: {stats[key]}")
+            print(f"from {_format_time(stats['first_scrape'], tz)} to {_format_time(stats['last_scrape'], tz)}")
+        elif args.command == "prune":
+            print(f"Deleted {archive.prune(args.keep_days)} scrapes and shows")
+        elif args.command == "compact":
+            print(f"Deleted {archive.compact(args.older_than_days, vacuum=args.vacuum)} scrapes")
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from monitor.parser.performance import Performance, as_performance
+from monitor.storage.state import fingerprint
+from monitor.utils.logger import logger
+from monitor.utils.paths import data_dir
+
+DEFAULT_ARCHIVE_OPTIONS: dict = {
+    "enabled": False,
+    # defaults to $MONITOR_DATA_DIR/archive.sqlite3
+    "path": None,
+    # scrapes and shows not seen for longer are deleted by `prune`
+    "keep_days": 365,
+    # scrapes older than this are thinned out to the last one per theatre and day by `compact`
+    "compact_after_days": 30,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    theatre TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    shows INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scrapes_theatre ON scrapes (theatre, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_scrapes_scraped_at ON scrapes (scraped_at);
+CREATE TABLE IF NOT EXISTS shows (
+    id INTEGER PRIMARY KEY,
+    theatre TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    datetime TEXT,
+    link TEXT,
+    starts_at REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    times_seen INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (theatre, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS idx_shows_title ON shows (title_key, theatre);
+CREATE INDEX IF NOT EXISTS idx_shows_starts_at ON shows (starts_at);
+CREATE INDEX IF NOT EXISTS idx_shows_last_seen ON shows (theatre, last_seen);
+CREATE TABLE IF NOT EXISTS observations (
+    scrape_id INTEGER NOT NULL,
+    show_id INTEGER NOT NULL,
+    PRIMARY KEY (scrape_id, show_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_observations_show ON observations (show_id, scrape_id);
+"""
+
+# substring search over the title keys, kept in sync with `shows` by triggers
+TITLE_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE shows_fts USING fts5(title_key, content='shows', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER shows_fts_insert AFTER INSERT ON shows BEGIN
+    INSERT INTO shows_fts (rowid, title_key) VALUES (new.id, new.title_key);
+END;
+CREATE TRIGGER shows_fts_delete AFTER DELETE ON shows BEGIN
+    INSERT INTO shows_fts (shows_fts, rowid, title_key) VALUES ('delete', old.id, old.title_key);
+END;
+CREATE TRIGGER shows_fts_update AFTER UPDATE OF title_key ON shows BEGIN
+    INSERT INTO shows_fts (shows_fts, rowid, title_key) VALUES ('delete', old.id, old.title_key);
+    INSERT INTO shows_fts (rowid, title_key) VALUES (new.id, new.title_key);
+END;
+INSERT INTO shows_fts (shows_fts) VALUES ('rebuild');
+"""
+
+# the trigram index matches substrings of at least this many characters
+TRIGRAM = 3
+
+_LATEST_SCRAPES = "SELECT theatre, MAX(scraped_at) AS scraped_at FROM scrapes GROUP BY theatre"
+
+
+def title_key(title: str) -> str:
+    """Whitespace-collapsed, case-folded title used for lookups."""
+    return " ".join((title or "").split()).casefold()
+
+
+def _prefix_bounds(prefix: str) -> tuple[str, str]:
+    """Return the [low, high) range of the keys starting with a non-empty `prefix`."""
+    last = ord(prefix[-1])
+    if last >= 0x10FFFF:
+        return prefix, prefix + "\U0010ffff"
+    return prefix, prefix[:-1] + chr(last + 1)
+
+
+class Archive:
+    """
+    Append-only SQLite history of every scrape.
+
+    Every run appends one `scrapes` row per theatre and one `observations` row per listed
+    show; `shows` holds each distinct performance once with its first and last sighting,
+    so the analytics queries read one indexed row per performance instead of the whole
+    observation log. Title lookups go through a trigram full-text index (prefix ranges of
+    `idx_shows_title` for shorter queries, or if SQLite has no FTS5), never a scan of `shows`.
+    `prune` enforces retention and `compact` thins out old observations.
+    """
+
+    def __init__(self, path: Path | str, options: dict | None = None) -> None:
+        self.path = Path(path)
+        self.options = {**DEFAULT_ARCHIVE_OPTIONS, **(options or {})}
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.title_search = self._create_title_search()
+
+    def _create_title_search(self) -> bool:
+        """Create the full-text index of titles (and index existing shows) unless it exists."""
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'shows_fts'").fetchone():
+            return True
+        try:
+            self.conn.executescript(f"BEGIN; {TITLE_SEARCH_SCHEMA} COMMIT;")
+        except sqlite3.OperationalError as e:
+            self.conn.rollback()
+            logger.warning(f"SQLite without FTS5 trigram support, title lookups only match the beginning: {e}")
+            return False
+        return True
+
+    def _title_filter(self, title: str, column: str = "title_key", id_column: str = "id") -> tuple[str, list]:
+        """
+        Return an indexed SQL condition matching titles that contain `title`, and its parameters.
+
+        Queries of at least three characters are looked up in the trigram index, shorter
+        ones match the beginning of the title with a range on `idx_shows_title`.
+        """
+        key = title_key(title)
+        if not key:
+            return "1", []
+        if self.title_search and len(key) >= TRIGRAM:
+            phrase = '"' + key.replace('"', '""') + '"'
+            return f"{id_column} IN (SELECT rowid FROM shows_fts WHERE shows_fts MATCH ?)", [phrase]
+        return f"{column} >= ? AND {column} < ?", list(_prefix_bounds(key))
+
+    @classmethod
+    def from_config(cls, cfg: dict, force: bool = False) -> "Archive | None":
+        """
+        Open the archive of `cfg["general"]["archive"]`.
+
+        Parameters
+        ----------
+        cfg: dict
+            Full configuration dictionary.
+        force: bool
+            Open it even if archiving is disabled, e.g. for queries.
+
+        Returns
+        -------
+        Archive | None
+            The archive, or None if it is disabled or cannot be opened.
+        """
+        options = {**DEFAULT_ARCHIVE_OPTIONS, **(cfg.get("general", {}).get("archive") or {})}
+        if not (options["enabled"] or force):
+            return None
+
+        path = options["path"] or data_dir() / "archive.sqlite3"
+        try:
+            return cls(path, options)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Archive disabled, cannot open {path}: {e}")
+            return None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def record(self, theatre: str, performances: list[Performance], now: float | None = None) -> int:
+        """
+        Append a scrape of one theatre.
+
+        Parameters
+        ----------
+        theatre: str
+            Theatre name.
+        performances: list[Performance]
+            Parsed schedule.
+        now: float | None
+            Scrape time as UNIX timestamp, defaults to time.time().
+
+        Returns
+        -------
+        int
+            Id of the new scrape.
+        """
+        now = time.time() if now is None else now
+        rows = {}
+        for item in map(as_performance, performances):
+            fp = fingerprint(item)
+            rows[fp] = (
+                theatre,
+                fp,
+                item.title,
+                title_key(item.title),
+                item.datetime,
+                item.link,
+                item.timestamp,
+                now,
+                now,
+            )
+
+        with self.conn:
+            scrape_id = self.conn.execute(
+                "INSERT INTO scrapes (theatre, scraped_at, shows) VALUES (?, ?, ?)", (theatre, now, len(rows))
+            ).lastrowid
+            self.conn.executemany(
+                """
+                INSERT INTO shows (theatre, fingerprint, title, title_key, datetime, link, starts_at, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (theatre, fingerprint) DO UPDATE SET
+                    title = excluded.title, starts_at = excluded.starts_at,
+                    last_seen = excluded.last_seen, times_seen = times_seen + 1
+                """,
+                rows.values(),
+            )
+            self.conn.execute(
+                """
+                INSERT OR IGNORE INTO observations (scrape_id, show_id)
+                SELECT ?, id FROM shows WHERE theatre = ? AND last_seen = ?
+                """,
+                (scrape_id, theatre, now),
+            )
+        return scrape_id
+
+    def record_all(self, parsed_theatres_info: dict, now: float | None = None) -> None:
+        """Append the scrapes of all parsed theatres, see `record`."""
+        now = time.time() if now is None else now
+        for theatre, performances in parsed_theatres_info.items():
+            self.record(theatre, performances, now)
+
+    def _first_seen_query(self, title: str, theatre: str | None = None) -> tuple[str, list]:
+        condition, params = self._title_filter(title)
+        sql = f"""
+            SELECT theatre, MIN(title) AS title, MIN(first_seen) AS first_seen, MAX(last_seen) AS last_seen,
+                   COUNT(*) AS dates, MIN(starts_at) AS first_start, MAX(starts_at) AS last_start
+            FROM shows
+            WHERE {condition} AND (? IS NULL OR theatre = ?)
+            GROUP BY theatre, title_key
+            ORDER BY first_seen
+            """
+        return sql, [*params, theatre, theatre]
+
+    def first_seen(self, title: str, theatre: str | None = None) -> list[sqlite3.Row]:
+        """
+        When each matching title first appeared in a theatre's program.
+
+        Returns rows with theatre, title, first_seen, last_seen, the number of archived dates
+        and the first and last start, earliest appearance first.
+        """
+        return self.conn.execute(*self._first_seen_query(title, theatre)).fetchall()
+
+    def _availability_query(self, title: str, theatre: str | None = None) -> tuple[str, list]:
+        condition, params = self._title_filter(title, column="s.title_key", id_column="s.id")
+        sql = f"""
+            SELECT s.theatre, s.title, s.datetime, s.link, s.starts_at, s.first_seen, s.last_seen,
+                   s.last_seen - s.first_seen AS listed_seconds,
+                   s.starts_at - s.last_seen AS lead_seconds,
+                   s.last_seen >= (SELECT MAX(scraped_at) FROM scrapes WHERE theatre = s.theatre) AS listed
+            FROM shows AS s
+            WHERE {condition} AND (? IS NULL OR s.theatre = ?)
+            ORDER BY s.starts_at IS NULL, s.starts_at, s.theatre
+            """
+        return sql, [*params, theatre, theatre]
+
+    def availability(self, title: str, theatre: str | None = None) -> list[sqlite3.Row]:
+        """
+        How long every date of a title stayed in the program.
+
+        A date that left the program before it started has usually sold out (or was
+        cancelled): `listed_seconds` is how long it was on sale, `lead_seconds` how long
+        before the start it disappeared. Dates still listed in the theatre's latest scrape
+        have `listed` = 1.
+        """
+        return self.conn.execute(*self._availability_query(title, theatre)).fetchall()
+
+    def upcoming(self, start: float, end: float, theatre: str | None = None) -> list[sqlite3.Row]:
+        """Shows starting in [start, end) that are still listed in their theatre's latest scrape."""
+        return self.conn.execute(
+            f"""
+            SELECT s.theatre, s.title, s.datetime, s.link, s.starts_at, s.first_seen
+            FROM shows AS s JOIN ({_LATEST_SCRAPES}) AS latest ON latest.theatre = s.theatre
+            WHERE s.starts_at >= ? AND s.starts_at < ? AND s.last_seen >= latest.scraped_at
+                AND (? IS NULL OR s.theatre = ?)
+            ORDER BY s.starts_at, s.theatre, s.title
+            """,
+            (start, end, theatre, theatre),
+        ).fetchall()
+
+    def stats(self) -> dict:
+        """Row counts and the archived time span."""
+        row = self.conn.execute("""
+            SELECT (SELECT COUNT(*) FROM scrapes) AS scrapes, (SELECT COUNT(*) FROM shows) AS shows,
+                   (SELECT COUNT(*) FROM observations) AS observations,
+                   (SELECT MIN(scraped_at) FROM scrapes) AS first_scrape,
+                   (SELECT MAX(scraped_at) FROM scrapes) AS last_scrape
+            """).fetchone()
+        return dict(row)
+
+    def prune(self, keep_days: float | None = None, now: float | None = None) -> int:
+        """
+        Delete scrapes older than `keep_days` with their observations, and shows not seen since.
+
+        Returns
+        -------
+        int
+            Number of deleted scrapes and shows.
+        """
+        now = time.time() if now is None else now
+        cutoff = now - (self.options["keep_days"] if keep_days is None else keep_days) * 86400
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM observations WHERE scrape_id IN (SELECT id FROM scrapes WHERE scraped_at < ?)", (cutoff,)
+            )
+            scrapes = self.conn.execute("DELETE FROM scrapes WHERE scraped_at < ?", (cutoff,)).rowcount
+            shows = self.conn.execute(
+                "DELETE FROM shows WHERE last_seen < ? AND NOT EXISTS (SELECT 1 FROM observations WHERE show_id = shows.id)",
+                (cutoff,),
+            ).rowcount
+        return scrapes + shows
+
+    def compact(self, older_than_days: float | None = None, now: float | None = None, vacuum: bool = False) -> int:
+        """
+        Thin out old history to the last scrape per theatre and day.
+
+        `shows` keeps the exact first and last sightings, so only the per-scrape detail of
+        older days is lost. Statistics are refreshed for the query planner afterwards.
+
+        Parameters
+        ----------
+        older_than_days: float | None
+            Only scrapes older than this are thinned out, defaults to `compact_after_days`.
+        now: float | None
+            Current UNIX timestamp, defaults to time.time().
+        vacuum: bool
+            Also rebuild the database file to return the freed space.
+
+        Returns
+        -------
+        int
+            Number of deleted scrapes.
+        """
+        now = time.time() if now is None else now
+        days = self.options["compact_after_days"] if older_than_days is None else older_than_days
+        cutoff = now - days * 86400
+        redundant = """
+            SELECT id FROM scrapes AS s
+            WHERE s.scraped_at < ? AND EXISTS (
+                SELECT 1 FROM scrapes AS later
+                WHERE later.theatre = s.theatre AND later.scraped_at > s.scraped_at
+                    AND later.scraped_at < ? AND CAST(later.scraped_at / 86400 AS INTEGER) = CAST(s.scraped_at / 86400 AS INTEGER)
+            )
+        """
+        with self.conn:
+            self.conn.execute(f"DELETE FROM observations WHERE scrape_id IN ({redundant})", (cutoff, cutoff))
+            removed = self.conn.execute(f"DELETE FROM scrapes WHERE id IN ({redundant})", (cutoff, cutoff)).rowcount
+        self.conn.execute("PRAGMA optimize")
+        if vacuum:
+            self.conn.execute("VACUUM")
+        return removed
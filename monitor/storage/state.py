@@ -0,0 +1,277 @@
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from monitor.parser.performance import Performance, normalize
+from monitor.utils.logger import logger
+from monitor.utils.paths import data_dir
+
+DEFAULT_KEEP_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS performances (
+    theatre TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    title TEXT,
+    datetime TEXT,
+    link TEXT,
+    starts_at REAL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (theatre, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_performances_active ON performances (theatre, active);
+CREATE INDEX IF NOT EXISTS idx_performances_starts_at ON performances (starts_at);
+CREATE TABLE IF NOT EXISTS digests (
+    theatre TEXT PRIMARY KEY,
+    last_check REAL NOT NULL
+);
+"""
+
+
+def fingerprint(item: dict) -> str:
+    """Return a stable fingerprint of a performance's normalized identity."""
+    return hashlib.blake2b("\x1f".join(normalize(item)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def starts_at(item: Performance | dict) -> float | None:
+    """Return the performance start as a UNIX timestamp, or None if the datetime is not ISO 8601."""
+    if isinstance(item, Performance):
+        return item.timestamp
+    try:
+        return datetime.fromisoformat(str(item.get("datetime"))).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class Diff:
+    """Changes of one theatre's schedule compared to the stored state."""
+
+    added: list[Performance] = field(default_factory=list)
+    removed: list[Performance] = field(default_factory=list)
+    changed: list[Performance] = field(default_factory=list)
+    current: dict[str, Performance] = field(default_factory=dict)
+    # end of the covered range of a truncated schedule, see `StateStore.diff`
+    until: float | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _pair_changes(added: list[dict], removed: list[dict]) -> tuple[list[dict], list[dict], list[dict]]:
+    """Match added and removed performances that share a link or a (title, datetime) pair."""
+    changed = []
+    for key in (lambda it: normalize(it)[2], lambda it: normalize(it)[:2]):
+        removed_by_key: dict = {}
+        for it in removed:
+            k = key(it)
+            if k and k != ("", ""):
+                removed_by_key.setdefault(k, []).append(it)
+
+        still_added = []
+        for it in added:
+            candidates = removed_by_key.get(key(it))
+            if candidates:
+                old = candidates.pop(0)
+                removed.remove(old)
+                changed.append(it)
+            else:
+                still_added.append(it)
+        added = still_added
+
+    return added, removed, changed
+
+
+class StateStore:
+    """
+    SQLite store of the performances already announced per theatre.
+
+    Rows are keyed by (theatre, fingerprint) so every lookup is a primary-key probe,
+    and the 'active' index keeps the per-theatre scan bounded by the current schedule
+    regardless of how much history is kept.
+    """
+
+    def __init__(self, path: Path | str, keep_days: float = DEFAULT_KEEP_DAYS) -> None:
+        self.path = Path(path)
+        self.keep_days = keep_days
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "StateStore | None":
+        """
+        Build a store from `cfg["general"]["state"]`.
+
+        Parameters
+        ----------
+        cfg: dict
+            Full configuration dictionary.
+
+        Returns
+        -------
+        StateStore | None
+            The store, or None if change detection is disabled or the database cannot be opened.
+        """
+        state_cfg = cfg.get("general", {}).get("state", {})
+        if not state_cfg.get("enabled", True):
+            return None
+
+        path = state_cfg.get("path") or data_dir() / "state.sqlite3"
+        try:
+            return cls(path, keep_days=state_cfg.get("keep_days", DEFAULT_KEEP_DAYS))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Change detection disabled, cannot open state database {path}: {e}")
+            return None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def diff(
+        self,
+        theatre: str,
+        performances: list[Performance],
+        now: float | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> Diff:
+        """
+        Compare a freshly parsed schedule with the stored one.
+
+        Only performances within the range the schedule covers are reported as removed: not the
+        ones that already took place or left a subscriber's date window, not the ones pushed past
+        the end of a truncated schedule, and not the ones whose start is unknown.
+
+        Parameters
+        ----------
+        theatre: str
+            Theatre name.
+        performances: list[Performance]
+            Parsed performances.
+        now: float | None
+            Current UNIX timestamp, defaults to time.time().
+        since: float | None
+            Start of the covered range as a UNIX timestamp, defaults to `now`.
+        until: float | None
+            End of the covered range, e.g. the last start kept of a truncated schedule; None if
+            the schedule was not truncated.
+
+        Returns
+        -------
+        Diff
+            Added, removed and changed performances.
+        """
+        now = time.time() if now is None else now
+        since = now if since is None else since
+        current = {fingerprint(it): it for it in performances}
+
+        stored = {
+            row[0]: {"title": row[1], "datetime": row[2], "link": row[3], "starts_at": row[4]}
+            for row in self.conn.execute(
+                "SELECT fingerprint, title, datetime, link, starts_at FROM performances WHERE theatre = ? AND active = 1",
+                (theatre,),
+            )
+        }
+
+        added = [it for fp, it in current.items() if fp not in stored]
+        removed = []
+        for fp, row in stored.items():
+            if fp in current:
+                continue
+            if row["starts_at"] is None or row["starts_at"] < since:
+                continue
+            if until is not None and row["starts_at"] > until:
+                continue
+            start = datetime.fromtimestamp(row["starts_at"], timezone.utc)
+            removed.append(Performance(title=row["title"], datetime=row["datetime"], link=row["link"], start=start))
+
+        added, removed, changed = _pair_changes(added, removed)
+        return Diff(added=added, removed=removed, changed=changed, current=current, until=until)
+
+    def commit(self, theatre: str, diff: Diff, now: float | None = None) -> None:
+        """
+        Persist a theatre's current schedule as the new baseline.
+
+        Stored performances missing from a truncated schedule stay active if they start after its
+        end or their start is unknown, so they are not announced as new when they come back.
+
+        Parameters
+        ----------
+        theatre: str
+            Theatre name.
+        diff: Diff
+            Result of `diff` for the same theatre.
+        now: float | None
+            Current UNIX timestamp, defaults to time.time().
+        """
+        now = time.time() if now is None else now
+        with self.conn:
+            self.conn.execute(
+                "UPDATE performances SET active = 0 WHERE theatre = ? AND active = 1 AND (? IS NULL OR starts_at <= ?)",
+                (theatre, diff.until, diff.until),
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO performances (theatre, fingerprint, title, datetime, link, starts_at, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (theatre, fingerprint) DO UPDATE SET last_seen = excluded.last_seen, active = 1
+                """,
+                [
+                    (
+                        theatre,
+                        fp,
+                        it.get("title"),
+                        str(it.get("datetime")) if it.get("datetime") is not None else None,
+                        it.get("link"),
+                        starts_at(it),
+                        now,
+                        now,
+                    )
+                    for fp, it in diff.current.items()
+                ],
+            )
+
+    def last_digest(self, theatre: str) -> float | None:
+        """Return when the changes of a theatre in digest mode were last checked, None if never."""
+        row = self.conn.execute("SELECT last_check FROM digests WHERE theatre = ?", (theatre,)).fetchone()
+        return row[0] if row else None
+
+    def mark_digest(self, theatre: str, now: float | None = None) -> None:
+        """Record that the changes of a theatre in digest mode were checked and, if any, delivered."""
+        now = time.time() if now is None else now
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO digests (theatre, last_check) VALUES (?, ?) "
+                "ON CONFLICT (theatre) DO UPDATE SET last_check = excluded.last_check",
+                (theatre, now),
+            )
+
+    def compact(self, now: float | None = None) -> int:
+        """
+        Drop shows that are over and no longer listed, and inactive rows not seen for `keep_days`.
+
+        Parameters
+        ----------
+        now: float | None
+            Current UNIX timestamp, defaults to time.time().
+
+        Returns
+        -------
+        int
+            Number of deleted rows.
+        """
+        now = time.time() if now is None else now
+        cutoff = now - self.keep_days * 86400
+        with self.conn:
+            cur = self.conn.execute(
+                "DELETE FROM performances WHERE active = 0 AND (starts_at < ? OR last_seen < ?)",
+                (now, cutoff),
+            )
+        return cur.rowcount
@@ -0,0 +1,231 @@
+import functools
+import threading
+import time
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+from monitor.utils.logger import logger
+from monitor.utils.metrics import metrics
+
+DEFAULT_HTTP_OPTIONS: dict = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "keep_alive": True,
+    "http2": False,
+}
+
+
+class _CountingPoolMixin:
+    """Count connections handed out by a urllib3 pool as either freshly opened or reused."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.num_opened = 0
+        self.num_reused = 0
+        # connections are handed out to the parse_all worker threads concurrently
+        self._count_lock = threading.Lock()
+
+    def _get_conn(self, timeout: float | None = None) -> Any:
+        conn = super()._get_conn(timeout=timeout)  # type: ignore[misc]
+        with self._count_lock:
+            if conn.is_connected:
+                self.num_reused += 1
+            else:
+                self.num_opened += 1
+        return conn
+
+
+class _TimedConnectMixin:
+    """Record how long opening a connection (DNS, TCP and TLS handshake) takes."""
+
+    def connect(self) -> None:
+        if not metrics.enabled:
+            return super().connect()  # type: ignore[misc]
+        started = time.perf_counter()
+        super().connect()  # type: ignore[misc]
+        metrics.observe("monitor_http_connect_seconds", time.perf_counter() - started, host=self.host)  # type: ignore
+
+
+@functools.lru_cache(maxsize=None)
+def _counting_pool_class(pool_cls: type, connection_cls: type) -> type:
+    """Counting subclass of a urllib3 pool whose connections are timed subclasses of `connection_cls`."""
+    timed = type(f"_Timed{connection_cls.__name__}", (_TimedConnectMixin, connection_cls), {})
+    return type(f"_Counting{pool_cls.__name__}", (_CountingPoolMixin, pool_cls), {"ConnectionCls": timed})
+
+
+def _counting_pool_classes() -> dict[str, type]:
+    """
+    Return the counting pool classes per scheme.
+
+    The connection classes are read when the adapter is created, so the HTTP/2 connection
+    class that `inject_into_urllib3` installs on HTTPSConnectionPool is kept.
+    """
+    return {
+        "http": _counting_pool_class(HTTPConnectionPool, HTTPConnectionPool.ConnectionCls),
+        "https": _counting_pool_class(HTTPSConnectionPool, HTTPSConnectionPool.ConnectionCls),
+    }
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that keeps track of how many TCP/TLS connections were opened versus reused.
+
+    Counters of pools evicted from the pool manager are retained.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._retired = {"opened": 0, "reused": 0}
+        self._retired_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes()
+        self.poolmanager.pools.dispose_func = self._retire_pool
+
+    def _retire_pool(self, pool: _CountingPoolMixin) -> None:
+        with self._retired_lock:
+            self._retired["opened"] += pool.num_opened
+            self._retired["reused"] += pool.num_reused
+        pool.close()  # type: ignore[attr-defined]
+
+    def stats(self) -> dict:
+        """
+        Return connection counters for this adapter.
+
+        Returns
+        -------
+        dict
+            Dictionary with 'opened', 'reused' and 'requests' counts.
+        """
+        with self._retired_lock:
+            opened = self._retired["opened"]
+            reused = self._retired["reused"]
+
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_opened
+                reused += pool.num_reused
+
+        return {"opened": opened, "reused": reused, "requests": opened + reused}
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _enable_http2() -> bool:
+    try:
+        from urllib3.http2 import inject_into_urllib3
+    except ImportError:
+        logger.warning("HTTP/2 requested but not supported by the installed urllib3, using HTTP/1.1")
+        return False
+
+    try:
+        inject_into_urllib3()
+    except ImportError:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+        return False
+
+    return True
+
+
+def create_session(options: dict | None = None) -> requests.Session:
+    """
+    Create a requests session backed by a pooled, instrumented adapter.
+
+    Parameters
+    ----------
+    options: dict | None
+        HTTP options: 'pool_connections', 'pool_maxsize', 'keep_alive' and 'http2'.
+        Missing keys fall back to DEFAULT_HTTP_OPTIONS.
+
+    Returns
+    -------
+    requests.Session
+        Configured session.
+    """
+    opts = {**DEFAULT_HTTP_OPTIONS, **(options or {})}
+
+    if opts["http2"]:
+        _enable_http2()
+
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_connections=opts["pool_connections"], pool_maxsize=opts["pool_maxsize"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not opts["keep_alive"]:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def configure_http(options: dict | None = None) -> requests.Session:
+    """
+    Replace the shared session with one built from the given options.
+
+    Parameters
+    ----------
+    options: dict | None
+        HTTP options, usually `cfg["general"]["http"]`.
+
+    Returns
+    -------
+    requests.Session
+        The new shared session.
+    """
+    global _session
+
+    new_session = create_session(options)
+    with _session_lock:
+        old_session, _session = _session, new_session
+
+    if old_session is not None:
+        old_session.close()
+
+    return new_session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the shared session used by the parser and the notifier, creating it on first use.
+
+    Returns
+    -------
+    requests.Session
+        Shared session.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def connection_stats() -> dict:
+    """
+    Return connection counters of the shared session.
+
+    Returns
+    -------
+    dict
+        Dictionary with 'opened', 'reused' and 'requests' counts.
+    """
+    stats = {"opened": 0, "reused": 0, "requests": 0}
+    if _session is None:
+        return stats
+
+    seen = set()
+    for adapter in _session.adapters.values():
+        if isinstance(adapter, PooledHTTPAdapter) and id(adapter) not in seen:
+            seen.add(id(adapter))
+            for key, value in adapter.stats().items():
+                stats[key] += value
+
+    return stats
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from monitor.utils.logger import logger
+from monitor.utils.paths import data_dir
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class HTTPCache:
+    """
+    On-disk cache of HTTP validators and parsed performances, keyed by URL.
+
+    Each URL is stored as one JSON file holding its ETag, Last-Modified and the
+    performance list parsed from the last full response. Entries are evicted in
+    least-recently-used order (file mtime) once the entry count or total size cap
+    is exceeded.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "HTTPCache | None":
+        """
+        Build a cache from `cfg["general"]["cache"]`.
+
+        Parameters
+        ----------
+        cfg: dict
+            Full configuration dictionary.
+
+        Returns
+        -------
+        HTTPCache | None
+            The cache, or None if caching is disabled or the directory is not writable.
+        """
+        cache_cfg = cfg.get("general", {}).get("cache", {})
+        if not cache_cfg.get("enabled", True):
+            return None
+
+        directory = Path(cache_cfg.get("directory") or data_dir() / "http_cache")
+        try:
+            return cls(
+                directory,
+                max_entries=cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES),
+                max_bytes=cache_cfg.get("max_bytes", DEFAULT_MAX_BYTES),
+            )
+        except OSError as e:
+            logger.warning(f"HTTP cache disabled, cannot use directory {directory}: {e}")
+            return None
+
+    def _path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str, variant: str = "") -> dict | None:
+        """
+        Return the cached entry for a URL if it was stored with the same variant.
+
+        Parameters
+        ----------
+        url: str
+            Cached URL.
+        variant: str
+            Fingerprint of everything that affects parsing (e.g. selectors); entries
+            stored under a different variant are ignored.
+
+        Returns
+        -------
+        dict | None
+            Entry with 'etag', 'last_modified', 'performances' and 'next_url', or None.
+        """
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("url") != url or entry.get("variant") != variant:
+            return None
+        return entry
+
+    def touch(self, url: str) -> None:
+        """Mark a URL's entry as recently used."""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def put(
+        self,
+        url: str,
+        performances: list[dict],
+        etag: str | None = None,
+        last_modified: str | None = None,
+        variant: str = "",
+        next_url: str | None = None,
+    ) -> None:
+        """
+        Store validators and parsed performances (and the next page link, if any) for a URL.
+
+        Responses without ETag and Last-Modified cannot be revalidated and are not stored.
+        """
+        if not etag and not last_modified:
+            return
+
+        entry = {
+            "url": url,
+            "variant": variant,
+            "etag": etag,
+            "last_modified": last_modified,
+            "performances": performances,
+            "next_url": next_url,
+        }
+        path = self._path(url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write HTTP cache entry for {url}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop least recently used entries until the entry count and size caps are met.
+
+        Returns
+        -------
+        int
+            Number of evicted entries.
+        """
+        with self._lock:
+            files = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+
+            files.sort()
+            total_bytes = sum(size for _, size, _ in files)
+            evicted = 0
+            while files and (len(files) > self.max_entries or total_bytes > self.max_bytes):
+                _, size, path = files.pop(0)
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total_bytes -= size
+                evicted += 1
+
+        return evicted
+
+
+def conditional_headers(entry: dict | None) -> dict:
+    """
+    Build If-None-Match / If-Modified-Since headers from a cache entry.
+
+    Parameters
+    ----------
+    entry: dict | None
+        Entry returned by `HTTPCache.get`.
+
+    Returns
+    -------
+    dict
+        Request headers, empty if there is nothing to revalidate.
+    """
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def variant_key(*parts: object) -> str:
+    """Return a short stable fingerprint of the parsing settings of a cache entry."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
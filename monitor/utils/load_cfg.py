@@ -1,6 +1,16 @@
+import hashlib
+import marshal
+import os
+import tempfile
 from pathlib import Path
 
-import yaml
+from monitor.utils.logger import logger
+from monitor.utils.paths import data_dir
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent / "theatres_cfg.yaml"
+SNAPSHOT_ENV = "MONITOR_CONFIG_SNAPSHOT"
+# bump when validation changes, so snapshots of the old rules are not trusted
+SNAPSHOT_VERSION = 1
 
 
 def load_yaml_config(conf_file_path: Path | None = None) -> dict:
@@ -17,9 +27,10 @@ def load_yaml_config(conf_file_path: Path | None = None) -> dict:
     dict
         Parsed configuration dictionary.
     """
+    import yaml  # not needed when the configuration comes from a snapshot
 
     if conf_file_path is None:
-        conf_file_path = Path(__file__).parent.parent / "theatres_cfg.yaml"  # type: ignore
+        conf_file_path = DEFAULT_CONFIG_PATH
 
     if not conf_file_path.exists():  # type: ignore
         raise FileNotFoundError(f"Config file not found within path: {conf_file_path}")
@@ -28,3 +39,122 @@ def load_yaml_config(conf_file_path: Path | None = None) -> dict:
         cfg = yaml.safe_load(conf_file_path)  # type: ignore
 
     return cfg
+
+
+def validate_config(cfg: dict) -> dict:
+    """
+    Check the structure of a configuration.
+
+    Parameters
+    ----------
+    cfg: dict
+        Parsed configuration.
+
+    Returns
+    -------
+    dict
+        The same configuration.
+
+    Raises
+    ------
+    ValueError
+        If the 'general' section is missing, 'theatres' is not a list of mappings,
+        or a theatre has no name or shares it with another theatre.
+    """
+    if not isinstance(cfg, dict) or not isinstance(cfg.get("general"), dict):
+        raise ValueError("missing 'general' section")
+    theatres = cfg.get("theatres") or []
+    if not isinstance(theatres, list):
+        raise ValueError("'theatres' must be a list")
+
+    seen = set()
+    for i, theatre in enumerate(theatres):
+        if not isinstance(theatre, dict) or not theatre.get("name"):
+            raise ValueError(f"theatre #{i + 1} has no name")
+        if theatre["name"] in seen:
+            raise ValueError(f"theatre '{theatre['name']}' is configured more than once")
+        seen.add(theatre["name"])
+    return cfg
+
+
+def index_theatres(cfg: dict) -> dict[str, dict]:
+    """Return the theatre entries of a validated configuration keyed by name."""
+    return {theatre["name"]: theatre for theatre in cfg.get("theatres") or []}
+
+
+def snapshot_path(conf_file_path: Path) -> Path:
+    """Return where the snapshot of a configuration file is kept."""
+    key = hashlib.blake2b(str(conf_file_path.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    return data_dir() / "config_snapshots" / f"{conf_file_path.stem}-{key}.marshal"
+
+
+def _read_snapshot(path: Path, stat: os.stat_result) -> dict | None:
+    try:
+        version, mtime_ns, size, cfg = marshal.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (version, mtime_ns, size) != (SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size):
+        return None
+    return cfg
+
+
+def _write_snapshot(path: Path, stat: os.stat_result, cfg: dict) -> None:
+    try:
+        data = marshal.dumps((SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size, cfg))
+    except ValueError as e:  # values marshal cannot store, e.g. YAML timestamps
+        logger.info(f"Not snapshotting configuration: {e}")
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Cannot save configuration snapshot to {path}: {e}")
+
+
+def load_config(conf_file_path: Path | None = None, snapshot: bool | None = None) -> dict:
+    """
+    Load and validate the configuration once per run.
+
+    With `snapshot`, the validated configuration is also stored as a marshal file in the
+    data directory, and later loads of an unchanged YAML file (same modification time and
+    size) read that instead, which skips importing and running the YAML parser.
+
+    Parameters
+    ----------
+    conf_file_path: Path | None
+        Path to the configuration file, defaults to 'theatres_cfg.yaml' of the package.
+    snapshot: bool | None
+        Whether to use the snapshot; defaults to the MONITOR_CONFIG_SNAPSHOT environment
+        variable being set to a non-empty value other than "0".
+
+    Returns
+    -------
+    dict
+        Validated configuration dictionary.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the configuration file does not exist.
+    ValueError
+        If the configuration is invalid, see `validate_config`.
+    """
+    conf_file_path = Path(conf_file_path or DEFAULT_CONFIG_PATH)
+    if snapshot is None:
+        snapshot = os.environ.get(SNAPSHOT_ENV, "") not in ("", "0")
+    if not snapshot:
+        return validate_config(load_yaml_config(conf_file_path))
+
+    try:
+        stat = conf_file_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file not found within path: {conf_file_path}") from None
+    path = snapshot_path(conf_file_path)
+    cfg = _read_snapshot(path, stat)
+    if cfg is None:
+        cfg = validate_config(load_yaml_config(conf_file_path))
+        _write_snapshot(path, stat, cfg)
+    return cfg
@@ -1,31 +1,204 @@
+import atexit
+import gzip
 import logging
-import os.path
+import os
+import queue
+import shutil
 import sys
 from functools import lru_cache
-from logging import Logger
+from logging import Handler, Logger
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
+
+from monitor.utils.paths import data_dir
+
+LOG_FILE_ENV = "MONITOR_LOG_FILE"
+
+DEFAULT_LOGGING_OPTIONS: dict = {
+    # defaults to $MONITOR_LOG_FILE or $MONITOR_DATA_DIR/logs/monitor.log
+    "file": None,
+    # rotate when the file reaches max_bytes, or at a time interval ("midnight", "h", ...) if `when` is set
+    "max_bytes": 10 * 1024 * 1024,
+    "when": None,
+    "backup_count": 5,
+    "compress": True,
+}
+
+FORMATTER = logging.Formatter(fmt="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+_listeners: dict[str, QueueListener] = {}
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler for a listener in the same process.
+
+    The stock `prepare` formats every record on the caller's thread (and the listener
+    formats it again) so that it can be pickled; here only the arguments are merged into
+    the message, and formatting is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def default_log_path() -> str:
+    """Return the log file path from MONITOR_LOG_FILE, defaulting to 'logs/monitor.log' in the data directory."""
+    return os.environ.get(LOG_FILE_ENV) or str(data_dir() / "logs" / "monitor.log")
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def create_file_handler(file_path: str | None = None, options: dict | None = None) -> Handler:
+    """
+    Create a rotating file handler.
+
+    Parameters
+    ----------
+    file_path: str | None
+        Log file, defaults to `default_log_path()`; its directory is created if needed.
+    options: dict | None
+        Rotation options, see DEFAULT_LOGGING_OPTIONS.
+
+    Returns
+    -------
+    Handler
+        Handler whose rotated files are gzip-compressed when 'compress' is set.
+    """
+    options = {**DEFAULT_LOGGING_OPTIONS, **(options or {})}
+    file_path = file_path or options["file"] or default_log_path()
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+
+    handler: RotatingFileHandler | TimedRotatingFileHandler
+    if options["when"]:
+        handler = TimedRotatingFileHandler(
+            file_path, when=options["when"], backupCount=options["backup_count"], encoding="utf-8", delay=True
+        )
+    else:
+        handler = RotatingFileHandler(
+            file_path,
+            mode="a",
+            maxBytes=options["max_bytes"] or 0,
+            backupCount=options["backup_count"],
+            encoding="utf-8",
+            delay=True,
+        )
+    if options["compress"]:
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = _gzip_rotator
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(FORMATTER)
+    return handler
 
 
 @lru_cache(maxsize=1)
 def get_logger(name: str = "monitor", file_path: str | None = None) -> Logger:
+    """
+    Create a logger that writes to stdout and a rotating log file without blocking the caller.
+
+    Records are put on an in-memory queue by a QueueHandler; a QueueListener thread formats
+    them and does the actual I/O, and is stopped (flushing the queue) at interpreter exit.
+    """
     logger = Logger(name)
     logger.setLevel(logging.INFO)
 
     handler = logging.StreamHandler(sys.stdout)
     handler.setLevel(logging.INFO)
+    handler.setFormatter(FORMATTER)
 
-    file_handler = logging.FileHandler(
-        file_path if file_path else os.path.join(os.path.dirname(__file__), "app.log"), mode="a", encoding="utf-8"
-    )
-    file_handler.setLevel(logging.INFO)
+    file_handler = create_file_handler(file_path)
 
-    formatter = logging.Formatter(fmt="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
-    file_handler.setFormatter(formatter)
-    handler.setFormatter(formatter)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(_InProcessQueueHandler(log_queue))
 
-    logger.addHandler(handler)
-    logger.addHandler(file_handler)
+    listener = QueueListener(log_queue, handler, file_handler, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
 
     return logger
 
 
+def get_listener(name: str = "monitor") -> QueueListener | None:
+    """Return the QueueListener doing the I/O for the logger `name`."""
+    return _listeners.get(name)
+
+
+def stop_logging(name: str | None = None) -> None:
+    """Flush the queued records and stop the listener of the logger `name`, or of all loggers."""
+    for listener_name, listener in list(_listeners.items()):
+        if name in (None, listener_name) and listener._thread is not None:
+            listener.stop()
+
+
+def configure_logging(options: dict | None, name: str = "monitor") -> None:
+    """
+    Apply `cfg["general"]["logging"]`, replacing the log file handler of a logger.
+
+    Parameters
+    ----------
+    options: dict | None
+        Logging options, see DEFAULT_LOGGING_OPTIONS.
+    name: str
+        Logger name.
+    """
+    listener = _listeners.get(name)
+    if listener is None:
+        return
+
+    stop_logging(name)
+    new_handlers = []
+    for handler in listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+            handler = create_file_handler(options=options)
+        new_handlers.append(handler)
+    listener.handlers = tuple(new_handlers)
+    listener.start()
+
+
+class _Relay(Handler):
+    """Hands records received from other processes to a local logger."""
+
+    def __init__(self, target: Logger) -> None:
+        super().__init__()
+        self.target = target
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.target.handle(record)
+
+
+def forward_logging(log_queue: "queue.Queue", target: Logger | None = None) -> None:
+    """
+    Make a worker process send the records of `target` (the monitor logger) to `log_queue`.
+
+    The worker's own listener is stopped, so only the parent writes to stdout and the log file.
+    Records are formatted into plain messages by the stock QueueHandler, so they can be pickled.
+    """
+    worker_logger = target or logger
+    stop_logging(worker_logger.name)
+    for handler in list(worker_logger.handlers):
+        worker_logger.removeHandler(handler)
+    worker_logger.addHandler(QueueHandler(log_queue))
+
+
+def receive_logging(log_queue: "queue.Queue", target: Logger | None = None) -> QueueListener:
+    """Start a listener passing the records that workers put on `log_queue` to `target` (the monitor logger)."""
+    listener = QueueListener(log_queue, _Relay(target or logger))
+    listener.start()
+    return listener
+
+
+atexit.register(stop_logging)
+
 logger = get_logger()
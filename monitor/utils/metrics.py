@@ -0,0 +1,293 @@
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from monitor.utils.logger import logger
+
+DEFAULT_METRICS_OPTIONS: dict = {
+    "enabled": False,
+    "json_logs": True,
+    "prometheus_file": None,
+    "prometheus_port": None,
+}
+
+# seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "monitor_stage_seconds": "Duration of a pipeline stage.",
+    "monitor_http_connect_seconds": "Time to open a connection (DNS, TCP and TLS).",
+    "monitor_fetch_retries_total": "Failed fetch attempts that were retried or gave up.",
+    "monitor_bytes_downloaded_total": "Response body bytes downloaded.",
+    "monitor_telegram_retries_total": "Retried Telegram API calls.",
+    "monitor_telegram_messages_total": "Telegram API calls by outcome.",
+    "monitor_telegram_delivery_seconds": "Time from queueing a Telegram message to its delivery.",
+    "monitor_circuit_open": "1 while the circuit breaker of a host is open.",
+    "monitor_circuit_transitions_total": "Circuit breaker state changes by new state.",
+    "monitor_circuit_rejected_total": "Fetches skipped because the circuit breaker of the host is open.",
+}
+
+current_theatre: contextvars.ContextVar[str] = contextvars.ContextVar("current_theatre", default="")
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items) + "}"
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("registry", "stage", "labels", "started")
+
+    def __init__(self, registry: "Metrics", stage: str, labels: dict) -> None:
+        self.registry = registry
+        self.stage = stage
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        seconds = time.perf_counter() - self.started
+        self.registry.observe("monitor_stage_seconds", seconds, stage=self.stage, **self.labels)
+        if self.registry.options["json_logs"]:
+            record = {"event": "span", "stage": self.stage, "seconds": round(seconds, 6), **self.labels}
+            if exc_type is not None:
+                record["error"] = exc_type.__name__
+            logger.info(json.dumps(record, ensure_ascii=False))
+
+
+class Metrics:
+    """
+    In-process registry of counters and histograms.
+
+    When disabled every call returns immediately (spans are a shared no-op context
+    manager), so instrumentation can stay in the hot path.
+    """
+
+    def __init__(self, options: dict | None = None) -> None:
+        self.options = {**DEFAULT_METRICS_OPTIONS, **(options or {})}
+        self.enabled = bool(self.options["enabled"])
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+        self._gauges: dict[str, dict[tuple, float]] = {}
+
+    def configure(self, options: dict | None) -> None:
+        self.options = {**DEFAULT_METRICS_OPTIONS, **(options or {})}
+        self.enabled = bool(self.options["enabled"])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+
+    def span(self, stage: str, **labels: Any) -> Any:
+        """
+        Time a pipeline stage.
+
+        The current theatre (see `current_theatre`) is added as a label when set.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        theatre = current_theatre.get()
+        if theatre and "theatre" not in labels:
+            labels["theatre"] = theatre
+        return _Span(self, stage, labels)
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = [[0] * len(DEFAULT_BUCKETS), 0, 0.0]
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += 1
+            hist[2] += value
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def gauge_value(self, name: str, **labels: Any) -> float | None:
+        return self._gauges.get(name, {}).get(_label_key(labels))
+
+    def histogram_count(self, name: str, **labels: Any) -> int:
+        hist = self._histograms.get(name, {}).get(_label_key(labels))
+        return hist[1] if hist else 0
+
+    def render_prometheus(self, gauges: dict[str, float] | None = None) -> str:
+        """
+        Render all series in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        gauges: dict[str, float] | None
+            Extra unlabelled gauges, e.g. HTTP connection counts.
+
+        Returns
+        -------
+        str
+            Exposition text.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, (buckets, count, total) in sorted(series.items()):
+                    for bound, bucket_count in zip(DEFAULT_BUCKETS, buckets):
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', f'{bound:g}'),))} {bucket_count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def configure_metrics(options: dict | None) -> Metrics:
+    """
+    Configure the shared registry from `cfg["general"]["metrics"]`.
+
+    Parameters
+    ----------
+    options: dict | None
+        Metrics options: 'enabled', 'json_logs', 'prometheus_file' and 'prometheus_port'.
+
+    Returns
+    -------
+    Metrics
+        The shared registry.
+    """
+    metrics.configure(options)
+    return metrics
+
+
+def _gauges() -> dict[str, float]:
+    from monitor.utils.http import connection_stats
+
+    stats = connection_stats()
+    return {
+        "monitor_http_connections_opened": stats["opened"],
+        "monitor_http_connections_reused": stats["reused"],
+    }
+
+
+def write_prometheus_file(path: str | None = None) -> None:
+    """Atomically write the registry to `prometheus_file` (node exporter textfile format)."""
+    path = path or metrics.options.get("prometheus_file")
+    if not path or not metrics.enabled:
+        return
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(metrics.render_prometheus(_gauges()))
+    os.replace(tmp_path, path)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve the registry on http://host:port/metrics from a background thread.
+
+    Parameters
+    ----------
+    port: int
+        Port to listen on, 0 picks a free one.
+    host: str
+        Interface to bind.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The running server; call `shutdown()` to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self: Any) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus(_gauges()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self: Any, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,23 @@
+import os
+from pathlib import Path
+
+DATA_DIR_ENV = "MONITOR_DATA_DIR"
+
+
+def data_dir() -> Path:
+    """
+    Return the directory for persistent runtime data (HTTP cache, state, logs).
+
+    The location is taken from the MONITOR_DATA_DIR environment variable so it can be
+    mounted as a volume into the otherwise stateless Docker container; it defaults to
+    '~/.cache/tg-theatres-monitor'.
+
+    Returns
+    -------
+    Path
+        Path to the data directory (not created).
+    """
+    env_dir = os.environ.get(DATA_DIR_ENV)
+    if env_dir:
+        return Path(env_dir)
+    return Path.home() / ".cache" / "tg-theatres-monitor"
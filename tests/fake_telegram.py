@@ -0,0 +1,69 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeTelegramServer:
+    """
+    Local stand-in for the Telegram Bot API `sendMessage` method.
+
+    Received messages are recorded in `messages`. Responses can be scripted with
+    `responses`, a list of (status, payload) tuples consumed in order before falling
+    back to a successful reply, e.g. [(429, {"ok": False, "parameters": {"retry_after": 1}})].
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+        self.responses: list[tuple[int, dict]] = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # reply headers and body are written separately; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def _handle(self: Any, params: dict) -> None:
+                path = urlsplit(self.path).path
+                with server.lock:
+                    if not path.endswith("/sendMessage"):
+                        status, payload = 404, {"ok": False, "description": "Not Found"}
+                    elif server.responses:
+                        status, payload = server.responses.pop(0)
+                    else:
+                        status, payload = 200, {"ok": True, "result": {"message_id": len(server.messages) + 1}}
+                    if status == 200:
+                        server.messages.append({"path": path, **params})
+
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self: Any) -> None:
+                query = parse_qs(urlsplit(self.path).query)
+                self._handle({k: v[0] for k, v in query.items()})
+
+            def do_POST(self: Any) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                self._handle({k: v[0] for k, v in form.items()})
+
+            def log_message(self: Any, *args: Any) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self) -> "FakeTelegramServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,135 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from monitor.query import main, next_weekend
+from monitor.storage.archive import Archive
+
+DAY = 86400
+# 2030-01-01T00:00:00Z
+T0 = 1893456000.0
+
+
+def show(title: str, day: int) -> dict:
+    return {"title": title, "datetime": f"2030-01-{day:02d}T19:00:00+00:00", "link": f"https://t1.cz/{day}"}
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.archive = Archive(":memory:")
+
+    def tearDown(self: Any) -> None:
+        self.archive.close()
+
+    def test_record_and_first_seen(self: Any) -> None:
+        self.archive.record("T1", [show("Hamlet", 20)], now=T0)
+        self.archive.record("T1", [show("Hamlet", 20), show("hamlet ", 21)], now=T0 + DAY)
+        self.archive.record("T2", [show("Hamlet", 22)], now=T0 + 2 * DAY)
+
+        rows = self.archive.first_seen("HAMLET")
+        self.assertEqual(
+            [(r["theatre"], r["dates"], r["first_seen"]) for r in rows], [("T1", 2, T0), ("T2", 1, T0 + 2 * DAY)]
+        )
+        self.assertEqual(len(self.archive.first_seen("ham", theatre="T2")), 1)
+        self.assertEqual(self.archive.first_seen("Macbeth"), [])
+
+        stats = self.archive.stats()
+        self.assertEqual((stats["scrapes"], stats["shows"], stats["observations"]), (3, 3, 4))
+
+    def test_title_lookups_use_an_index(self: Any) -> None:
+        self.archive.record("T1", [show("William Shakespeare: Hamlet", 20), show("Hamlet", 21)], now=T0)
+        self.assertEqual(len(self.archive.first_seen("hamlet")), 2)
+        self.assertEqual([r["title"] for r in self.archive.first_seen("speare: ham")], ["William Shakespeare: Hamlet"])
+        self.assertEqual([r["title"] for r in self.archive.availability("ha")], ["Hamlet"])
+
+        for query in (self.archive._first_seen_query, self.archive._availability_query):
+            for title in ("hamlet", "ha"):
+                with self.subTest(query=query.__name__, title=title):
+                    sql, params = query(title, None)
+                    plan = [row[3] for row in self.archive.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+                    self.assertFalse([step for step in plan if step.split()[:2] in (["SCAN", "shows"], ["SCAN", "s"])])
+
+    def test_title_index_of_existing_archive_is_built(self: Any) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "archive.sqlite3"
+            archive = Archive(path)
+            archive.record("T1", [show("Hamlet", 20)], now=T0)
+            # an archive created before the title index existed
+            archive.conn.executescript(
+                "DROP TRIGGER shows_fts_insert; DROP TRIGGER shows_fts_delete; DROP TRIGGER shows_fts_update;"
+                "DROP TABLE shows_fts;"
+            )
+            archive.close()
+
+            archive = Archive(path)
+            self.addCleanup(archive.close)
+            self.assertEqual(len(archive.first_seen("hamlet")), 1)
+            archive.prune(keep_days=0, now=T0 + DAY)
+            self.assertEqual(archive.first_seen("hamlet"), [])
+
+    def test_availability_tells_listed_from_gone(self: Any) -> None:
+        self.archive.record("T1", [show("Hamlet", 20), show("Hamlet", 21)], now=T0)
+        self.archive.record("T1", [show("Hamlet", 21)], now=T0 + 3 * DAY)
+
+        rows = self.archive.availability("Hamlet")
+        self.assertEqual([r["datetime"][:10] for r in rows], ["2030-01-20", "2030-01-21"])
+        gone, listed = rows
+        self.assertFalse(gone["listed"])
+        self.assertEqual(gone["listed_seconds"], 0)
+        self.assertEqual(gone["lead_seconds"], 19 * DAY + 19 * 3600)
+        self.assertTrue(listed["listed"])
+        self.assertEqual(listed["listed_seconds"], 3 * DAY)
+
+    def test_upcoming_only_lists_shows_of_latest_scrape(self: Any) -> None:
+        self.archive.record("T1", [show("Hamlet", 5), show("Macbeth", 6)], now=T0)
+        self.archive.record("T1", [show("Macbeth", 6), show("Lear", 12)], now=T0 + DAY)
+
+        rows = self.archive.upcoming(T0 + 4 * DAY, T0 + 7 * DAY)
+        self.assertEqual([r["title"] for r in rows], ["Macbeth"])
+        self.assertEqual(self.archive.upcoming(T0, T0 + 30 * DAY, theatre="T2"), [])
+
+    def test_prune_and_compact(self: Any) -> None:
+        for i in range(4):
+            # two scrapes per day
+            self.archive.record("T1", [show("Hamlet", 20)], now=T0 + i * DAY / 2)
+        self.archive.record("T1", [show("Macbeth", 21)], now=T0 + 40 * DAY)
+
+        self.assertEqual(self.archive.compact(older_than_days=30, now=T0 + 40 * DAY), 2)
+        stats = self.archive.stats()
+        self.assertEqual((stats["scrapes"], stats["observations"]), (3, 3))
+        first_seen = self.archive.first_seen("Hamlet")[0]
+        self.assertEqual((first_seen["first_seen"], first_seen["last_seen"]), (T0, T0 + 1.5 * DAY))
+
+        self.assertEqual(self.archive.prune(keep_days=10, now=T0 + 40 * DAY), 3)
+        self.assertEqual([r["title"] for r in self.archive.first_seen("")], ["Macbeth"])
+
+
+class TestQueryCli(unittest.TestCase):
+    def test_next_weekend(self: Any) -> None:
+        # 2030-01-02 is a Wednesday
+        self.assertEqual(next_weekend(date(2030, 1, 2)), (date(2030, 1, 5), date(2030, 1, 7)))
+        self.assertEqual(next_weekend(date(2030, 1, 5)), (date(2030, 1, 5), date(2030, 1, 7)))
+        self.assertEqual(next_weekend(date(2030, 1, 6)), (date(2030, 1, 5), date(2030, 1, 7)))
+
+    def test_main_queries_archive_file(self: Any) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "archive.sqlite3"
+            archive = Archive(path)
+            archive.record("T1", [show("Hamlet", 20)], now=T0)
+            archive.close()
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(main(["--db", str(path), "stats"]), 0)
+                self.assertEqual(main(["--db", str(path), "first-seen", "hamlet"]), 0)
+            lines = out.getvalue().splitlines()
+            self.assertIn("scrapes: 1", lines)
+            self.assertEqual(lines[-1].split()[:2], ["T1", "Hamlet"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import contextlib
+import io
+import unittest
+from typing import Any
+
+from benchmarks.common import THEATRE_FIXTURES, configured_theatres, load_fixture
+from monitor.__main__ import parse_args
+from monitor.check import (
+    check_schema,
+    join_selector,
+    profile_selectors,
+    rewrite_candidates,
+    run_check,
+    selector_hints,
+    split_selector,
+)
+
+GENERAL = {"results_per_theatre": 10, "timezone": "Europe/Prague"}
+
+
+def messages(cfg: dict) -> list[tuple[str, str, str]]:
+    return [(f.level, f.subject, f.message) for f in check_schema(cfg)]
+
+
+class TestCheck(unittest.TestCase):
+    def test_schema_of_configured_theatres(self: Any) -> None:
+        self.assertEqual(messages({"general": GENERAL, "theatres": configured_theatres()}), [])
+
+    def test_schema_errors_and_warnings(self: Any) -> None:
+        theatres = [
+            {"name": "A", "program_url": "https://a.cz", "selectors": {"elements": "div", "time": "time"}},
+            {
+                "name": "B",
+                "program_url": "https://b.cz",
+                "selectors": {"elements": "div[", "time": "t", "title": "h3", "link": "a"},
+                "parse_delay": "5",
+                "timezone": "Mars/Base",
+            },
+            {"name": "C", "program_url": "https://c.cz", "source": {"type": "xml"}, "time_parsable": True},
+        ]
+        general = {**GENERAL, "results_per_theatre": True, "telegram": {"per_chat_intreval": 1}}
+        found = messages({"general": general, "theatres": theatres})
+
+        self.assertIn(("error", "general", "'results_per_theatre' must be int, got bool"), found)
+        self.assertIn(("warning", "general.telegram", "unknown option 'per_chat_intreval'"), found)
+        self.assertIn(("error", "A", "selectors title, link are missing"), found)
+        self.assertIn(("error", "B", "'parse_delay' must be int or float, got str"), found)
+        self.assertIn(("error", "B", "unknown timezone 'Mars/Base'"), found)
+        self.assertTrue(any(f[1] == "B" and f[2].startswith("Invalid selector") for f in found))
+        self.assertTrue(any(f[1] == "C" and f[2].startswith("invalid source") for f in found))
+        self.assertIn(("warning", "C", "unknown option 'time_parsable'"), found)
+
+    def test_schema_of_runtime_sections(self: Any) -> None:
+        general = {
+            **GENERAL,
+            "retry": {"max_attempt": 2},
+            "cache": {"max_entries": "many"},
+            "state": {"keep_day": 7},
+            "digest": {"enabled": True, "window": 7000},
+        }
+        subscriptions = [{"chat_id": 1, "title_patterns": ["(unclosed"]}, {"title_patterns": ["x"]}, "42"]
+        theatres = [{**configured_theatres()[0], "datetime_formats": ["%d.%m. %H:%M %d"]}]
+        found = messages({"general": general, "subscriptions": subscriptions, "theatres": theatres})
+
+        self.assertIn(("error", "general.retry", "unknown option 'max_attempt'"), found)
+        self.assertIn(("error", "general.cache", "'max_entries' must be int, got str"), found)
+        self.assertIn(("warning", "general.state", "unknown option 'keep_day'"), found)
+        self.assertTrue(any(f[1] == "general.digest" and "Invalid digest window" in f[2] for f in found))
+        # every subscription inherits the invalid general digest window
+        self.assertTrue(any(f[1] == "subscription #1" for f in found))
+        self.assertTrue(any(f[1] == "subscription #2" and "without chat_id" in f[2] for f in found))
+        self.assertIn(("error", "subscription #3", "must be a mapping"), found)
+        self.assertTrue(any(f[2].startswith("invalid datetime format: duplicate directive") for f in found))
+
+        del general["digest"]
+        found = messages({"general": general, "subscriptions": subscriptions[:1]})
+        self.assertEqual(
+            [f[2] for f in found if f[1] == "subscription #1"],
+            ["Invalid title pattern for chat 1: missing ), unterminated subpattern at position 0"],
+        )
+
+    def test_split_selector(self: Any) -> None:
+        css = "div.a > p[title='x y'] span:not(.b, .c)"
+        parts = split_selector(css)
+        self.assertEqual(parts, [("", "div.a"), (">", "p[title='x y']"), (" ", "span:not(.b, .c)")])
+        self.assertEqual(join_selector(parts), css)
+        self.assertEqual(rewrite_candidates("div.a p span"), ["p span", "div.a > p > span"])
+        self.assertEqual(rewrite_candidates("h3.title a"), ["h3.title > a"])
+        self.assertEqual(rewrite_candidates("a, b"), [])
+
+    def test_selector_hints(self: Any) -> None:
+        self.assertEqual(selector_hints("div.performance-listed-main"), [])
+        self.assertEqual(selector_hints("time", key="time"), [])
+        self.assertIn("deep descendant chain", selector_hints("div.content div.program div.item")[0])
+        self.assertIn("ends in 'div'", selector_hints("div")[0])
+        self.assertEqual(len(selector_hints("div:has(> time), [class*=item]")), 2)
+
+    def test_profile_selectors(self: Any) -> None:
+        for backend in ("soupsieve", "lxml"):
+            with self.subTest(backend=backend):
+                theatre = {
+                    "name": "Divadlo X10",
+                    "selector_backend": backend,
+                    "selectors": {
+                        "elements": "body div.performance-listed-main",
+                        "time": "time",
+                        "title": "div h3.performance-listed-title a",
+                        "link": "a.missing",
+                    },
+                }
+                _, profiles = profile_selectors(theatre, load_fixture("Divadlo X10"), repeat=1)
+                by_name = {p.name: p for p in profiles}
+                self.assertEqual(by_name["elements"].matches, 60)
+                self.assertEqual((by_name["title"].matches, by_name["title"].empty), (60, 0))
+                self.assertEqual((by_name["link"].matches, by_name["link"].empty), (0, 60))
+
+    def test_run_check(self: Any) -> None:
+        cfg = {"general": GENERAL, "theatres": configured_theatres()}
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(run_check(cfg, THEATRE_FIXTURES, repeat=1), 0)
+        self.assertIn("0 errors", out.getvalue())
+
+        broken = [{**th, "selectors": {**th["selectors"], "title": "h6.none"}} for th in configured_theatres()]
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(run_check({"general": GENERAL, "theatres": broken}, THEATRE_FIXTURES, repeat=1), 1)
+        self.assertIn("'title' selector 'h6.none' matches nothing", out.getvalue())
+
+    def test_parse_args(self: Any) -> None:
+        args = parse_args(["--check", "--page", "A=x/a.html", "--page", "B=C=b.html"])
+        self.assertTrue(args.check)
+        self.assertEqual([(name, str(path)) for name, path in args.page], [("A", "x/a.html"), ("B=C", "b.html")])
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            parse_args(["--page", "a.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import yaml
+
+from monitor.daemon import Daemon
+
+
+def write_cfg(path: Path, theatres: list[dict], interval: int = 60) -> None:
+    cfg = {"general": {"results_per_theatre": 5, "interval": interval, "jitter": 0, "state": {"enabled": False}}}
+    cfg["theatres"] = theatres
+    path.write_text(yaml.safe_dump(cfg), encoding="utf-8")
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "cfg.yaml"
+        write_cfg(self.path, [{"name": "A"}, {"name": "B", "interval": 600}])
+        self.daemon = Daemon("token", "chat", config_path=self.path)
+        self.assertTrue(self.daemon.reload_config(force=True))
+
+    def tearDown(self: Any) -> None:
+        self.tmpdir.cleanup()
+
+    @patch("monitor.daemon.run_once")
+    def test_theatres_run_on_their_own_interval(self: Any, mock_run_once: Any) -> None:
+        self.daemon.next_run = {"A": 0.0, "B": 0.0}
+        with patch("monitor.daemon.time.monotonic", return_value=1000.0):
+            self.assertEqual(self.daemon.run_due(), ["A", "B"])
+        self.assertEqual(self.daemon.next_run, {"A": 1060.0, "B": 1600.0})
+
+        self.assertEqual(self.daemon.run_due(now=1061.0), ["A"])
+        theatres = mock_run_once.call_args.kwargs["theatres"]
+        self.assertEqual([th["name"] for th in theatres], ["A"])
+        self.assertIs(mock_run_once.call_args.kwargs["latest"], self.daemon.latest)
+        self.assertIs(mock_run_once.call_args.kwargs["throttle"], self.daemon.throttle)
+
+    @patch("monitor.daemon.run_once", side_effect=Exception("boom"))
+    def test_failed_run_is_rescheduled(self: Any, _mock_run_once: Any) -> None:
+        self.assertEqual(self.daemon.run_due(now=float("inf")), ["A", "B"])
+        self.assertTrue(all(t < float("inf") for t in self.daemon.next_run.values()))
+
+    def test_hot_reload_keeps_schedule_of_unchanged_theatres(self: Any) -> None:
+        self.daemon.next_run = {"A": 123.0, "B": 456.0}
+        write_cfg(self.path, [{"name": "A"}, {"name": "C"}])
+        self.assertTrue(self.daemon.reload_config(force=True))
+        self.assertEqual(set(self.daemon.next_run), {"A", "C"})
+        self.assertEqual(self.daemon.next_run["A"], 123.0)
+
+    def test_invalid_config_keeps_previous_one(self: Any) -> None:
+        self.path.write_text("general: [unclosed", encoding="utf-8")
+        self.assertFalse(self.daemon.reload_config(force=True))
+        self.assertEqual([th["name"] for th in self.daemon.cfg["theatres"]], ["A", "B"])
+
+    def test_unchanged_file_is_not_reloaded(self: Any) -> None:
+        self.assertFalse(self.daemon.reload_config())
+
+    @patch("monitor.daemon.WorkerPool")
+    @patch("monitor.daemon.run_once")
+    def test_worker_pool_lives_as_long_as_the_daemon(self: Any, mock_run_once: Any, mock_pool: Any) -> None:
+        self.assertIsNone(self.daemon.workers)
+        cfg = yaml.safe_load(self.path.read_text(encoding="utf-8"))
+        cfg["general"]["processes"] = 2
+        self.path.write_text(yaml.safe_dump(cfg), encoding="utf-8")
+        self.assertTrue(self.daemon.reload_config(force=True))
+        self.assertIs(self.daemon.workers, mock_pool.return_value)
+
+        self.daemon.run_due(now=float("inf"))
+        self.daemon.run_due(now=float("inf"))
+        self.assertEqual(mock_pool.call_count, 1)
+        self.assertIs(mock_run_once.call_args.kwargs["workers"], mock_pool.return_value)
+
+        self.daemon.stop()
+        self.daemon.run()
+        mock_pool.return_value.close.assert_called_once()
+
+    @patch("monitor.daemon.run_once")
+    def test_stop_ends_run_loop(self: Any, _mock_run_once: Any) -> None:
+        self.daemon.stop()
+        self.daemon.run()
+        self.assertTrue(self.daemon.stop_event.is_set())
@@ -0,0 +1,64 @@
+import unittest
+from datetime import date
+from typing import Any
+
+from monitor.parser.dates import DateParser, compile_format, get_date_parser
+from monitor.parser.performance import Performance
+
+TODAY = date(2030, 12, 20)
+
+
+class TestDates(unittest.TestCase):
+    def test_numeric_format_without_year(self: Any) -> None:
+        parser = DateParser(("%a %d. %m. %H:%M",), tz="Europe/Prague")
+        start = parser.parse("Út 24. 12. 20:00 | 250 Kč", today=TODAY)
+        self.assertEqual(start.isoformat(), "2030-12-24T20:00:00+01:00")
+        # a date well before today belongs to next year's program
+        self.assertEqual(parser.parse("St 8. 1. 19:30", today=TODAY).isoformat(), "2031-01-08T19:30:00+01:00")
+
+    def test_czech_month_names(self: Any) -> None:
+        parser = DateParser(("%d. %B %Y %H:%M", "%d. %B %H:%M"))
+        self.assertEqual(parser.parse("5. října 2031 19:00", today=TODAY).isoformat(), "2031-10-05T19:00:00+02:00")
+        self.assertEqual(parser.parse("5. RIJNA 2031 19:00", today=TODAY).month, 10)
+        self.assertEqual(parser.parse("pá 3. ledna 18:00", today=TODAY).isoformat(), "2031-01-03T18:00:00+01:00")
+        self.assertEqual(parser.parse("1. May 10:00", today=TODAY).month, 5)
+        self.assertIsNone(parser.parse("5. brambor 19:00", today=TODAY))
+
+    def test_relative_dates(self: Any) -> None:
+        parser = DateParser(("%R %H:%M",))
+        self.assertEqual(parser.parse("Dnes 19:00", today=TODAY).isoformat(), "2030-12-20T19:00:00+01:00")
+        self.assertEqual(parser.parse("zítra 19:00", today=TODAY).date(), date(2030, 12, 21))
+        self.assertEqual(parser.parse("pozítří 9:30", today=TODAY).date(), date(2030, 12, 22))
+        self.assertIsNone(parser.parse("včera 19:00", today=TODAY))
+
+    def test_iso_first_and_invalid_dates(self: Any) -> None:
+        parser = DateParser(("%d. %m. %Y",), tz="Europe/Prague")
+        self.assertEqual(parser.parse("2030-01-02T18:00:00+00:00").isoformat(), "2030-01-02T19:00:00+01:00")
+        self.assertEqual(parser.parse("31. 1. 2031").isoformat(), "2031-01-31T00:00:00+01:00")
+        self.assertIsNone(parser.parse("31. 2. 2031"))
+        self.assertIsNone(parser.parse("vyprodáno"))
+        self.assertIsNone(parser.parse(None))
+
+    def test_memoization(self: Any) -> None:
+        parser = DateParser(("%d. %m. %H:%M",))
+        first = parser.parse("2. 10. 20:00", today=TODAY)
+        self.assertIs(parser.parse("2. 10. 20:00", today=TODAY), first)
+        self.assertIs(get_date_parser(("%d. %m.",), "Europe/Prague"), get_date_parser(("%d. %m.",), "Europe/Prague"))
+
+    def test_invalid_formats(self: Any) -> None:
+        for pattern in ("%d. %q.", "%H:%M", "%d %H:%M"):
+            with self.assertRaises(ValueError):
+                compile_format(pattern)
+        for pattern in ("%d.%m %d", "%d. %B %b"):
+            with self.assertRaisesRegex(ValueError, "duplicate directive"):
+                compile_format(pattern)
+
+    def test_performance_with_formats(self: Any) -> None:
+        raw = {"datetime": "Út 2. 10. 2035 20:00 | 250 Kč", "title": "Racek", "link": "/racek"}
+        p = Performance.from_raw(raw, parse_datetime=False, formats=("%d. %m. %Y %H:%M",))
+        self.assertEqual(p.start.isoformat(), "2035-10-02T20:00:00+02:00")
+        self.assertEqual(p.datetime, raw["datetime"])
+
+
+if __name__ == "__main__":
+    unittest.main()
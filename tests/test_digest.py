@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime
+from typing import Any
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from monitor.notifier.digest import DigestSchedule
+from monitor.notifier.queue import TelegramSendQueue
+from monitor.notifier.subscriptions import SubscriptionIndex, load_subscriptions
+from monitor.pipeline import notify
+from monitor.storage.state import StateStore
+from tests.fake_telegram import FakeTelegramServer
+
+PRAGUE = ZoneInfo("Europe/Prague")
+
+
+def at(day: int, hour: int, minute: int = 0) -> float:
+    return datetime(2030, 1, day, hour, minute, tzinfo=PRAGUE).timestamp()
+
+
+def shows(count: int) -> list[dict]:
+    return [
+        {"title": f"Show {i}", "datetime": f"2030-02-{i % 28 + 1:02d}T19:00:00+01:00", "link": f"https://t.cz/{i}"}
+        for i in range(count)
+    ]
+
+
+class TestDigestSchedule(unittest.TestCase):
+    def test_from_options(self: Any) -> None:
+        self.assertIsNone(DigestSchedule.from_options(None))
+        self.assertIsNone(DigestSchedule.from_options({"window": "daily"}))
+        schedule = DigestSchedule.from_options(
+            {"enabled": True, "window": "daily", "at": "09:00", "quiet_hours": ["22:00", "7:30"]}, "UTC"
+        )
+        self.assertEqual(schedule, DigestSchedule(86400, 9 * 3600, 22 * 3600, 7 * 3600 + 1800, "UTC"))
+        for options in (
+            {"window": 7000},
+            {"window": 0.5},
+            {"window": 0},
+            {"window": True},
+            {"window": "weekly"},
+            {"at": "9 am"},
+            {"quiet_hours": ["22:00"]},
+        ):
+            with self.subTest(options=options), self.assertRaises(ValueError):
+                DigestSchedule.from_options({"enabled": True, **options})
+
+    def test_windows(self: Any) -> None:
+        hourly = DigestSchedule(window=3600)
+        self.assertEqual(hourly.window_start(at(2, 10, 59)), at(2, 10))
+        daily = DigestSchedule(window=86400, offset=9 * 3600)
+        self.assertEqual(daily.window_start(at(2, 8, 59)), at(1, 9))
+        self.assertEqual(daily.window_start(at(2, 9)), at(2, 9))
+
+        self.assertTrue(daily.is_due(None, at(2, 8)))
+        self.assertFalse(daily.is_due(at(1, 9, 1), at(2, 8, 59)))
+        self.assertTrue(daily.is_due(at(1, 9, 1), at(2, 9, 1)))
+
+    def test_quiet_hours(self: Any) -> None:
+        schedule = DigestSchedule(window=3600, quiet_from=22 * 3600, quiet_to=8 * 3600)
+        self.assertTrue(schedule.is_quiet(at(2, 23, 30)))
+        self.assertTrue(schedule.is_quiet(at(3, 7, 59)))
+        self.assertFalse(schedule.is_quiet(at(3, 8)))
+        self.assertFalse(schedule.is_due(at(2, 21, 5), at(3, 3)))
+        self.assertTrue(schedule.is_due(at(2, 21, 5), at(3, 8, 1)))
+
+    def test_subscription_overrides_general_digest(self: Any) -> None:
+        cfg = {
+            "general": {"timezone": "UTC", "digest": {"enabled": True, "window": "daily"}},
+            "subscriptions": [
+                {"chat_id": 1},
+                {"chat_id": 2, "digest": {"at": "09:00"}},
+                {"chat_id": 3, "digest": {"enabled": False}},
+            ],
+        }
+        first, second, third = load_subscriptions(cfg)
+        self.assertEqual(first.digest, DigestSchedule(86400, 0, timezone="UTC"))
+        self.assertEqual(second.digest, DigestSchedule(86400, 9 * 3600, timezone="UTC"))
+        self.assertIsNone(third.digest)
+
+
+class TestDigestNotify(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.store = StateStore(":memory:")
+        self.addCleanup(self.store.close)
+
+    def run_minutes(self: Any, cfg: dict, server: FakeTelegramServer, start: float, minutes: int) -> int:
+        """Notify once a minute with one more show every minute, like a one-minute cron."""
+        subscriptions = SubscriptionIndex(load_subscriptions(cfg, "chat"))
+        for minute in range(minutes):
+            queue = TelegramSendQueue("token", {"per_chat_interval": 0, "global_rate": 0, "api_url": server.url})
+            parsed = {"T1": shows(minute + 1), "T2": shows(minute % 3 + 1)}
+            with patch("monitor.pipeline.time.time", return_value=start + minute * 60):
+                notify(cfg, parsed, self.store, "token", "chat", queue=queue, subscriptions=subscriptions)
+        return len(server.messages)
+
+    def test_digest_cuts_messages(self: Any) -> None:
+        theatres = [{"name": "T1", "time_parseable": True}, {"name": "T2", "time_parseable": True}]
+        immediate = {"general": {}, "theatres": theatres}
+        with FakeTelegramServer() as server:
+            self.assertEqual(self.run_minutes(immediate, server, at(2, 10), 60), 60)
+
+        store, self.store = self.store, StateStore(":memory:")
+        store.close()
+        digest = {"general": {"digest": {"enabled": True, "window": "hourly"}}, "theatres": theatres}
+        with FakeTelegramServer() as server:
+            # the first run is due right away, the rest of the hour is collected into the 11:00 digest,
+            # later changes wait for the one at 12:00
+            self.assertEqual(self.run_minutes(digest, server, at(2, 10, 30), 60), 2)
+        last = server.messages[-1]["text"]
+        self.assertIn("Show 30", last)
+        self.assertNotIn("Show 31", last)
+        self.assertEqual(last.count("<b>T1</b>"), 1)
+
+    def test_quiet_hours_delay_digest(self: Any) -> None:
+        digest = {"enabled": True, "window": "hourly", "quiet_hours": ["22:00", "08:00"], "timezone": "Europe/Prague"}
+        cfg = {"general": {"digest": digest}, "theatres": [{"name": "T1"}]}
+        with FakeTelegramServer() as server:
+            self.assertEqual(self.run_minutes(cfg, server, at(2, 21, 58), 3), 1)
+            self.assertEqual(self.run_minutes(cfg, server, at(3, 7, 58), 3), 2)
+        self.assertIsNotNone(self.store.last_digest("T1"))
+
+    def test_failed_digest_is_retried(self: Any) -> None:
+        cfg = {"general": {"digest": {"enabled": True}}, "theatres": [{"name": "T1"}]}
+        with FakeTelegramServer() as server:
+            server.responses = [(400, {"ok": False, "description": "Bad Request"})]
+            self.assertEqual(self.run_minutes(cfg, server, at(2, 10), 1), 0)
+            self.assertIsNone(self.store.last_digest("T1"))
+            self.assertEqual(self.run_minutes(cfg, server, at(2, 10, 1), 1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
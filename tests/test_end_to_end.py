@@ -0,0 +1,46 @@
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from benchmarks.bench_pipeline import build_scenario
+from benchmarks.server import FixtureServer
+from monitor.notifier.formatting import format_theatre_schedule_html
+from monitor.parser import parse_all
+
+
+def scenario_cfg(theatres: list[dict], results_per_theatre: int, parse_mode: str) -> dict:
+    general = {"results_per_theatre": results_per_theatre, "parse_mode": parse_mode, "cache": {"enabled": False}}
+    return {"general": general, "theatres": theatres}
+
+
+class TestEndToEnd(unittest.TestCase):
+    def test_recorded_pages(self: Any) -> None:
+        pages, _, _ = build_scenario("recorded")
+        with FixtureServer(pages) as server:
+            _, theatres, results_per_theatre = build_scenario("recorded", server.url)
+            for parse_mode in ("full", "streaming"):
+                results = parse_all(scenario_cfg(theatres, results_per_theatre, parse_mode))
+                self.assertEqual(set(results), {th["name"] for th in theatres})
+                for name, shows in results.items():
+                    self.assertEqual(len(shows), results_per_theatre, name)
+                    for show in shows:
+                        self.assertTrue(show["title"] and show["datetime"], name)
+                        self.assertTrue(show["link"].startswith(server.url), name)
+
+    def test_synthetic_page_to_message(self: Any) -> None:
+        pages, _, _ = build_scenario("synthetic-50")
+        with FixtureServer(pages) as server:
+            _, theatres, n = build_scenario("synthetic-50", server.url)
+            shows = parse_all(scenario_cfg(theatres, n, "streaming"))["Synthetic 50"]
+        self.assertEqual(len(shows), 50)
+        message = format_theatre_schedule_html(shows, dt_parsable=True)
+        self.assertEqual(message.count("Detail</a>"), 50)
+
+    @patch("monitor.parser.generic_parser.time.sleep")
+    def test_server_errors_are_retried(self: Any, _mock_sleep: Any) -> None:
+        pages, _, _ = build_scenario("synthetic-5")
+        with FixtureServer(pages, error_rate=0.5, seed=1) as server:
+            _, theatres, n = build_scenario("synthetic-5", server.url)
+            results = parse_all(scenario_cfg(theatres, n, "full"))
+        self.assertGreater(server.errors, 0)
+        self.assertEqual(len(results.get("Synthetic 5", [])), 5)
@@ -0,0 +1,76 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import patch
+
+from urllib3 import HTTPSConnectionPool
+
+from monitor.utils import http
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self: Any) -> None:
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self: Any, *args: Any) -> None:
+        pass
+
+
+class TestHttp(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls: Any) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls: Any) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def tearDown(self: Any) -> None:
+        http.configure_http()
+
+    def test_connections_are_reused(self: Any) -> None:
+        session = http.configure_http({"pool_maxsize": 2})
+        for _ in range(3):
+            session.get(self.url, timeout=5)
+        stats = http.connection_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["opened"], 1)
+        self.assertEqual(stats["reused"], 2)
+
+    def test_keep_alive_disabled_opens_new_connections(self: Any) -> None:
+        session = http.configure_http({"keep_alive": False})
+        for _ in range(2):
+            session.get(self.url, timeout=5)
+        stats = http.connection_stats()
+        self.assertEqual(stats["opened"], 2)
+        self.assertEqual(stats["reused"], 0)
+
+    def test_get_session_is_shared(self: Any) -> None:
+        self.assertIs(http.get_session(), http.get_session())
+
+    def test_http2_keeps_injected_connection_class(self: Any) -> None:
+        class FakeHTTP2Connection(HTTPSConnectionPool.ConnectionCls):  # type: ignore[name-defined]
+            pass
+
+        def inject() -> bool:
+            HTTPSConnectionPool.ConnectionCls = FakeHTTP2Connection
+            return True
+
+        with (
+            patch.object(HTTPSConnectionPool, "ConnectionCls", HTTPSConnectionPool.ConnectionCls),
+            patch.object(http, "_enable_http2", side_effect=inject),
+        ):
+            session = http.create_session({"http2": True})
+        pool = session.get_adapter("https://example.com").poolmanager.connection_from_url("https://example.com")
+        self.assertTrue(issubclass(pool.ConnectionCls, FakeHTTP2Connection))
+        self.assertTrue(issubclass(pool.ConnectionCls, http._TimedConnectMixin))
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from monitor.parser import generic_parser
+from monitor.parser.selectors import CompiledSelectors
+from monitor.utils.http_cache import HTTPCache, conditional_headers
+
+PAGE = '<div class="show"><span class="time">19:00</span><h2>Hamlet</h2><a href="/hamlet">x</a></div>'
+
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = HTTPCache(Path(self.tmpdir.name), max_entries=2)
+
+    def tearDown(self: Any) -> None:
+        self.tmpdir.cleanup()
+
+    def test_put_and_get(self: Any) -> None:
+        self.cache.put("https://a.com", [{"title": "A"}], etag='"1"', variant="v1")
+        entry = self.cache.get("https://a.com", "v1")
+        self.assertEqual(entry["performances"], [{"title": "A"}])
+        self.assertEqual(conditional_headers(entry), {"If-None-Match": '"1"'})
+
+    def test_variant_mismatch_is_a_miss(self: Any) -> None:
+        self.cache.put("https://a.com", [], last_modified="Mon, 01 Jan 2024 00:00:00 GMT", variant="v1")
+        self.assertIsNone(self.cache.get("https://a.com", "v2"))
+
+    def test_response_without_validators_is_not_stored(self: Any) -> None:
+        self.cache.put("https://a.com", [{"title": "A"}])
+        self.assertIsNone(self.cache.get("https://a.com"))
+
+    def test_evicts_least_recently_used(self: Any) -> None:
+        for i, url in enumerate(["https://a.com", "https://b.com"]):
+            self.cache.put(url, [], etag=str(i))
+            os.utime(self.cache._path(url), (i, i))
+        self.cache.put("https://c.com", [], etag="2")
+        self.assertIsNone(self.cache.get("https://a.com"))
+        self.assertIsNotNone(self.cache.get("https://b.com"))
+        self.assertIsNotNone(self.cache.get("https://c.com"))
+
+    def test_from_config_disabled(self: Any) -> None:
+        self.assertIsNone(HTTPCache.from_config({"general": {"cache": {"enabled": False}}}))
+
+
+class TestFetchAndParseCache(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = HTTPCache(Path(self.tmpdir.name))
+        self.selectors = {
+            "elements_name": "div.show",
+            "time_tag_name": "span.time",
+            "performance_title_name": "h2",
+            "performance_link_name": "a",
+        }
+
+    def tearDown(self: Any) -> None:
+        self.tmpdir.cleanup()
+
+    @patch.object(CompiledSelectors, "parse_document", autospec=True, side_effect=CompiledSelectors.parse_document)
+    @patch("monitor.parser.generic_parser.fetch_response")
+    def test_not_modified_skips_parsing(self: Any, mock_fetch_response: Any, mock_soup: Any) -> None:
+        self.cache.put("https://a.com", [{"title": "Cached"}], etag='"1"', variant="")
+        full = MagicMock(status_code=200, text=PAGE, headers={"ETag": '"1"'})
+        not_modified = MagicMock(status_code=304, headers={})
+
+        mock_fetch_response.return_value = full
+        first = generic_parser.fetch_and_parse("https://a.com", cache=self.cache, **self.selectors)
+        self.assertEqual(first[0]["title"], "Hamlet")
+        self.assertEqual(mock_soup.call_count, 1)
+
+        mock_fetch_response.return_value = not_modified
+        second = generic_parser.fetch_and_parse("https://a.com", cache=self.cache, **self.selectors)
+        self.assertEqual(second, first)
+        self.assertEqual(mock_soup.call_count, 1)
+        self.assertEqual(mock_fetch_response.call_args.kwargs["headers"], {"If-None-Match": '"1"'})
+        not_modified.close.assert_called_once()
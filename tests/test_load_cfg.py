@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from monitor.utils.load_cfg import (
+    index_theatres,
+    load_config,
+    load_yaml_config,
+    validate_config,
+)
+
+CONFIG = """
+general:
+  results_per_theatre: 5
+theatres:
+  - name: A
+    program_url: https://a.cz
+  - name: B
+    program_url: https://b.cz
+"""
+
+
+class TestLoadConfig(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "cfg.yaml"
+        self.path.write_text(CONFIG)
+        env = patch.dict(os.environ, {"MONITOR_DATA_DIR": self.tmpdir.name})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self: Any) -> None:
+        self.tmpdir.cleanup()
+
+    def test_validate_and_index(self: Any) -> None:
+        cfg = load_config(self.path, snapshot=False)
+        self.assertEqual(list(index_theatres(cfg)), ["A", "B"])
+        self.assertEqual(index_theatres(cfg)["B"]["program_url"], "https://b.cz")
+
+        for invalid in (
+            {},
+            {"general": {}, "theatres": {"name": "A"}},
+            {"general": {}, "theatres": [{"program_url": "https://a.cz"}]},
+            {"general": {}, "theatres": [{"name": "A"}, {"name": "A"}]},
+        ):
+            with self.assertRaises(ValueError):
+                validate_config(invalid)
+
+    def test_snapshot_is_reused_until_the_file_changes(self: Any) -> None:
+        with patch("monitor.utils.load_cfg.load_yaml_config", wraps=load_yaml_config) as mock_load:
+            first = load_config(self.path, snapshot=True)
+            self.assertEqual(load_config(self.path, snapshot=True), first)
+            self.assertEqual(mock_load.call_count, 1)
+
+            self.path.write_text(CONFIG.replace("results_per_theatre: 5", "results_per_theatre: 7"))
+            os.utime(self.path, ns=(0, 10**9))
+            self.assertEqual(load_config(self.path, snapshot=True)["general"]["results_per_theatre"], 7)
+            self.assertEqual(mock_load.call_count, 2)
+
+    def test_missing_file(self: Any) -> None:
+        for snapshot in (False, True):
+            with self.assertRaises(FileNotFoundError):
+                load_config(Path(self.tmpdir.name) / "missing.yaml", snapshot=snapshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
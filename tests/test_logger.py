@@ -3,6 +3,9 @@ import tempfile
 import logging
 import unittest
 import io
+import gzip
+from logging.handlers import QueueHandler
+from unittest.mock import patch
 from monitor.utils import logger as logger_module
 
 class TestLogger(unittest.TestCase):
@@ -63,13 +66,50 @@ class TestLogger(unittest.TestCase):
 		self.assertRegex(written, r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:")
 
 	def test_logger_file_path_default(self):
-		log = logger_module.get_logger("default_path")
-		file_handler_found = False
-		for handler in log.handlers:
-			if isinstance(handler, logging.FileHandler):
-				self.assertTrue(handler.baseFilename.endswith("app.log"))
-				file_handler_found = True
-		self.assertTrue(file_handler_found, "No FileHandler found")
+		with tempfile.TemporaryDirectory() as tmpdir:
+			with patch.dict(os.environ, {"MONITOR_DATA_DIR": tmpdir}):
+				os.environ.pop("MONITOR_LOG_FILE", None)
+				log = logger_module.get_logger("default_path")
+			self.assertTrue(any(isinstance(h, QueueHandler) for h in log.handlers))
+			listener = logger_module.get_listener("default_path")
+			file_handlers = [h for h in listener.handlers if isinstance(h, logging.FileHandler)]
+			self.assertEqual(len(file_handlers), 1)
+			self.assertEqual(file_handlers[0].baseFilename, os.path.join(tmpdir, "logs", "monitor.log"))
+			logger_module.stop_logging("default_path")
+
+	def test_logger_file_path_from_env(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			log_path = os.path.join(tmpdir, "custom", "monitor.log")
+			with patch.dict(os.environ, {"MONITOR_LOG_FILE": log_path}):
+				log = logger_module.get_logger("env_path")
+			log.info("queued message")
+			logger_module.stop_logging("env_path")
+			with open(log_path, encoding="utf-8") as f:
+				self.assertIn("queued message", f.read())
+
+	def test_rotated_files_are_compressed(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			log_path = os.path.join(tmpdir, "rotating.log")
+			handler = logger_module.create_file_handler(log_path, {"max_bytes": 200, "backup_count": 2})
+			log = logging.Logger("rotating")
+			log.addHandler(handler)
+			for i in range(20):
+				log.info("line %d %s", i, "x" * 40)
+			handler.close()
+			self.assertEqual(sorted(os.listdir(tmpdir)), ["rotating.log", "rotating.log.1.gz", "rotating.log.2.gz"])
+			with gzip.open(os.path.join(tmpdir, "rotating.log.1.gz"), "rt", encoding="utf-8") as f:
+				self.assertIn("line", f.read())
+
+	def test_configure_logging_replaces_file_handler(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			log = logger_module.get_logger("reconfigured", file_path=os.path.join(tmpdir, "old.log"))
+			new_path = os.path.join(tmpdir, "new.log")
+			logger_module.configure_logging({"file": new_path}, name="reconfigured")
+			log.info("after reconfiguration")
+			logger_module.stop_logging("reconfigured")
+			with open(new_path, encoding="utf-8") as f:
+				self.assertIn("after reconfiguration", f.read())
+			self.assertFalse(os.path.exists(os.path.join(tmpdir, "old.log")))
 
 if __name__ == "__main__":
 	unittest.main()
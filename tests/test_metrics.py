@@ -0,0 +1,132 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import requests
+
+from monitor.parser.generic_parser import fetch_and_parse
+from monitor.utils import http
+from monitor.utils.metrics import (
+    _NOOP_SPAN,
+    Metrics,
+    current_theatre,
+    metrics,
+    start_metrics_server,
+    write_prometheus_file,
+)
+
+PAGE = (
+    "<html><body>"
+    + "".join(f'<div class="show"><time>2030-01-0{i}</time><a href="/{i}">Show {i}</a></div>' for i in range(1, 4))
+    + "</body></html>"
+).encode("utf-8")
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self: Any) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self: Any, *args: Any) -> None:
+        pass
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        metrics.reset()
+        metrics.configure({"enabled": True, "json_logs": False})
+
+    def tearDown(self: Any) -> None:
+        metrics.reset()
+        metrics.configure(None)
+
+    def test_disabled_registry_records_nothing(self: Any) -> None:
+        registry = Metrics()
+        self.assertIs(registry.span("fetch"), _NOOP_SPAN)
+        with registry.span("fetch"):
+            pass
+        registry.inc("monitor_fetch_retries_total")
+        self.assertEqual(registry.render_prometheus(), "\n")
+
+    def test_span_records_stage_and_current_theatre(self: Any) -> None:
+        token = current_theatre.set("Divadlo")
+        try:
+            with metrics.span("parse"):
+                pass
+        finally:
+            current_theatre.reset(token)
+        self.assertEqual(metrics.histogram_count("monitor_stage_seconds", stage="parse", theatre="Divadlo"), 1)
+
+    def test_span_records_failures(self: Any) -> None:
+        with self.assertRaises(RuntimeError):
+            with metrics.span("send"):
+                raise RuntimeError("boom")
+        self.assertEqual(metrics.histogram_count("monitor_stage_seconds", stage="send"), 1)
+
+    def test_render_prometheus(self: Any) -> None:
+        metrics.inc("monitor_fetch_retries_total", host="example.com")
+        metrics.inc("monitor_fetch_retries_total", host="example.com")
+        metrics.observe("monitor_stage_seconds", 0.02, stage="fetch")
+        metrics.set("monitor_circuit_open", 1, host="example.com")
+        text = metrics.render_prometheus({"monitor_http_connections_opened": 3})
+
+        self.assertIn("# TYPE monitor_fetch_retries_total counter", text)
+        self.assertIn('monitor_fetch_retries_total{host="example.com"} 2', text)
+        self.assertIn('monitor_stage_seconds_bucket{stage="fetch",le="0.01"} 0', text)
+        self.assertIn('monitor_stage_seconds_bucket{stage="fetch",le="0.025"} 1', text)
+        self.assertIn('monitor_stage_seconds_bucket{stage="fetch",le="+Inf"} 1', text)
+        self.assertIn('monitor_stage_seconds_count{stage="fetch"} 1', text)
+        self.assertIn("# TYPE monitor_circuit_open gauge", text)
+        self.assertIn('monitor_circuit_open{host="example.com"} 1', text)
+        self.assertIn("monitor_http_connections_opened 3", text)
+
+    def test_fetch_and_parse_is_instrumented(self: Any) -> None:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        http.configure_http()
+        try:
+            host = f"127.0.0.1:{server.server_address[1]}"
+            perfs = fetch_and_parse(f"http://{host}/", "div.show", "time", "a", "a")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(perfs), 3)
+        self.assertEqual(metrics.histogram_count("monitor_stage_seconds", stage="fetch", host=host), 1)
+        self.assertEqual(metrics.histogram_count("monitor_stage_seconds", stage="parse", mode="full"), 1)
+        self.assertEqual(metrics.histogram_count("monitor_http_connect_seconds", host="127.0.0.1"), 1)
+        self.assertEqual(metrics.counter_value("monitor_bytes_downloaded_total", host=host), len(PAGE))
+
+    def test_write_prometheus_file(self: Any) -> None:
+        metrics.inc("monitor_telegram_messages_total", outcome="sent")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "monitor.prom")
+            write_prometheus_file(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertIn('monitor_telegram_messages_total{outcome="sent"} 1', f.read())
+            self.assertEqual(os.listdir(directory), ["monitor.prom"])
+
+    def test_metrics_server(self: Any) -> None:
+        metrics.inc("monitor_fetch_retries_total", host="a")
+        server = start_metrics_server(0, host="127.0.0.1")
+        try:
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            response = requests.get(f"{base}/metrics", timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('monitor_fetch_retries_total{host="a"} 1', response.text)
+            self.assertEqual(requests.get(f"{base}/other", timeout=5).status_code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
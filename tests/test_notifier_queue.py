@@ -0,0 +1,109 @@
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from monitor.notifier.queue import (
+    TELEGRAM_MESSAGE_LIMIT,
+    TelegramSendQueue,
+    split_html_message,
+)
+from tests.fake_telegram import FakeTelegramServer
+
+FAST = {"per_chat_interval": 0, "global_rate": 0, "backoff_time": 0}
+
+
+def schedule(n: int) -> str:
+    return "\n".join(
+        f'<b>Show {i}</b>\n- Mon, 01 Jan 19:00 → <a href="https://t.cz/{i}">Detail</a>\n' for i in range(n)
+    )
+
+
+class TestSplitHtmlMessage(unittest.TestCase):
+    def test_short_message_is_unchanged(self: Any) -> None:
+        self.assertEqual(split_html_message("<b>x</b>"), ["<b>x</b>"])
+
+    def test_splits_at_line_boundaries(self: Any) -> None:
+        text = schedule(200)
+        parts = split_html_message(text)
+        self.assertGreater(len(parts), 1)
+        self.assertTrue(all(len(p) <= TELEGRAM_MESSAGE_LIMIT for p in parts))
+        self.assertEqual("\n".join(parts).count("<b>"), 200)
+        for part in parts:
+            self.assertEqual(part.count("<a "), part.count("</a>"))
+
+    def test_long_line_reopens_tags(self: Any) -> None:
+        text = "<b>" + " ".join(["word"] * 100) + "</b>"
+        parts = split_html_message(text, limit=60)
+        self.assertTrue(all(len(p) <= 60 for p in parts))
+        self.assertTrue(all(p.startswith("<b>") and p.endswith("</b>") for p in parts))
+        self.assertEqual(sum(p.count("word") for p in parts), 100)
+
+
+class TestTelegramSendQueue(unittest.TestCase):
+    def test_coalesces_messages_per_chat(self: Any) -> None:
+        with FakeTelegramServer() as server:
+            queue = TelegramSendQueue("token", {**FAST, "api_url": server.url})
+            queue.enqueue("chat1", "<b>A</b>", key="a")
+            queue.enqueue("chat2", "<b>B</b>", key="b")
+            queue.enqueue("chat1", "<b>C</b>", key="c")
+            self.assertEqual(len(queue), 3)
+            delivered = queue.flush()
+
+        self.assertEqual(delivered, {"a": True, "b": True, "c": True})
+        self.assertEqual(len(queue), 0)
+        texts = {m["chat_id"]: m["text"] for m in server.messages}
+        self.assertEqual(texts, {"chat1": "<b>A</b>\n\n<b>C</b>", "chat2": "<b>B</b>"})
+        self.assertEqual(server.messages[0]["parse_mode"], "HTML")
+
+    def test_long_message_is_split(self: Any) -> None:
+        with FakeTelegramServer() as server:
+            queue = TelegramSendQueue("token", {**FAST, "api_url": server.url})
+            queue.enqueue("chat", schedule(200), key="long")
+            self.assertEqual(queue.flush(), {"long": True})
+        self.assertGreater(len(server.messages), 1)
+        self.assertTrue(all(len(m["text"]) <= TELEGRAM_MESSAGE_LIMIT for m in server.messages))
+
+    @patch("monitor.notifier.queue.time.sleep")
+    def test_honors_retry_after(self: Any, mock_sleep: Any) -> None:
+        with FakeTelegramServer() as server:
+            server.responses = [(429, {"ok": False, "parameters": {"retry_after": 7}}), (500, {"ok": False})]
+            queue = TelegramSendQueue("token", {**FAST, "api_url": server.url})
+            queue.enqueue("chat", "hi", key="k")
+            self.assertEqual(queue.flush(), {"k": True})
+        mock_sleep.assert_any_call(7.0)
+        self.assertEqual(queue.stats["retries"], 2)
+        self.assertEqual(len(server.messages), 1)
+
+    def test_permanent_error_is_reported(self: Any) -> None:
+        with FakeTelegramServer() as server:
+            server.responses = [(400, {"ok": False, "description": "Bad Request: chat not found"})]
+            queue = TelegramSendQueue("token", {**FAST, "api_url": server.url})
+            queue.enqueue("chat", "hi", key="k")
+            self.assertEqual(queue.flush(), {"k": False})
+        self.assertEqual(queue.stats["failed"], 1)
+        self.assertEqual(queue.stats["retries"], 0)
+
+    def test_flush_reports_its_own_counts(self: Any) -> None:
+        with FakeTelegramServer() as server:
+            queue = TelegramSendQueue("token", {**FAST, "api_url": server.url})
+            for _ in range(2):
+                for chat in ("chat1", "chat2"):
+                    queue.enqueue(chat, "hi", key=chat)
+                with patch("monitor.notifier.queue.logger") as mock_logger:
+                    queue.flush()
+                self.assertIn("flushed 2 messages in 2 calls", mock_logger.info.call_args[0][0])
+                self.assertIn("queue depth: 2", mock_logger.info.call_args[0][0])
+        self.assertEqual(queue.stats["sent"], 4)
+        self.assertEqual(len(queue.stats["latencies"]), 4)
+        self.assertIsNotNone(queue.stats["latencies"].maxlen)
+
+    @patch("monitor.notifier.queue.time.sleep")
+    def test_paces_sends_per_chat(self: Any, mock_sleep: Any) -> None:
+        with FakeTelegramServer() as server:
+            queue = TelegramSendQueue("token", {"per_chat_interval": 3.0, "global_rate": 0, "api_url": server.url})
+            queue.enqueue("chat", "x" * 4000, key=1)
+            queue.enqueue("chat", "y" * 4000, key=2)
+            queue.flush()
+        self.assertEqual(len(server.messages), 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertGreater(mock_sleep.call_args.args[0], 2.5)
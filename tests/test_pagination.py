@@ -0,0 +1,105 @@
+import threading
+import unittest
+from datetime import date
+from typing import Any
+
+from benchmarks.server import FixtureServer
+from monitor.parser import parse_all
+from monitor.parser.pagination import crawl_program, merge_pages, template_urls
+
+
+def show(n: int) -> dict:
+    return {"datetime": f"2030-01-{n:02d}T19:00", "title": f"Show {n}", "link": f"/show/{n}"}
+
+
+def program_page(numbers: list[int], next_href: str | None = None) -> str:
+    items = "".join(
+        f'<div class="show"><time datetime="2030-01-{n:02d}T19:00"></time><a href="/show/{n}">Show {n}</a></div>'
+        for n in numbers
+    )
+    more = f'<a class="more" href="{next_href}">Load more</a>' if next_href else ""
+    return f"<html><body>{items}{more}</body></html>"
+
+
+class FakeSite:
+    def __init__(self, pages: dict[str, list[dict]], next_links: dict[str, str] | None = None) -> None:
+        self.pages = pages
+        self.next_links = next_links or {}
+        self.fetched: list[str] = []
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str, next_link: str | None) -> tuple[list[dict], str | None]:
+        with self._lock:
+            self.fetched.append(url)
+        if url not in self.pages:
+            raise Exception(f"404 {url}")
+        return self.pages[url], self.next_links.get(url) if next_link else None
+
+
+class TestPagination(unittest.TestCase):
+    def test_template_urls_cross_year(self: Any) -> None:
+        urls = template_urls("https://x.cz/{year}-{month:02d}?p={page}", 3, today=date(2030, 11, 20))
+        self.assertEqual(urls, ["https://x.cz/2030-11?p=1", "https://x.cz/2030-12?p=2", "https://x.cz/2031-01?p=3"])
+
+    def test_merge_pages_deduplicates(self: Any) -> None:
+        duplicate = dict(show(2), title="  show 2 ")
+        merged = merge_pages([[show(1), show(2)], [duplicate, show(3)]])
+        self.assertEqual([item["title"] for item in merged], ["Show 1", "Show 2", "Show 3"])
+        self.assertEqual(len(merge_pages([[show(1), show(2)], [show(3)]], max_results=2)), 2)
+
+    def test_template_pages_stop_at_max_results(self: Any) -> None:
+        site = FakeSite({f"/p{i}": [show(2 * i), show(2 * i + 1)] for i in range(1, 6)})
+        result = crawl_program(
+            "/p1", {"url_template": "/p{page}", "max_pages": 5, "max_parallel": 1}, site.fetch, max_results=3
+        )
+        self.assertEqual(len(result), 3)
+        self.assertEqual(site.fetched, ["/p1", "/p2"])
+
+    def test_template_pages_stop_at_empty_page(self: Any) -> None:
+        site = FakeSite({"/p1": [show(1)], "/p2": [], "/p3": [show(3)]})
+        result = crawl_program("/p1", {"url_template": "/p{page}", "max_pages": 3, "max_parallel": 3}, site.fetch)
+        self.assertEqual(result, [show(1)])
+
+    def test_failure_after_first_page_keeps_results(self: Any) -> None:
+        site = FakeSite({"/p1": [show(1)]})
+        result = crawl_program("/p1", {"url_template": "/p{page}", "max_pages": 3}, site.fetch)
+        self.assertEqual(result, [show(1)])
+        with self.assertRaises(Exception):
+            crawl_program("/missing", {"next_link": "a.more"}, site.fetch)
+
+    def test_follow_next_links(self: Any) -> None:
+        site = FakeSite(
+            {"/a": [show(1)], "/b": [show(2)], "/c": [show(3)]},
+            next_links={"/a": "/b", "/b": "/c", "/c": "/a"},
+        )
+        result = crawl_program("/a", {"next_link": "a.more", "max_pages": 10}, site.fetch)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(site.fetched, ["/a", "/b", "/c"])
+
+        site.fetched.clear()
+        crawl_program("/a", {"next_link": "a.more", "max_pages": 2}, site.fetch)
+        self.assertEqual(site.fetched, ["/a", "/b"])
+
+    def test_parse_all_follows_load_more_links(self: Any) -> None:
+        pages = {
+            "/program": program_page([1, 2], next_href="/program/page/2"),
+            "/program/page/2": program_page([2, 3], next_href="3"),
+            "/program/page/3": program_page([4]),
+        }
+        with FixtureServer(pages) as server:
+            theatre = {
+                "name": "Paged",
+                "base_url": server.url,
+                "program_url": f"{server.url}/program",
+                "selectors": {"elements": "div.show", "time": "time", "title": "a", "link": "a"},
+                "pagination": {"next_link": "a.more", "max_pages": 5},
+            }
+            cfg = {"general": {"results_per_theatre": 10, "cache": {"enabled": False}}, "theatres": [theatre]}
+            shows = parse_all(cfg)["Paged"]
+
+        self.assertEqual([s["title"] for s in shows], ["Show 1", "Show 2", "Show 3", "Show 4"])
+        self.assertTrue(all(s["link"].startswith(server.url) for s in shows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -95,6 +95,42 @@ class TestParsing(unittest.TestCase):
         self.assertIn("Theatre1", results)
         mock_load_yaml_config.assert_called_once()
 
+    @patch("monitor.parser.parsing.fetch_and_parse")
+    def test_parse_all_isolates_failures(self, mock_fetch_and_parse):
+        cfg = dict(self.sample_cfg)
+        cfg["theatres"] = [
+            dict(self.sample_cfg["theatres"][0], name="Broken", program_url="https://broken.com/program"),
+            self.sample_cfg["theatres"][0],
+        ]
+
+        def fake_fetch_and_parse(url, **kwargs):
+            if "broken" in url:
+                raise Exception("fetch error")
+            return [dict(item) for item in self.fake_parsed_data]
+
+        mock_fetch_and_parse.side_effect = fake_fetch_and_parse
+        results = parsing.parse_all(cfg)
+        self.assertNotIn("Broken", results)
+        self.assertEqual(len(results["Theatre1"]), 2)
+
+    @patch("monitor.parser.parsing.fetch_and_parse")
+    def test_parse_all_survives_invalid_retry_options(self, mock_fetch_and_parse):
+        mock_fetch_and_parse.return_value = self.fake_parsed_data
+        cfg = dict(self.sample_cfg, general={"results_per_theatre": 2, "retry": {"max_attempt": 2}})
+        results = parsing.parse_all(cfg)
+        self.assertEqual(len(results["Theatre1"]), 2)
+        self.assertEqual(mock_fetch_and_parse.call_args.kwargs["retry_policy"], parsing.RetryPolicy())
+
+    @patch("monitor.parser.parsing.fetch_and_parse")
+    def test_parse_all_passes_parse_delay(self, mock_fetch_and_parse):
+        mock_fetch_and_parse.return_value = []
+        cfg = dict(self.sample_cfg)
+        cfg["theatres"] = [dict(self.sample_cfg["theatres"][0], parse_delay=5)]
+        parsing.parse_all(cfg)
+        kwargs = mock_fetch_and_parse.call_args.kwargs
+        self.assertEqual(kwargs["parse_delay"], 5)
+        self.assertIsNotNone(kwargs["throttle"])
+
     @patch("monitor.parser.parsing.parse_all")
     def test_main_success(self, mock_parse_all):
         mock_parse_all.return_value = {"Theatre1": [{"title": "Show1"}]}
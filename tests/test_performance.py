@@ -0,0 +1,56 @@
+import unittest
+from typing import Any
+
+from monitor.notifier.formatting import format_theatre_schedule_html
+from monitor.parser.performance import Performance, as_performance, normalize
+
+RAW = {"datetime": "2030-01-02T19:00", "title": "  Racek \n Čechov ", "link": "/racek"}
+
+
+class TestPerformance(unittest.TestCase):
+    def test_from_raw(self: Any) -> None:
+        p = Performance.from_raw(RAW, "https://x.cz/program", tz="Europe/Prague")
+        self.assertEqual(p.title, "Racek Čechov")
+        self.assertEqual(p.link, "https://x.cz/racek")
+        self.assertEqual(p.datetime, "2030-01-02T19:00")
+        # naive datetimes are local time of the theatre, not of the host
+        self.assertEqual(p.start.isoformat(), "2030-01-02T19:00:00+01:00")
+        self.assertEqual(p.timestamp, p.start.timestamp())
+
+    def test_aware_and_unparseable_datetimes(self: Any) -> None:
+        utc = Performance.from_raw(dict(RAW, datetime="2030-01-02T18:00:00+00:00"), tz="Europe/Prague")
+        self.assertEqual(utc.start.isoformat(), "2030-01-02T19:00:00+01:00")
+        self.assertIsNone(Performance.from_raw(dict(RAW, datetime="2. ledna 19:00")).start)
+        self.assertIsNone(Performance.from_raw(RAW, parse_datetime=False).start)
+        self.assertIsNone(Performance.from_raw(RAW, parse_datetime=False).timestamp)
+
+    def test_mapping_access(self: Any) -> None:
+        p = Performance.from_raw(RAW)
+        self.assertEqual(p["title"], "Racek Čechov")
+        self.assertEqual(p.get("link"), "/racek")
+        self.assertIsNone(p.get("start"))
+        with self.assertRaises(KeyError):
+            p["start"]
+        self.assertEqual(p.to_dict(), {"datetime": "2030-01-02T19:00", "title": "Racek Čechov", "link": "/racek"})
+        self.assertEqual(normalize(p), normalize(RAW))
+
+    def test_compact_and_immutable(self: Any) -> None:
+        p = Performance.from_raw(RAW)
+        self.assertFalse(hasattr(p, "__dict__"))
+        with self.assertRaises(AttributeError):
+            p.title = "Hamlet"  # type: ignore[misc]
+        self.assertIs(as_performance(p), p)
+
+    def test_formatting_accepts_records_and_performances(self: Any) -> None:
+        raw = [
+            {"datetime": "2030-01-03T19:00", "title": "Hamlet", "link": "https://x.cz/h"},
+            {"datetime": "2030-01-02T19:00", "title": "Hamlet", "link": "https://x.cz/h2"},
+        ]
+        performances = [Performance.from_raw(item) for item in raw]
+        html = format_theatre_schedule_html(raw, dt_parsable=True)
+        self.assertEqual(html, format_theatre_schedule_html(performances, dt_parsable=True))
+        self.assertLess(html.index("Wed, 02 Jan"), html.index("Thu, 03 Jan"))
+
+
+if __name__ == "__main__":
+    unittest.main()
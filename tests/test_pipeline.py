@@ -0,0 +1,65 @@
+import unittest
+from typing import Any
+
+from monitor.notifier.queue import TelegramSendQueue
+from monitor.pipeline import notify
+from monitor.storage.state import StateStore
+from tests.fake_telegram import FakeTelegramServer
+
+CFG = {"general": {}, "theatres": [{"name": "T1", "time_parseable": True}, {"name": "T2"}]}
+PARSED = {
+    "T1": [{"title": "Hamlet", "datetime": "2030-01-01T19:00:00+01:00", "link": "https://t1.cz/hamlet"}],
+    "T2": [{"title": "Racek", "datetime": "Po 1. 1. 19:00", "link": "https://t2.cz/racek"}],
+}
+
+
+class TestNotify(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.store = StateStore(":memory:")
+
+    def tearDown(self: Any) -> None:
+        self.store.close()
+
+    def queue(self: Any, server: FakeTelegramServer) -> TelegramSendQueue:
+        return TelegramSendQueue("token", {"per_chat_interval": 0, "global_rate": 0, "api_url": server.url})
+
+    def test_sends_only_changes(self: Any) -> None:
+        with FakeTelegramServer() as server:
+            self.assertEqual(notify(CFG, PARSED, self.store, "token", "chat", queue=self.queue(server)), 2)
+            self.assertEqual(len(server.messages), 1)
+            self.assertIn("<b>T1</b>", server.messages[0]["text"])
+            self.assertIn("<b>T2</b>", server.messages[0]["text"])
+
+            self.assertEqual(notify(CFG, PARSED, self.store, "token", "chat", queue=self.queue(server)), 0)
+            self.assertEqual(len(server.messages), 1)
+
+    def test_fans_out_to_subscribers(self: Any) -> None:
+        cfg = {
+            **CFG,
+            "subscriptions": [{"chat_id": "c1", "theatres": ["T1"]}, {"chat_id": "c2", "title_patterns": ["racek"]}],
+        }
+        with FakeTelegramServer() as server:
+            self.assertEqual(notify(cfg, PARSED, self.store, "token", None, queue=self.queue(server)), 2)
+        texts = {m["chat_id"]: m["text"] for m in server.messages}
+        self.assertIn("Hamlet", texts["c1"])
+        self.assertNotIn("Racek", texts["c1"])
+        self.assertIn("Racek", texts["c2"])
+        self.assertNotIn("<b>T1</b>", texts["c2"])
+
+    def test_truncated_schedule_is_not_removed(self: Any) -> None:
+        cfg = {**CFG, "general": {"results_per_theatre": 3}}
+        shows = [
+            {"title": f"S{i}", "datetime": f"2030-01-{i:02d}T19:00:00+01:00", "link": f"https://t1.cz/{i}"}
+            for i in range(1, 5)
+        ]
+        with FakeTelegramServer() as server:
+            notify(cfg, {"T1": shows[1:]}, self.store, "token", "chat", queue=self.queue(server))
+            self.assertEqual(notify(cfg, {"T1": shows[:3]}, self.store, "token", "chat", queue=self.queue(server)), 1)
+        self.assertIn("S1", server.messages[-1]["text"])
+        self.assertNotIn("S4", server.messages[-1]["text"])
+
+    def test_failed_delivery_is_not_committed(self: Any) -> None:
+        with FakeTelegramServer() as server:
+            server.responses = [(400, {"ok": False, "description": "Bad Request"})]
+            self.assertEqual(notify(CFG, PARSED, self.store, "token", "chat", queue=self.queue(server)), 0)
+            self.assertEqual(notify(CFG, PARSED, self.store, "token", "chat", queue=self.queue(server)), 2)
@@ -0,0 +1,79 @@
+import unittest
+from typing import Any
+
+from monitor.notifier.formatting import format_theatre_schedule_html
+from monitor.notifier.queue import TelegramSendQueue
+from monitor.notifier.rendering import RenderCache, content_hash
+from monitor.pipeline import notify
+from monitor.storage.state import StateStore
+from tests.fake_telegram import FakeTelegramServer
+
+CFG = {"general": {}, "theatres": [{"name": "T1", "time_parseable": True}]}
+
+
+def shows(*titles: str) -> list[dict]:
+    return [
+        {"title": title, "datetime": f"2030-01-{i + 1:02d}T19:00:00+01:00", "link": f"https://t1.cz/{i}"}
+        for i, title in enumerate(titles)
+    ]
+
+
+class TestRendering(unittest.TestCase):
+    def queue(self: Any, server: FakeTelegramServer) -> TelegramSendQueue:
+        return TelegramSendQueue("token", {"per_chat_interval": 0, "global_rate": 0, "api_url": server.url})
+
+    def test_content_hash(self: Any) -> None:
+        self.assertEqual(content_hash(shows("A", "B")), content_hash(shows("A", "B")))
+        self.assertNotEqual(content_hash(shows("A", "B")), content_hash(shows("A", "C")))
+        self.assertNotEqual(content_hash(shows("A")), content_hash(shows("A"), tz="UTC"))
+        self.assertNotEqual(content_hash(shows("A"), []), content_hash([], shows("A")))
+
+    def test_render_cache_is_bounded_lru(self: Any) -> None:
+        renders = RenderCache({"cache_size": 2})
+        calls = []
+
+        def build(text: str) -> Any:
+            return lambda: calls.append(text) or text
+
+        self.assertEqual(renders.render("a", build("A")), "A")
+        self.assertEqual(renders.render("a", build("other")), "A")
+        renders.render("b", build("B"))
+        renders.render("c", build("C"))
+        renders.render("a", build("A"))
+        self.assertEqual(calls, ["A", "B", "C", "A"])
+
+    def test_escaping_and_out_of_order_shows(self: Any) -> None:
+        items = [
+            {"title": "Tom & Jerry <3", "datetime": "2030-01-02T19:00:00+01:00", "link": "https://x.cz/?a=1&b=2"},
+            {"title": "Racek", "datetime": "2030-01-01T19:00:00+01:00", "link": None},
+        ]
+        html = format_theatre_schedule_html(items, dt_parsable=True)
+        self.assertIn("<b>Tom &amp; Jerry &lt;3</b>", html)
+        self.assertIn('<a href="https://x.cz/?a=1&amp;b=2">Detail</a>', html)
+        self.assertLess(html.index("Racek"), html.index("Tom"))
+        self.assertIn("- Tue, 01 Jan 19:00\n", html)
+
+    def test_unchanged_theatres_are_not_sent_again(self: Any) -> None:
+        renders = RenderCache()
+        with FakeTelegramServer() as server:
+            parsed = {"T1": shows("Hamlet")}
+            self.assertEqual(notify(CFG, parsed, None, "token", "chat", queue=self.queue(server), renders=renders), 1)
+            self.assertEqual(notify(CFG, parsed, None, "token", "chat", queue=self.queue(server), renders=renders), 0)
+            parsed = {"T1": shows("Hamlet", "Racek")}
+            self.assertEqual(notify(CFG, parsed, None, "token", "chat", queue=self.queue(server), renders=renders), 1)
+        self.assertEqual(len(server.messages), 2)
+
+    def test_failed_delivery_is_retried(self: Any) -> None:
+        renders = RenderCache()
+        store = StateStore(":memory:")
+        self.addCleanup(store.close)
+        parsed = {"T1": shows("Hamlet")}
+        with FakeTelegramServer() as server:
+            server.responses = [(400, {"ok": False, "description": "Bad Request"})]
+            self.assertEqual(notify(CFG, parsed, store, "token", "chat", queue=self.queue(server), renders=renders), 0)
+            self.assertEqual(notify(CFG, parsed, store, "token", "chat", queue=self.queue(server), renders=renders), 1)
+            self.assertEqual(notify(CFG, parsed, store, "token", "chat", queue=self.queue(server), renders=renders), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
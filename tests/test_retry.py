@@ -0,0 +1,219 @@
+import email.utils
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import requests
+
+from monitor.parser.generic_parser import fetch_response
+from monitor.parser.retry import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    FetchError,
+    RetryPolicy,
+    parse_retry_after,
+)
+from monitor.utils.http import configure_http
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Answer with the next (status, headers) of the server's script, then 200."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self: Any) -> None:
+        server = self.server
+        server.requests += 1
+        status, headers = server.script.pop(0) if server.script else (200, {})
+        body = b"ok"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self: Any, *args: Any) -> None:
+        pass
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_parse_retry_after(self: Any) -> None:
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        date = email.utils.formatdate(1000030, usegmt=True)
+        self.assertEqual(parse_retry_after(date, now=1000000), 30.0)
+        self.assertEqual(parse_retry_after(date, now=2000000), 0.0)
+
+    def test_exponential_delay_is_capped(self: Any) -> None:
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=False)
+        self.assertEqual([policy.delay(attempt) for attempt in range(5)], [1.0, 2.0, 4.0, 5.0, 5.0])
+
+    def test_jitter_stays_below_bound(self: Any) -> None:
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+        for attempt in range(5):
+            self.assertTrue(0 <= policy.delay(attempt) <= min(5.0, 2**attempt))
+
+    def test_retry_after_overrides_backoff(self: Any) -> None:
+        policy = RetryPolicy(max_retry_after=60.0)
+        self.assertEqual(policy.delay(0, retry_after=10.0), 10.0)
+        self.assertEqual(policy.delay(0, retry_after=600.0), 60.0)
+
+    def test_from_options(self: Any) -> None:
+        policy = RetryPolicy.from_options({"max_attempts": 5, "retry_statuses": [503]})
+        self.assertEqual(policy.max_attempts, 5)
+        self.assertTrue(policy.is_retryable(503))
+        self.assertTrue(policy.is_retryable(None))
+        self.assertFalse(policy.is_retryable(500))
+        with self.assertRaisesRegex(ValueError, "max_attempt'"):
+            RetryPolicy.from_options({"max_attempt": 2})
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "breaker.json"
+
+    def tearDown(self: Any) -> None:
+        self.tmpdir.cleanup()
+
+    def test_opens_after_threshold_and_persists(self: Any) -> None:
+        breaker = CircuitBreaker(self.path, failure_threshold=2, cooldown=100)
+        breaker.record_failure("a.cz", now=1000)
+        self.assertTrue(breaker.allow("a.cz", now=1001))
+        breaker.record_failure("a.cz", now=1002)
+        self.assertEqual(breaker.state("a.cz"), OPEN)
+        self.assertFalse(breaker.allow("a.cz", now=1050))
+        self.assertTrue(breaker.allow("b.cz", now=1050))
+
+        reloaded = CircuitBreaker(self.path, failure_threshold=2, cooldown=100)
+        self.assertFalse(reloaded.allow("a.cz", now=1050))
+
+    def test_half_open_trial(self: Any) -> None:
+        breaker = CircuitBreaker(self.path, failure_threshold=1, cooldown=100, max_cooldown=300)
+        breaker.record_failure("a.cz", now=1000)
+
+        self.assertTrue(breaker.allow("a.cz", now=1100))
+        self.assertEqual(breaker.state("a.cz"), HALF_OPEN)
+        breaker.record_failure("a.cz", now=1100)
+        self.assertEqual(breaker.state("a.cz"), OPEN)
+        self.assertFalse(breaker.allow("a.cz", now=1250))
+
+        self.assertTrue(breaker.allow("a.cz", now=1300))
+        breaker.record_success("a.cz")
+        self.assertEqual(breaker.state("a.cz"), CLOSED)
+        self.assertEqual(CircuitBreaker(self.path).state("a.cz"), CLOSED)
+
+    def test_half_open_lets_one_trial_through(self: Any) -> None:
+        breaker = CircuitBreaker(self.path, failure_threshold=1, cooldown=100)
+        breaker.record_failure("a.cz", now=1000)
+
+        self.assertEqual([breaker.allow("a.cz", now=1100 + i) for i in range(3)], [True, False, False])
+        self.assertFalse(CircuitBreaker(self.path, cooldown=100).allow("a.cz", now=1150))
+        # a trial that never reported back is given up after a cooldown
+        self.assertTrue(breaker.allow("a.cz", now=1200))
+        breaker.record_success("a.cz")
+        self.assertTrue(breaker.allow("a.cz", now=1201))
+
+    def test_changes_are_merged_by_the_coordinator(self: Any) -> None:
+        worker = CircuitBreaker(self.path, failure_threshold=1, persist=False)
+        worker.record_failure("a.cz", now=1000)
+        self.assertFalse(self.path.exists())
+
+        coordinator = CircuitBreaker(self.path)
+        coordinator.record_failure("b.cz", now=1000)
+        coordinator.merge(worker.changes())
+        self.assertEqual(CircuitBreaker(self.path).state("a.cz"), OPEN)
+        self.assertEqual(CircuitBreaker(self.path).changes(), {})
+
+        coordinator.merge({"a.cz": None})
+        self.assertEqual(CircuitBreaker(self.path).state("a.cz"), CLOSED)
+        self.assertEqual(CircuitBreaker(self.path, failure_threshold=2)._hosts["b.cz"]["failures"], 1)
+
+    def test_success_resets_failures(self: Any) -> None:
+        breaker = CircuitBreaker(self.path, failure_threshold=2)
+        breaker.record_failure("a.cz")
+        breaker.record_success("a.cz")
+        breaker.record_failure("a.cz")
+        self.assertEqual(breaker.state("a.cz"), CLOSED)
+
+    def test_unreadable_state_is_ignored(self: Any) -> None:
+        self.path.write_text("{not json", encoding="utf-8")
+        self.assertEqual(CircuitBreaker(self.path).state("a.cz"), CLOSED)
+
+
+@patch("monitor.parser.generic_parser.time.sleep")
+class TestFetchResponse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls: Any) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+        cls.host = f"127.0.0.1:{cls.server.server_address[1]}"
+        cls.url = f"http://{cls.host}/program"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        configure_http()
+
+    @classmethod
+    def tearDownClass(cls: Any) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self: Any) -> None:
+        self.server.requests = 0
+        self.server.script = []
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.breaker = CircuitBreaker(Path(self.tmpdir.name) / "breaker.json", failure_threshold=1)
+
+    def tearDown(self: Any) -> None:
+        self.tmpdir.cleanup()
+
+    def test_permanent_errors_are_not_retried(self: Any, mock_sleep: Any) -> None:
+        self.server.script = [(404, {})]
+        with self.assertRaises(FetchError):
+            fetch_response(self.url, breaker=self.breaker)
+        self.assertEqual(self.server.requests, 1)
+        mock_sleep.assert_not_called()
+        self.assertEqual(self.breaker.state(self.host), CLOSED)
+
+    def test_permanent_error_resolves_half_open_trial(self: Any, mock_sleep: Any) -> None:
+        self.breaker.record_failure(self.host, now=0)
+        self.server.script = [(404, {})]
+        with self.assertRaises(FetchError):
+            fetch_response(self.url, breaker=self.breaker)
+        self.assertEqual(self.breaker.state(self.host), CLOSED)
+
+    def test_retry_after_is_honored(self: Any, mock_sleep: Any) -> None:
+        self.server.script = [(503, {"Retry-After": "7"}), (429, {"Retry-After": "2"})]
+        r = fetch_response(self.url, breaker=self.breaker)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [7.0, 2.0])
+
+    def test_streamed_error_responses_are_closed(self: Any, mock_sleep: Any) -> None:
+        self.server.script = [(503, {}), (429, {})]
+        with patch.object(requests.Response, "close", autospec=True, side_effect=requests.Response.close) as close:
+            r = fetch_response(self.url, stream=True)
+            self.assertEqual(close.call_count, 2)
+        r.close()
+
+    def test_open_circuit_skips_request(self: Any, mock_sleep: Any) -> None:
+        self.server.script = [(503, {})] * 3
+        policy = RetryPolicy(max_attempts=3)
+        with self.assertRaises(FetchError):
+            fetch_response(self.url, retry_policy=policy, breaker=self.breaker)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.breaker.state(self.host), OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            fetch_response(self.url, retry_policy=policy, breaker=self.breaker)
+        self.assertEqual(self.server.requests, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from typing import Any
+
+from benchmarks.common import configured_theatres, load_fixture
+from monitor.parser.selectors import (
+    LXML_BACKEND,
+    SOUPSIEVE_BACKEND,
+    compile_selectors,
+    compile_theatre_selectors,
+)
+
+
+class TestSelectors(unittest.TestCase):
+    def test_backends_extract_the_same_records(self: Any) -> None:
+        for theatre in configured_theatres():
+            page = load_fixture(theatre["name"])
+            sel = theatre["selectors"]
+            results = []
+            for backend in (SOUPSIEVE_BACKEND, LXML_BACKEND):
+                compiled = compile_selectors(sel["elements"], sel["time"], sel["title"], sel["link"], backend=backend)
+                elements = compiled.select_elements(compiled.parse_document(page), limit=10)
+                results.append([compiled.extract(el) for el in elements])
+
+            self.assertEqual(len(results[0]), 10, theatre["name"])
+            self.assertEqual(results[0], results[1], theatre["name"])
+            self.assertTrue(all(r["title"] and r["link"] and r["datetime"] for r in results[0]))
+
+    def test_select_one_does_not_match_the_element_itself(self: Any) -> None:
+        compiled = compile_selectors("div.a", "div", "h2", "a", backend=LXML_BACKEND)
+        root = compiled.parse_document('<div class="a"><h2>T</h2></div>')
+        element = compiled.select_elements(root)[0]
+        self.assertEqual(compiled.extract(element), {"datetime": "", "title": "T", "link": None})
+
+    def test_compilation_is_cached(self: Any) -> None:
+        theatre = {"selectors": {"elements": "li", "time": "time", "title": "h2", "link": "a"}}
+        self.assertIs(compile_theatre_selectors(theatre), compile_theatre_selectors(theatre))
+
+    def test_invalid_selector_and_backend(self: Any) -> None:
+        for backend in (SOUPSIEVE_BACKEND, LXML_BACKEND):
+            with self.assertRaises(ValueError):
+                compile_selectors("div[", "time", "h2", "a", backend=backend)
+        with self.assertRaises(ValueError):
+            compile_selectors("div", "time", "h2", "a", backend="regex")
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from benchmarks.bench_pipeline import build_scenario
+from benchmarks.server import FixtureServer
+from monitor.parser import parse_all
+from monitor.parser.performance import Performance
+from monitor.parser.sharding import (
+    WorkerPool,
+    parse_shard_arg,
+    parse_sharded,
+    select_shard,
+    shard_of,
+)
+from monitor.utils.logger import logger
+
+THEATRES = [{"name": name} for name in ("A", "B", "C", "D", "Divadlo X10", "Venuševe Švehlovce")]
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+class TestSharding(unittest.TestCase):
+    def test_stable_shards(self: Any) -> None:
+        # fixed values: shards must not depend on the process (PYTHONHASHSEED) or the node
+        self.assertEqual([shard_of(th["name"], 3) for th in THEATRES], [1, 1, 2, 2, 1, 2])
+        shards = [select_shard(THEATRES, i, 3) for i in range(3)]
+        self.assertEqual(sorted(th["name"] for shard in shards for th in shard), sorted(th["name"] for th in THEATRES))
+        self.assertEqual([th["name"] for th in shards[1]], ["A", "B", "Divadlo X10"])
+
+    def test_shard_key_keeps_theatres_together(self: Any) -> None:
+        theatres = [{"name": name, "shard_key": "same-host"} for name in ("A", "C", "D")]
+        self.assertEqual(select_shard(theatres, shard_of("same-host", 3), 3), theatres)
+
+    def test_parse_shard_arg(self: Any) -> None:
+        self.assertEqual(parse_shard_arg("1/3"), (0, 3))
+        self.assertEqual(parse_shard_arg("3/3"), (2, 3))
+        for invalid in ("0/3", "4/3", "1", "a/b", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard_arg(invalid)
+        with self.assertRaises(ValueError):
+            select_shard(THEATRES, 3, 3)
+
+    def test_compact_tuples(self: Any) -> None:
+        p = Performance.from_raw({"datetime": "2030-01-02T19:00", "title": "Racek", "link": "/r"}, "https://x.cz")
+        self.assertEqual(Performance.from_tuple(p.to_tuple()), p)
+        q = Performance.from_raw({"datetime": "zítra", "title": "Racek", "link": None}, parse_datetime=False)
+        self.assertEqual(Performance.from_tuple(q.to_tuple()), q)
+
+    def test_parse_sharded_matches_parse_all(self: Any) -> None:
+        pages, _, _ = build_scenario("synthetic-5")
+        handler = ListHandler()
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        with tempfile.TemporaryDirectory() as data_dir, patch.dict(os.environ, {"MONITOR_DATA_DIR": data_dir}):
+            with FixtureServer(pages) as server:
+                _, (theatre,), n = build_scenario("synthetic-5", server.url)
+                theatres = [{**theatre, "name": name} for name in ("A", "B", "C", "D")]
+                cfg = {"general": {"results_per_theatre": n, "cache": {"enabled": False}}, "theatres": theatres}
+                sharded = parse_sharded(cfg, 2)
+                expected = parse_all(cfg)
+
+        self.assertEqual(list(sharded), ["A", "B", "C", "D"])
+        self.assertEqual(sharded, expected)
+        self.assertTrue(any("Parsing theatre: C" in message for message in handler.messages))
+
+    def test_pool_is_reused_and_breaker_changes_are_merged(self: Any) -> None:
+        # nothing listens on these ports, so every theatre fails fast and opens the circuit of its host
+        selectors = {"elements": "div", "time": "time", "title": "h3", "link": "a"}
+        theatres = [
+            {"name": name, "program_url": f"http://127.0.0.1:{port}/", "selectors": selectors}
+            for port, name in enumerate(("A", "B", "C", "D"), start=1)
+        ]
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "breaker.json")
+            general = {
+                "results_per_theatre": 10,
+                "cache": {"enabled": False},
+                "retry": {"max_attempts": 1},
+                "circuit_breaker": {"path": path, "failure_threshold": 1},
+            }
+            cfg = {"general": general, "theatres": theatres}
+            with WorkerPool(2, general) as pool:
+                self.assertEqual(parse_sharded(cfg, 2, pool=pool), {})
+                executor = pool.executor()
+                self.assertEqual(parse_sharded(cfg, 2, pool=pool), {})
+                self.assertIs(pool.executor(), executor)
+            with open(path, encoding="utf-8") as f:
+                hosts = json.load(f)
+
+        self.assertEqual(sorted(hosts), [f"127.0.0.1:{port}" for port in range(1, 5)])
+        self.assertTrue(all(state["state"] == "open" for state in hosts.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
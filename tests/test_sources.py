@@ -0,0 +1,205 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+from benchmarks.server import FixtureServer
+from monitor.parser import parse_all
+from monitor.parser.sources import (
+    EmbeddedDataAdapter,
+    ICalAdapter,
+    JSONAdapter,
+    JSONLDAdapter,
+    PayloadLocations,
+    SourceAdapter,
+    compile_path,
+    create_adapter,
+    decode_payload,
+    resolve_path,
+)
+
+API_RESPONSE = {
+    "data": {
+        "events": [
+            {"start": {"date": "2030-01-02T19:00:00+01:00"}, "name": "Racek", "slug": "/event/racek"},
+            {"start": {"date": "2030-01-03T19:00:00+01:00"}, "name": " Hamlet ", "slug": "https://x.cz/hamlet"},
+            {"start": {}, "name": "TBA"},
+        ]
+    }
+}
+
+JSON_LD_PAGE = """<html><head>
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "Organization", "name": "X"}</script>
+<script type='application/ld+json'>
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "TheaterEvent", "name": "Racek", "startDate": "2030-01-02T19:00", "url": "/racek"},
+  {"@type": ["Event"], "name": "Koncert", "startDate": "2030-01-05T20:00", "@id": "https://x.cz/koncert"}
+]}
+</script>
+<script type="application/ld+json">{not json</script>
+</head><body><div>...</div></body></html>"""
+
+NEXT_DATA = {"props": {"pageProps": {"events": [{"startsAt": "2030-01-02T19:00", "title": "Racek", "url": "/racek"}]}}}
+NEXT_PAGE = (
+    '<html><head><script src="/app.js"></script></head><body><div id="__next"></div>'
+    '<script id="__NEXT_DATA__" type="application/json">' + json.dumps(NEXT_DATA) + "</script></body></html>"
+)
+STATE_PAGE = (
+    "<html><body><script>if (window.__INITIAL_STATE__ == null) {}</script>"
+    "<script>window.__INITIAL_STATE__ = JSON.parse(" + json.dumps(json.dumps(NEXT_DATA)) + ");"
+    "window.__CONFIG__ = {};</script></body></html>"
+)
+EMBEDDED_OPTIONS = {
+    "items": "props.pageProps.events",
+    "fields": {"datetime": "startsAt", "title": "title", "link": "url"},
+}
+
+ICAL_FEED = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART;TZID=Europe/Prague:20300102T190000\r\n"
+    "SUMMARY:Racek\\, Čechov\r\n"
+    "URL:/racek\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART:20300103T180000Z\r\n"
+    "SUMMARY:A very long title that is\r\n"
+    "  folded\r\n"
+    "END:VEVENT\r\n"
+    "BEGIN:VEVENT\r\n"
+    "DTSTART;VALUE=DATE:20300104\r\n"
+    "SUMMARY:Festival\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+class TestSources(unittest.TestCase):
+    def test_resolve_path(self: Any) -> None:
+        data = {"a": [{"b": 1}, {"b": 2}]}
+        self.assertEqual(resolve_path(data, compile_path("a.1.b")), 2)
+        self.assertEqual(resolve_path(data, compile_path("a.-1.b")), 2)
+        self.assertIsNone(resolve_path(data, compile_path("a.5.b")))
+        self.assertIsNone(resolve_path(data, compile_path("x.y")))
+        self.assertIs(resolve_path(data, compile_path("")), data)
+
+    def test_json_adapter(self: Any) -> None:
+        adapter = JSONAdapter(
+            {"items": "data.events", "fields": {"datetime": "start.date", "title": "name", "link": "slug"}}
+        )
+        performances = adapter.parse(json.dumps(API_RESPONSE).encode(), "https://x.cz/api/program")
+        self.assertEqual(
+            performances,
+            [
+                {"datetime": "2030-01-02T19:00:00+01:00", "title": "Racek", "link": "https://x.cz/event/racek"},
+                {"datetime": "2030-01-03T19:00:00+01:00", "title": "Hamlet", "link": "https://x.cz/hamlet"},
+                {"datetime": None, "title": "TBA", "link": None},
+            ],
+        )
+
+    def test_json_adapter_validation(self: Any) -> None:
+        with self.assertRaises(ValueError):
+            JSONAdapter({"fields": {"title": "name"}})
+        adapter = JSONAdapter({"items": "data", "fields": {"datetime": "d", "title": "t"}})
+        with self.assertRaises(ValueError):
+            adapter.parse(b'{"data": {}}', "https://x.cz")
+
+    def test_json_ld_adapter(self: Any) -> None:
+        performances = JSONLDAdapter({}).parse(JSON_LD_PAGE.encode(), "https://x.cz/program")
+        self.assertEqual(
+            performances,
+            [
+                {"datetime": "2030-01-02T19:00", "title": "Racek", "link": "https://x.cz/racek"},
+                {"datetime": "2030-01-05T20:00", "title": "Koncert", "link": "https://x.cz/koncert"},
+            ],
+        )
+        only_theatre = JSONLDAdapter({"types": ["TheaterEvent"]}).parse(JSON_LD_PAGE.encode(), "https://x.cz")
+        self.assertEqual([p["title"] for p in only_theatre], ["Racek"])
+
+    def test_ical_adapter(self: Any) -> None:
+        performances = ICalAdapter({}).parse(ICAL_FEED.encode(), "https://x.cz/feed.ics")
+        self.assertEqual(
+            performances,
+            [
+                {"datetime": "2030-01-02T19:00:00+01:00", "title": "Racek, Čechov", "link": "https://x.cz/racek"},
+                {"datetime": "2030-01-03T18:00:00+00:00", "title": "A very long title that is folded", "link": None},
+                {"datetime": "2030-01-04", "title": "Festival", "link": None},
+            ],
+        )
+
+    def test_decode_payload(self: Any) -> None:
+        self.assertEqual(decode_payload(' {"a": [1]};\nvar b = 2;'), {"a": [1]})
+        self.assertEqual(decode_payload('JSON.parse("{\\"a\\": 1}")'), {"a": 1})
+        with self.assertRaises(ValueError):
+            decode_payload("JSON.parse(data)")
+
+    def test_embedded_adapter(self: Any) -> None:
+        expected = [{"datetime": "2030-01-02T19:00", "title": "Racek", "link": "https://x.cz/racek"}]
+        next_adapter = EmbeddedDataAdapter(EMBEDDED_OPTIONS)
+        next_adapter.locations = PayloadLocations()
+        self.assertEqual(next_adapter.parse(NEXT_PAGE.encode(), "https://x.cz/program"), expected)
+
+        state_adapter = EmbeddedDataAdapter({**EMBEDDED_OPTIONS, "variable": "window.__INITIAL_STATE__"})
+        state_adapter.locations = PayloadLocations()
+        self.assertEqual(state_adapter.parse(STATE_PAGE.encode(), "https://x.cz/program"), expected)
+        with self.assertRaises(ValueError):
+            state_adapter.parse(NEXT_PAGE.encode(), "https://y.cz/program")
+
+    def test_embedded_adapter_caches_payload_location(self: Any) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "locations.json"
+            adapter = EmbeddedDataAdapter(EMBEDDED_OPTIONS)
+            adapter.locations = PayloadLocations(path)
+            page = NEXT_PAGE.encode()
+            adapter.parse(page, "https://x.cz/program")
+            start = page.index(b'<script id="__NEXT_DATA__"')
+            self.assertEqual(json.loads(path.read_text()), {"x.cz|__NEXT_DATA__": [0, start]})
+
+            # a new run slices the payload at the stored location without searching the page
+            adapter.locations = PayloadLocations(path)
+            adapter.patterns = tuple(Mock(wraps=pattern) for pattern in adapter.patterns)
+            self.assertEqual(adapter.parse(page, "https://x.cz/other")[0]["title"], "Racek")
+            self.assertFalse(any(pattern.search.called for pattern in adapter.patterns))
+
+            # the layout moved: the payload is searched for again and the new location stored
+            adapter = EmbeddedDataAdapter(EMBEDDED_OPTIONS)
+            adapter.locations = PayloadLocations(path)
+            moved = b"<!-- banner -->" + page
+            self.assertEqual(adapter.parse(moved, "https://x.cz/program")[0]["title"], "Racek")
+            self.assertEqual(json.loads(path.read_text())["x.cz|__NEXT_DATA__"], [0, start + 15])
+
+    def test_unknown_source_type(self: Any) -> None:
+        with self.assertRaises(ValueError):
+            create_adapter({"type": "xml"})
+
+    def test_incomplete_adapter_cannot_be_created(self: Any) -> None:
+        class NoParse(SourceAdapter):
+            name = "no_parse"
+
+        with self.assertRaises(TypeError):
+            NoParse({})
+
+    def test_parse_all_with_json_source(self: Any) -> None:
+        with FixtureServer({"/api/program": json.dumps(API_RESPONSE)}) as server:
+            theatre = {
+                "name": "API",
+                "base_url": server.url,
+                "program_url": f"{server.url}/api/program",
+                "source": {
+                    "type": "json",
+                    "items": "data.events",
+                    "fields": {"datetime": "start.date", "title": "name", "link": "slug"},
+                },
+            }
+            cfg = {"general": {"results_per_theatre": 2, "cache": {"enabled": False}}, "theatres": [theatre]}
+            shows = parse_all(cfg)["API"]
+
+        self.assertEqual([s["title"] for s in shows], ["Racek", "Hamlet"])
+        self.assertEqual(shows[0]["link"], f"{server.url}/event/racek")
+
+
+if __name__ == "__main__":
+    unittest.main()
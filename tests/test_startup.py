@@ -0,0 +1,37 @@
+import tempfile
+import unittest
+from typing import Any
+
+from benchmarks.bench_startup import measure_imports
+
+# only needed by theatres on the soupsieve backend, or to read YAML without a snapshot
+HEAVY_MODULES = ("bs4", "soupsieve", "yaml", "dotenv")
+
+
+class TestStartup(unittest.TestCase):
+    def test_cli_import_is_lazy(self: Any) -> None:
+        times = measure_imports("import monitor.__main__")
+        self.assertIn("monitor.__main__", times)
+        self.assertEqual([m for m in HEAVY_MODULES if m in times], [])
+
+    def test_lxml_theatres_do_not_import_bs4(self: Any) -> None:
+        code = (
+            "from monitor.parser.parsing import parse_all\n"
+            "from monitor.parser.selectors import compile_selectors\n"
+            "compile_selectors('div', 'time', 'h3', 'a', backend='lxml')"
+        )
+        times = measure_imports(code)
+        self.assertIn("monitor.parser.parsing", times)
+        self.assertNotIn("bs4", times)
+        self.assertNotIn("soupsieve", times)
+
+    def test_config_snapshot_skips_yaml(self: Any) -> None:
+        code = "from monitor.utils.load_cfg import load_config; assert load_config(snapshot=True)['theatres']"
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {"MONITOR_DATA_DIR": data_dir}
+            self.assertIn("yaml", measure_imports(code, env))
+            self.assertNotIn("yaml", measure_imports(code, env))
+
+
+if __name__ == "__main__":
+    unittest.main()
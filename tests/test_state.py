@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime
+from typing import Any
+
+from monitor.storage.state import StateStore, fingerprint
+
+NOW = 1_700_000_000.0
+
+
+def perf(title: str, dt: str, link: str) -> dict:
+    return {"title": title, "datetime": dt, "link": link}
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self: Any) -> None:
+        self.store = StateStore(":memory:", keep_days=1)
+        self.schedule = [
+            perf("Hamlet", "2030-01-01T19:00:00+01:00", "https://t.cz/hamlet"),
+            perf("Macbeth", "2030-01-02T19:00:00+01:00", "https://t.cz/macbeth"),
+        ]
+
+    def tearDown(self: Any) -> None:
+        self.store.close()
+
+    def test_fingerprint_is_normalized(self: Any) -> None:
+        self.assertEqual(
+            fingerprint(perf("  Hamlet\n", "x", "l")),
+            fingerprint(perf("hamlet", "x", "l")),
+        )
+
+    def test_first_run_adds_everything(self: Any) -> None:
+        diff = self.store.diff("T", self.schedule, now=NOW)
+        self.assertEqual(len(diff.added), 2)
+        self.assertFalse(diff.removed)
+
+    def test_unchanged_schedule_is_empty_diff(self: Any) -> None:
+        self.store.commit("T", self.store.diff("T", self.schedule, now=NOW), now=NOW)
+        self.assertFalse(self.store.diff("T", self.schedule, now=NOW))
+
+    def test_detects_added_removed_and_changed(self: Any) -> None:
+        self.store.commit("T", self.store.diff("T", self.schedule, now=NOW), now=NOW)
+        new_schedule = [
+            perf("Hamlet", "2030-01-05T19:00:00+01:00", "https://t.cz/hamlet"),
+            perf("Othello", "2030-01-03T19:00:00+01:00", "https://t.cz/othello"),
+        ]
+        diff = self.store.diff("T", new_schedule, now=NOW)
+        self.assertEqual([it["title"] for it in diff.added], ["Othello"])
+        self.assertEqual([it["title"] for it in diff.changed], ["Hamlet"])
+        self.assertEqual([it["title"] for it in diff.removed], ["Macbeth"])
+
+    def test_past_shows_are_not_reported_removed_and_get_compacted(self: Any) -> None:
+        past = [perf("Old", "2000-01-01T19:00:00+01:00", "https://t.cz/old")]
+        self.store.commit("T", self.store.diff("T", past, now=NOW), now=NOW)
+        diff = self.store.diff("T", [], now=NOW)
+        self.assertFalse(diff)
+        self.store.commit("T", diff, now=NOW)
+        self.assertEqual(self.store.compact(now=NOW), 1)
+
+    def test_removals_only_within_covered_range(self: Any) -> None:
+        shows = [perf(f"S{i}", f"2030-01-{i:02d}T19:00:00+01:00", f"https://t.cz/{i}") for i in range(1, 12)]
+        self.store.commit("T", self.store.diff("T", shows[1:], now=NOW), now=NOW)
+
+        # a new earlier show pushes the last one past the cut of a truncated schedule
+        until = datetime.fromisoformat(shows[9]["datetime"]).timestamp()
+        diff = self.store.diff("T", shows[:10], now=NOW, until=until)
+        self.assertEqual([it["title"] for it in diff.added], ["S1"])
+        self.assertFalse(diff.removed)
+
+        # shows that left a subscriber's date window are not removed either
+        since = datetime.fromisoformat("2030-01-04T00:00:00+01:00").timestamp()
+        diff = self.store.diff("T", shows[3:], now=NOW, since=since)
+        self.assertFalse(diff)
+
+    def test_shows_past_the_cut_are_not_new_when_they_return(self: Any) -> None:
+        earlier, later = self.schedule
+        self.store.commit("T", self.store.diff("T", [earlier, later], now=NOW), now=NOW)
+
+        until = datetime.fromisoformat(earlier["datetime"]).timestamp()
+        diff = self.store.diff("T", [earlier], now=NOW, until=until)
+        self.assertFalse(diff)
+        self.store.commit("T", diff, now=NOW)
+
+        self.assertFalse(self.store.diff("T", [earlier, later], now=NOW))
+
+    def test_unknown_starts_are_never_removed(self: Any) -> None:
+        shows = [
+            perf("Hamlet", "zítra v 19:00", "https://t.cz/hamlet"),
+            {"title": "Macbeth", "link": "https://t.cz/m"},
+        ]
+        self.store.commit("T", self.store.diff("T", shows, now=NOW), now=NOW)
+        self.assertEqual(
+            [row[0] for row in self.store.conn.execute("SELECT datetime FROM performances ORDER BY title")],
+            ["zítra v 19:00", None],
+        )
+        self.assertFalse(self.store.diff("T", [], now=NOW))
+
+    def test_theatres_are_independent(self: Any) -> None:
+        self.store.commit("A", self.store.diff("A", self.schedule, now=NOW), now=NOW)
+        self.assertEqual(len(self.store.diff("B", self.schedule, now=NOW).added), 2)
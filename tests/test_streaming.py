@@ -0,0 +1,68 @@
+import unittest
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from monitor.parser import generic_parser
+from monitor.parser.streaming import iter_matching_html, parse_compound
+
+SHOW = '<div class="show x"><time datetime="2030-01-0{i}T19:00">d</time><h2><a href="/s{i}">Show {i}</a></h2></div>'
+PAGE = "<html><body><nav><p>menu</p></nav>" + "".join(SHOW.format(i=i) for i in range(1, 10)) + "</body></html>"
+
+
+def chunked(text: str, size: int = 40) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestParseCompound(unittest.TestCase):
+    def test_compound_selectors(self: Any) -> None:
+        sel = parse_compound("div.show.x")
+        self.assertEqual(sel.tag, "div")
+        self.assertEqual(sel.classes, frozenset({"show", "x"}))
+        self.assertEqual(parse_compound("#main").id, "main")
+
+    def test_complex_selectors_are_rejected(self: Any) -> None:
+        for selector in ("div .show", "div > a", "a[href]", "li:first-child", "a, b", ""):
+            self.assertIsNone(parse_compound(selector), selector)
+
+
+class TestIterMatchingHtml(unittest.TestCase):
+    def test_collects_all_matches(self: Any) -> None:
+        fragments = iter_matching_html(chunked(PAGE), parse_compound("div.show"))
+        self.assertEqual(len(fragments), 9)
+        self.assertIn("Show 1", fragments[0])
+        self.assertNotIn("menu", "".join(fragments))
+
+    def test_stops_after_limit(self: Any) -> None:
+        chunks = chunked(PAGE)
+        consumed = []
+
+        def gen() -> Any:
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        fragments = iter_matching_html(gen(), parse_compound("div.show"), limit=2)
+        self.assertEqual(len(fragments), 2)
+        self.assertLess(len(consumed), len(chunks))
+
+
+class TestStreamingFetchAndParse(unittest.TestCase):
+    @patch("monitor.parser.generic_parser.fetch_response")
+    def test_streaming_matches_full_mode(self: Any, mock_fetch_response: Any) -> None:
+        response = MagicMock(status_code=200, text=PAGE, headers={})
+        response.iter_content.side_effect = lambda **kwargs: iter(chunked(PAGE))
+        response.__enter__.return_value = response
+        mock_fetch_response.return_value = response
+        kwargs = {
+            "elements_name": "div.show",
+            "time_tag_name": "time",
+            "performance_title_name": "h2 a",
+            "performance_link_name": "h2 a",
+            "max_results": 3,
+        }
+
+        full = generic_parser.fetch_and_parse("https://t.cz", parse_mode="full", **kwargs)
+        streamed = generic_parser.fetch_and_parse("https://t.cz", parse_mode="streaming", **kwargs)
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(streamed, full)
+        self.assertTrue(mock_fetch_response.call_args.kwargs["stream"])
@@ -0,0 +1,64 @@
+import unittest
+from typing import Any
+
+from monitor.notifier.subscriptions import (
+    SubscriptionIndex,
+    compile_subscription,
+    load_subscriptions,
+)
+
+NOW = 1_900_000_000.0  # 2030-03-17
+PARSED = {
+    "T1": [
+        {"title": "Hamlet", "datetime": "2030-03-18T19:00:00+00:00", "link": "a"},
+        {"title": "Racek", "datetime": "2030-05-01T19:00:00+00:00", "link": "b"},
+    ],
+    "T2": [{"title": "Hamlet na motivy", "datetime": "so 20. 4.", "link": "c"}],
+}
+
+
+class TestSubscriptions(unittest.TestCase):
+    def test_default_subscription_without_config(self: Any) -> None:
+        subs = load_subscriptions({}, "chat")
+        self.assertEqual(len(subs), 1)
+        self.assertTrue(subs[0].default)
+        self.assertEqual(subs[0].state_key("T1"), "T1")
+        self.assertEqual(load_subscriptions({}, None), [])
+
+    def test_configured_subscriptions_replace_default(self: Any) -> None:
+        subs = load_subscriptions({"subscriptions": [{"chat_id": 42}]}, "chat")
+        self.assertEqual([s.chat_id for s in subs], ["42"])
+        self.assertEqual(subs[0].state_key("T1"), "42:T1")
+
+    def test_invalid_entries(self: Any) -> None:
+        with self.assertRaises(ValueError):
+            compile_subscription({"theatres": ["T1"]})
+        with self.assertRaises(ValueError):
+            compile_subscription({"chat_id": "c", "title_patterns": ["(unclosed"]})
+
+    def test_fan_out_applies_filters(self: Any) -> None:
+        index = SubscriptionIndex(
+            [
+                compile_subscription({"chat_id": "all"}),
+                compile_subscription({"chat_id": "t1", "theatres": ["T1"]}),
+                compile_subscription({"chat_id": "hamlet", "title_patterns": ["HAMLET"]}),
+                compile_subscription({"chat_id": "soon", "date_window": {"from_days": 0, "to_days": 7}}),
+            ]
+        )
+        result = {
+            (sub.chat_id, theatre): [s["link"] for s in shows]
+            for (sub, theatre), shows in index.fan_out(PARSED, NOW).items()
+        }
+        self.assertEqual(result[("all", "T1")], ["a", "b"])
+        self.assertEqual(result[("t1", "T1")], ["a", "b"])
+        self.assertNotIn(("t1", "T2"), result)
+        self.assertEqual(result[("hamlet", "T1")], ["a"])
+        self.assertEqual(result[("hamlet", "T2")], ["c"])
+        # unparseable datetimes always pass the date window
+        self.assertEqual(result[("soon", "T1")], ["a"])
+        self.assertEqual(result[("soon", "T2")], ["c"])
+
+    def test_index_only_returns_relevant_subscribers(self: Any) -> None:
+        index = SubscriptionIndex([compile_subscription({"chat_id": "t1", "theatres": ["T1"]})])
+        self.assertEqual(len(index.for_theatre("T1")), 1)
+        self.assertEqual(index.for_theatre("T2"), [])
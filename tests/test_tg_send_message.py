@@ -6,8 +6,9 @@ from monitor.notifier.tg_send_message import send_telegram_message
 
 
 class TestSendTelegramMessage(unittest.TestCase):
-    @patch("monitor.notifier.tg_send_message.requests.get")
-    def test_send_message_success(self: Any, mock_get: Any) -> None:
+    @patch("monitor.notifier.tg_send_message.get_session")
+    def test_send_message_success(self: Any, mock_get_session: Any) -> None:
+        mock_get = mock_get_session.return_value.get
         mock_response = MagicMock()
         mock_response.json.return_value = {"ok": True}
         mock_get.return_value = mock_response
@@ -16,8 +17,9 @@ class TestSendTelegramMessage(unittest.TestCase):
         self.assertTrue(result)
         mock_get.assert_called_once()
 
-    @patch("monitor.notifier.tg_send_message.requests.get")
-    def test_send_message_failure(self: Any, mock_get: Any) -> None:
+    @patch("monitor.notifier.tg_send_message.get_session")
+    def test_send_message_failure(self: Any, mock_get_session: Any) -> None:
+        mock_get = mock_get_session.return_value.get
         mock_response = MagicMock()
         mock_response.json.return_value = {"ok": False}
         mock_get.return_value = mock_response
@@ -26,8 +28,9 @@ class TestSendTelegramMessage(unittest.TestCase):
         self.assertFalse(result)
         mock_get.assert_called_once()
 
-    @patch("monitor.notifier.tg_send_message.requests.get")
-    def test_send_message_no_ok_key(self: Any, mock_get: Any) -> None:
+    @patch("monitor.notifier.tg_send_message.get_session")
+    def test_send_message_no_ok_key(self: Any, mock_get_session: Any) -> None:
+        mock_get = mock_get_session.return_value.get
         mock_response = MagicMock()
         mock_response.json.return_value = {}
         mock_get.return_value = mock_response
@@ -0,0 +1,31 @@
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from monitor.parser.throttle import HostThrottle
+
+
+class TestHostThrottle(unittest.TestCase):
+    @patch("monitor.parser.throttle.time.sleep")
+    @patch("monitor.parser.throttle.time.monotonic", return_value=100.0)
+    def test_same_host_is_spaced(self: Any, _mock_monotonic: Any, mock_sleep: Any) -> None:
+        throttle = HostThrottle()
+        self.assertEqual(throttle.wait("https://a.com/x", 5), 0.0)
+        self.assertEqual(throttle.wait("https://a.com/y", 5), 5.0)
+        self.assertEqual(throttle.wait("https://a.com/z", 5), 10.0)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch("monitor.parser.throttle.time.sleep")
+    @patch("monitor.parser.throttle.time.monotonic", return_value=100.0)
+    def test_different_hosts_do_not_wait(self: Any, _mock_monotonic: Any, mock_sleep: Any) -> None:
+        throttle = HostThrottle()
+        throttle.wait("https://a.com/x", 5)
+        self.assertEqual(throttle.wait("https://b.com/x", 5), 0.0)
+        mock_sleep.assert_not_called()
+
+    @patch("monitor.parser.throttle.time.sleep")
+    def test_zero_delay_is_noop(self: Any, mock_sleep: Any) -> None:
+        throttle = HostThrottle()
+        throttle.wait("https://a.com/x", 0)
+        throttle.wait("https://a.com/x", 0)
+        mock_sleep.assert_not_called()